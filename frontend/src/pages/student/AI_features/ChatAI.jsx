@@ -20,6 +20,7 @@ const ChatAI = () => {
     const [error, setError] = useState('');
     const [uploadedFile, setUploadedFile] = useState(null);
     const [isPdfUploaded, setIsPdfUploaded] = useState(false);
+    const [documentId, setDocumentId] = useState(null);
     const [enableTTS, setEnableTTS] = useState(false);
     const fileInputRef = useRef(null);
     const audioRef = useRef(new Audio());
@@ -78,6 +79,7 @@ const ChatAI = () => {
             
             if (result.success) {
                 setIsPdfUploaded(true);
+                setDocumentId(result.document_id);
                 
                 const systemMessage = {
                     id: Date.now(),
@@ -95,6 +97,7 @@ const ChatAI = () => {
             console.error('PDF Upload Error:', err);
             setUploadedFile(null);
             setIsPdfUploaded(false);
+            setDocumentId(null);
             if (fileInputRef.current) {
                 fileInputRef.current.value = '';
             }
@@ -106,6 +109,7 @@ const ChatAI = () => {
     const handleRemoveFile = () => {
         setUploadedFile(null);
         setIsPdfUploaded(false);
+        setDocumentId(null);
         if (fileInputRef.current) {
             fileInputRef.current.value = '';
         }
@@ -193,7 +197,8 @@ const ChatAI = () => {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    question: question
+                    question: question,
+                    document_id: documentId
                 }),
             });
 
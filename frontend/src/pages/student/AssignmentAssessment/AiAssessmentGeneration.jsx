@@ -74,7 +74,7 @@ const AiAssessmentGeneration = () => {
         }
     };
 
-    const generateQuestionsFromRag = async (numQuestions) => {
+    const generateQuestionsFromRag = async (numQuestions, documentId) => {
         try {
             const query = `Generate exactly ${numQuestions} multiple choice questions based on the content of this document. 
             
@@ -106,7 +106,7 @@ Return ONLY the JSON array, no additional text.`;
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                body: JSON.stringify({ question: query })
+                body: JSON.stringify({ question: query, document_id: documentId })
             });
 
             if (!response.ok) {
@@ -203,12 +203,12 @@ Return ONLY the JSON array, no additional text.`;
         try {
             // Step 1: Upload PDF to RAG pipeline
             setSuccess('Uploading PDF to AI...');
-            await uploadPdfToRag();
+            const uploadResult = await uploadPdfToRag();
 
             // Step 2: Generate questions using RAG
             setSuccess('Analyzing document and generating questions...');
             await new Promise(resolve => setTimeout(resolve, 1000)); // Small delay for UX
-            const questions = await generateQuestionsFromRag(numQuestions);
+            const questions = await generateQuestionsFromRag(numQuestions, uploadResult.document_id);
 
             // Step 3: Create assessment in backend
             setSuccess('Creating assessment...');
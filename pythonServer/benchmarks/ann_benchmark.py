@@ -0,0 +1,95 @@
+"""
+ANN Index Benchmark
+Compares recall and query latency of the RAG index types over a local corpus
+
+Usage (from pythonServer/):
+    python -m benchmarks.ann_benchmark path/to/corpus [--k 8] [--queries 200] [--max-chunks 50000]
+
+The corpus directory may contain .pdf and .txt files. Chunks are split and embedded
+exactly like /upload; recall@k is measured against exact (flat) search.
+"""
+
+import os
+import time
+import random
+import argparse
+import numpy as np
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from components.ann_index import INDEX_TYPES, build_index, effective_index_type, index_bytes
+
+
+def load_corpus(corpus_dir):
+    """Load all PDF pages and text files in a directory"""
+    docs = []
+    for name in sorted(os.listdir(corpus_dir)):
+        path = os.path.join(corpus_dir, name)
+        if name.lower().endswith(".pdf"):
+            docs.extend(PyPDFLoader(path).lazy_load())
+        elif name.lower().endswith(".txt"):
+            with open(path, "r", encoding="utf-8") as f:
+                docs.append(Document(page_content=f.read(), metadata={"source": path}))
+    return docs
+
+
+def recall_at_k(found, truth):
+    """Fraction of exact top-k neighbours returned by the approximate search"""
+    hits = sum(len(set(row_found) & set(row_truth)) for row_found, row_truth in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG index types")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--max-chunks", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    chunks = splitter.split_documents(load_corpus(args.corpus_dir))[:args.max_chunks]
+    if not chunks:
+        raise SystemExit("No text found in corpus")
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        model_kwargs={"device": "cpu"}
+    )
+
+    print(f"Embedding {len(chunks)} chunks...")
+    vectors = np.array(embeddings.embed_documents([c.page_content for c in chunks]), dtype="float32")
+
+    # Queries: the opening sentence of randomly sampled chunks
+    rng = random.Random(args.seed)
+    sample = rng.sample(chunks, min(args.queries, len(chunks)))
+    questions = [c.page_content.split(".")[0][:200] for c in sample]
+    queries = np.array(embeddings.embed_documents(questions), dtype="float32")
+
+    k = min(args.k, len(chunks))
+    _, truth = build_index(vectors, "flat").search(queries, k)
+
+    print(f"\n{'index':<8}{'build s':>10}{'bytes/vec':>12}{'recall@' + str(k):>12}{'ms/query':>12}")
+    print("-" * 54)
+    for index_type in INDEX_TYPES:
+        if effective_index_type(index_type, len(chunks)) != index_type:
+            print(f"{index_type:<8}  skipped: too few chunks to train")
+            continue
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        build_seconds = time.perf_counter() - start
+
+        # Single-query searches, like /retrieve
+        start = time.perf_counter()
+        found = np.vstack([index.search(q.reshape(1, -1), k)[1] for q in queries])
+        ms_per_query = (time.perf_counter() - start) * 1000 / len(queries)
+
+        print(f"{index_type:<8}{build_seconds:>10.2f}{index_bytes(index) / len(chunks):>12.0f}"
+              f"{recall_at_k(found, truth):>12.3f}{ms_per_query:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Embedding Backend Benchmark
+Compares the PyTorch and int8 ONNX embedding backends for speed and retrieval parity
+
+Usage (from pythonServer/):
+    python -m benchmarks.embedding_benchmark path/to/corpus [--max-chunks 2000] [--queries 200] [--k 5]
+
+Chunks are split like /upload. Parity compares per-chunk cosine similarity of the
+two backends and the overlap of their top-k results for the same queries; the
+script exits non-zero when the backends drift apart.
+"""
+
+import time
+import random
+import argparse
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.ann_benchmark import load_corpus
+from components.embedding_backends import OnnxEmbeddings, create_embeddings
+
+# Parity thresholds
+MIN_MEAN_COSINE = 0.98
+MIN_TOPK_OVERLAP = 0.9
+
+
+def embed(embeddings, texts):
+    """Embed texts, returning (normalized vectors, chunks per second)"""
+    embeddings.embed_documents(texts[:8])  # warm up
+    start = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+    seconds = time.perf_counter() - start
+    vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    return vectors, len(texts) / seconds
+
+
+def top_k(chunk_vectors, query_vectors, k):
+    scores = query_vectors @ chunk_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--max-chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    texts = [chunk.page_content for chunk in splitter.split_documents(load_corpus(args.corpus_dir))]
+    texts = texts[:args.max_chunks]
+    if not texts:
+        raise SystemExit("No text found in corpus")
+
+    # Queries: a sentence-sized slice of random chunks
+    rng = random.Random(args.seed)
+    queries = [text[:160] for text in rng.sample(texts, min(args.queries, len(texts)))]
+
+    backends = {"torch": create_embeddings("torch"), "onnx-int8": OnnxEmbeddings()}
+    vectors, query_vectors, rates = {}, {}, {}
+    for name, embeddings in backends.items():
+        vectors[name], rates[name] = embed(embeddings, texts)
+        query_vectors[name] = np.asarray(embeddings.embed_documents(queries), dtype="float32")
+        print(f"{name:>10}: {rates[name]:8.1f} chunks/s")
+
+    print(f"speedup: {rates['onnx-int8'] / rates['torch']:.2f}x over {len(texts)} chunks")
+
+    cosine = (vectors["torch"] * vectors["onnx-int8"]).sum(axis=1)
+    torch_top = top_k(vectors["torch"], query_vectors["torch"], args.k)
+    onnx_top = top_k(vectors["onnx-int8"], query_vectors["onnx-int8"], args.k)
+    overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(torch_top, onnx_top)])
+    top1 = np.mean(torch_top[:, 0] == onnx_top[:, 0])
+
+    print(f"cosine torch vs onnx: mean {cosine.mean():.4f}, min {cosine.min():.4f}")
+    print(f"top-{args.k} overlap: {overlap:.3f}, top-1 agreement: {top1:.3f}")
+
+    if cosine.mean() < MIN_MEAN_COSINE or overlap < MIN_TOPK_OVERLAP:
+        raise SystemExit(
+            f"Parity check failed (need mean cosine >= {MIN_MEAN_COSINE}, overlap >= {MIN_TOPK_OVERLAP})"
+        )
+    print("Parity check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Index Removal Check
+Verifies that removing chunks from each index type keeps search results mapped to the right chunks
+
+Usage (from pythonServer/):
+    python -m benchmarks.index_removal_check [--vectors 12000] [--dim 64] [--remove 3]
+
+For every index type a store of random vectors is built, the first --remove chunks
+(and a few from the middle) are deleted like a page update does, and every remaining
+vector is searched for: its nearest hit must be its own chunk id. New chunks added
+afterwards must get ids that do not collide. Exits non-zero on any mismatch.
+"""
+
+import argparse
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from components.ann_index import INDEX_TYPES, build_index, remove_vectors
+
+
+class FixedEmbeddings(Embeddings):
+    """Embeddings stub; the check only adds precomputed vectors"""
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+
+def make_store(vectors, index_type):
+    ids = [f"id{i}" for i in range(len(vectors))]
+    docstore = InMemoryDocstore({doc_id: Document(page_content=doc_id, id=doc_id) for doc_id in ids})
+    return FAISS(FixedEmbeddings(), build_index(vectors, index_type), docstore, dict(enumerate(ids)))
+
+
+def misses(store, vectors_by_id, sample):
+    """Chunk ids whose own vector does not come back as the nearest hit"""
+    wrong = []
+    for doc_id in sample:
+        try:
+            docs = store.similarity_search_by_vector(vectors_by_id[doc_id].tolist(), k=1)
+        except KeyError:  # the index returned a position the store no longer maps
+            docs = []
+        if not docs or docs[0].id != doc_id:
+            wrong.append(doc_id)
+    return wrong
+
+
+def check(index_type, vectors, remove, rng):
+    store = make_store(vectors, index_type)
+    vectors_by_id = {f"id{i}": vector for i, vector in enumerate(vectors)}
+
+    middle = len(vectors) // 2
+    removed = [f"id{i}" for i in range(remove)] + [f"id{i}" for i in range(middle, middle + remove)]
+    remove_vectors(store, removed)
+
+    remaining = [doc_id for doc_id in vectors_by_id if doc_id not in set(removed)]
+    if store.index.ntotal != len(remaining) or len(store.index_to_docstore_id) != len(remaining):
+        return [f"{store.index.ntotal} vectors / {len(store.index_to_docstore_id)} ids left, expected {len(remaining)}"]
+
+    added = rng.standard_normal((remove, vectors.shape[1])).astype("float32")
+    added_ids = [f"new{i}" for i in range(remove)]
+    store.add_embeddings(list(zip(added_ids, added.tolist())), ids=added_ids)
+    vectors_by_id.update(zip(added_ids, added))
+
+    sample = remaining[:50] + remaining[-50:] + list(rng.choice(remaining, 100, replace=False)) + added_ids
+    wrong = misses(store, vectors_by_id, sample)
+    # Compressed indexes may confuse near-duplicates; a handful is recall, a remap shifts nearly all
+    if index_type in ("ivfpq", "sq8") and len(wrong) <= len(sample) // 20:
+        return []
+    return wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check chunk removal for every index type")
+    parser.add_argument("--vectors", type=int, default=12000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--remove", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.vectors, args.dim)).astype("float32")
+
+    failed = False
+    for index_type in INDEX_TYPES:
+        wrong = check(index_type, vectors, args.remove, rng)
+        print(f"{index_type:>6}: {'ok' if not wrong else f'{len(wrong)} wrong, e.g. {wrong[:3]}'}")
+        failed = failed or bool(wrong)
+
+    if failed:
+        raise SystemExit("Index removal check failed")
+    print("Index removal check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+PDF Extraction Benchmark
+Measures the parsing stage of ingestion serially and sharded across processes
+
+Usage (from pythonServer/):
+    python -m benchmarks.pdf_extract_benchmark path/to/file.pdf [--workers 1 2 4 8] [--shard-pages 16] [--repeat 3]
+
+Each configuration extracts every page; the best of --repeat runs is reported.
+Parallel output is checked page by page against the serial run.
+"""
+
+import os
+import time
+import argparse
+from langchain_community.document_loaders import PyPDFLoader
+
+from components.pdf_extractor import ParallelPDFExtractor
+
+
+def timed(pages_iter, repeat):
+    """Best wall time of fully consuming a page iterator factory, with its pages"""
+    best, pages = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = list(pages_iter())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel PDF text extraction")
+    parser.add_argument("pdf_path")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--shard-pages", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}")
+    loader_seconds, loader_pages = timed(lambda: PyPDFLoader(args.pdf_path).lazy_load(), args.repeat)
+    page_count = len(loader_pages)
+    print(f"{'PyPDFLoader':>14}: {loader_seconds:7.2f}s  {page_count / loader_seconds:8.1f} pages/s")
+
+    serial = ParallelPDFExtractor(workers=1, shard_pages=args.shard_pages)
+    serial_seconds, serial_pages = timed(lambda: serial.iter_pages(args.pdf_path), args.repeat)
+    print(f"{'serial':>14}: {serial_seconds:7.2f}s  {page_count / serial_seconds:8.1f} pages/s")
+
+    if [page.page_content for page in serial_pages] != [page.page_content for page in loader_pages]:
+        print("warning: serial text differs from PyPDFLoader")
+
+    for workers in sorted(set(args.workers)):
+        if workers < 2:
+            continue
+        extractor = ParallelPDFExtractor(workers=workers, shard_pages=args.shard_pages, min_pages=1)
+        extractor.start()
+        seconds, pages = timed(lambda: extractor.iter_pages(args.pdf_path), args.repeat)
+        extractor.pool.shutdown()
+
+        in_order = [page.metadata["page"] for page in pages] == list(range(page_count))
+        identical = [page.page_content for page in pages] == [page.page_content for page in serial_pages]
+        print(
+            f"{f'{workers} workers':>14}: {seconds:7.2f}s  {page_count / seconds:8.1f} pages/s  "
+            f"speedup {serial_seconds / seconds:4.2f}x  "
+            f"{'ordered' if in_order else 'OUT OF ORDER'}, {'identical' if identical else 'TEXT DIFFERS'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+STT Backend Benchmark
+Compares real-time factor and word error rate of the /stt Whisper backends on local clips
+
+Usage (from pythonServer/):
+    python -m benchmarks.stt_benchmark path/to/clips [--model base] [--max-wer-increase 0.03]
+
+The clips directory holds audio files (.wav, .mp3, .m4a, .flac, .ogg, .webm); a .txt
+file with the same name holds the reference transcript used for WER. Real-time factor
+is processing time divided by audio duration (below 1.0 is faster than real time).
+The script exits non-zero when the int8 + VAD backend's WER exceeds openai-whisper's
+by more than the allowed margin.
+"""
+
+import os
+import re
+import time
+import argparse
+
+from components.stt_backends import FasterWhisperTranscriber, OpenAIWhisperTranscriber
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm")
+
+
+def load_clips(clips_dir):
+    """(audio path, reference transcript or None) for every clip in a directory"""
+    clips = []
+    for name in sorted(os.listdir(clips_dir)):
+        if not name.lower().endswith(AUDIO_EXTENSIONS):
+            continue
+        path = os.path.join(clips_dir, name)
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                reference = f.read()
+        clips.append((path, reference))
+    return clips
+
+
+def words(text):
+    """Lowercased words without punctuation"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def edit_distance(reference, hypothesis):
+    """Word-level Levenshtein distance"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def run_backend(transcriber, clips):
+    """Transcribe all clips, returning totals for RTF and WER"""
+    transcriber.transcribe(clips[0][0])  # warm up
+    totals = {"audio": 0.0, "speech": 0.0, "seconds": 0.0, "errors": 0, "reference_words": 0}
+    for path, reference in clips:
+        start = time.perf_counter()
+        result = transcriber.transcribe(path)
+        seconds = time.perf_counter() - start
+
+        totals["audio"] += result["duration"]
+        totals["speech"] += result["speech_duration"]
+        totals["seconds"] += seconds
+        wer = ""
+        if reference is not None:
+            reference_words = words(reference)
+            errors = edit_distance(reference_words, words(result["text"]))
+            totals["errors"] += errors
+            totals["reference_words"] += len(reference_words)
+            wer = f", WER {errors / max(len(reference_words), 1):.3f}"
+        print(f"    {os.path.basename(path)}: RTF {seconds / max(result['duration'], 1e-9):.3f}{wer}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT backends")
+    parser.add_argument("clips_dir")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--max-wer-increase", type=float, default=0.03)
+    parser.add_argument("--no-vad-baseline", action="store_true",
+                        help="Also run int8 without VAD to separate quantization from VAD effects")
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips_dir)
+    if not clips:
+        raise SystemExit("No audio clips found")
+
+    backends = {"openai-fp32": lambda: OpenAIWhisperTranscriber(args.model)}
+    if args.no_vad_baseline:
+        backends["faster-int8"] = lambda: FasterWhisperTranscriber(args.model, "int8", vad_filter=False)
+    backends["faster-int8-vad"] = lambda: FasterWhisperTranscriber(args.model, "int8", vad_filter=True)
+
+    results = {}
+    for name, load in backends.items():
+        print(f"{name}:")
+        results[name] = run_backend(load(), clips)
+
+    print()
+    wers = {}
+    for name, totals in results.items():
+        rtf = totals["seconds"] / max(totals["audio"], 1e-9)
+        line = (f"{name:>16}: RTF {rtf:.3f}, {totals['audio']:.0f}s audio, "
+                f"{totals['speech']:.0f}s decoded")
+        if totals["reference_words"]:
+            wers[name] = totals["errors"] / totals["reference_words"]
+            line += f", WER {wers[name]:.3f}"
+        print(line)
+
+    baseline, candidate = results["openai-fp32"], results["faster-int8-vad"]
+    print(f"speedup: {baseline['seconds'] / candidate['seconds']:.2f}x over {len(clips)} clips")
+
+    if wers:
+        increase = wers["faster-int8-vad"] - wers["openai-fp32"]
+        if increase > args.max_wer_increase:
+            raise SystemExit(f"WER check failed: +{increase:.3f} (allowed +{args.max_wer_increase})")
+        print("WER check passed")
+
+
+if __name__ == "__main__":
+    main()
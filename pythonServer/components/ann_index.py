@@ -0,0 +1,173 @@
+"""
+ANN Index Module
+Builds compressed / approximate FAISS indexes for large document collections
+"""
+
+import os
+import math
+import faiss
+import numpy as np
+
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq", "sq8", "fp16")
+
+# Chunk counts above which "auto" switches to a cheaper index
+AUTO_HNSW_MIN_CHUNKS = 20000
+AUTO_IVFPQ_MIN_CHUNKS = 200000
+
+
+def choose_index_type(num_vectors, configured=None):
+    """
+    Pick an index type from config or collection size
+
+    Args:
+        num_vectors: Number of chunks to index
+        configured: One of INDEX_TYPES or 'auto' (env RAG_INDEX_TYPE)
+
+    Returns:
+        str: Index type
+    """
+    configured = (configured or os.getenv("RAG_INDEX_TYPE", "auto")).lower()
+
+    if configured != "auto":
+        if configured not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{configured}'. Use one of: auto, {', '.join(INDEX_TYPES)}")
+        return configured
+
+    if num_vectors >= AUTO_IVFPQ_MIN_CHUNKS:
+        return "ivfpq"
+    if num_vectors >= AUTO_HNSW_MIN_CHUNKS:
+        return "hnsw"
+    return "flat"
+
+
+def effective_index_type(index_type, num_vectors):
+    """Index type actually built: PQ needs 256 centroids per sub-quantizer, so small sets use int8"""
+    if index_type == "ivfpq" and num_vectors < 256 * 39:
+        return "sq8"
+    return index_type
+
+
+def _ivf_list_count(num_vectors):
+    """Number of IVF lists, keeping ~39+ training points per centroid"""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def _pq_subquantizers(dim):
+    """Largest sub-quantizer count <= dim/8 that divides the dimension"""
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def build_index(vectors, index_type):
+    """
+    Build a FAISS index over float32 vectors (L2 metric, same as the flat default)
+
+    Args:
+        vectors: numpy array of shape (n, d)
+        index_type: One of INDEX_TYPES
+
+    Returns:
+        faiss.Index: Trained index containing all vectors
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    num_vectors, dim = vectors.shape
+
+    index_type = effective_index_type(index_type, num_vectors)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, 32)
+        index.hnsw.efConstruction = 80
+        index.hnsw.efSearch = 64
+    elif index_type == "ivfpq":
+        nlist = _ivf_list_count(num_vectors)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, _pq_subquantizers(dim), 8)
+        index.nprobe = max(1, nlist // 16)
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    elif index_type == "fp16":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16)
+    else:
+        raise ValueError(f"Unknown index type '{index_type}'")
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def index_bytes(index):
+    """Serialized size of an index in bytes"""
+    return len(faiss.serialize_index(index))
+
+
+def compact_store(store, index_type):
+    """
+    Replace a store's flat index with the given index type, keeping docstore ids
+
+    Args:
+        store: LangChain FAISS store built with a flat index
+        index_type: One of INDEX_TYPES
+
+    Returns:
+        FAISS store (same object)
+    """
+    if index_type == "flat" or store.index.ntotal == 0:
+        return store
+
+    vectors = store.index.reconstruct_n(0, store.index.ntotal)
+    before = index_bytes(store.index)
+    store.index = build_index(vectors, index_type)
+    after = index_bytes(store.index)
+
+    print(f"Built {index_type} index: {before / 1024:.0f} KB -> {after / 1024:.0f} KB "
+          f"({after / store.index.ntotal:.0f} bytes/chunk)")
+    return store
+
+
+def remove_vectors(store, doc_ids):
+    """
+    Delete chunks from a store, rebuilding every index other than flat
+
+    LangChain renumbers the remaining positions 0..n-1 after a delete. Flat
+    indexes shift their vectors the same way, but HNSW cannot remove ids at
+    all and IVF keeps the removed positions' ids. Their maps would then point at
+    the wrong chunks, so they are rebuilt from the remaining vectors instead.
+
+    Args:
+        store: LangChain FAISS store
+        doc_ids: Docstore ids to delete
+    """
+    doc_ids = set(doc_ids)
+    if not doc_ids:
+        return
+
+    if isinstance(store.index, faiss.IndexFlat):
+        store.delete(list(doc_ids))
+        return
+
+    keep = [
+        (position, doc_id) for position, doc_id in sorted(store.index_to_docstore_id.items())
+        if doc_id not in doc_ids
+    ]
+
+    # An empty copy keeps the trained quantizers, so vectors are re-encoded with the same codebooks
+    rebuilt = faiss.clone_index(store.index)
+    rebuilt.reset()
+
+    ivf = faiss.try_extract_index_ivf(store.index)
+    if ivf is not None:
+        # IVF lists can only be reconstructed by position through a direct map
+        ivf.make_direct_map()
+    vectors = np.array(
+        [store.index.reconstruct(position) for position, _ in keep], dtype="float32"
+    ).reshape(-1, store.index.d)
+    rebuilt.add(vectors)
+
+    store.index = rebuilt
+    store.index_to_docstore_id = {new: doc_id for new, (_, doc_id) in enumerate(keep)}
+    store.docstore.delete(list(doc_ids))
@@ -0,0 +1,200 @@
+"""
+Answer Cache Module
+Semantic cache of RAG answers keyed by document and question embedding
+"""
+
+import os
+import time
+import uuid
+import threading
+import numpy as np
+from collections import OrderedDict
+
+
+class SemanticAnswerCache:
+    """Answers close paraphrases of earlier questions without calling the LLM"""
+
+    def __init__(self, threshold=None, near_miss_margin=None, ttl_seconds=None, max_entries=None):
+        """
+        Initialize the answer cache
+
+        Args:
+            threshold: Cosine similarity needed for a hit (env ANSWER_CACHE_THRESHOLD)
+            near_miss_margin: Band below threshold counted as near misses (env ANSWER_CACHE_NEAR_MISS)
+            ttl_seconds: Entry lifetime (env ANSWER_CACHE_TTL)
+            max_entries: Entries kept across all documents (env ANSWER_CACHE_MAX_ENTRIES)
+        """
+        self.threshold = threshold or float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+        self.near_miss_margin = near_miss_margin or float(os.getenv("ANSWER_CACHE_NEAR_MISS", "0.05"))
+        self.ttl_seconds = ttl_seconds or int(os.getenv("ANSWER_CACHE_TTL", str(24 * 3600)))
+        self.max_entries = max_entries or int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+        self.entries = OrderedDict()  # entry_id -> entry, least recently used first
+        self.by_document = {}  # document_id -> set of entry_ids
+        self.counters = {"lookups": 0, "hits": 0, "misses": 0, "near_misses": 0}
+        self.lock = threading.Lock()
+
+        print(f"Answer cache ready (threshold {self.threshold}, ttl {self.ttl_seconds}s)")
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, document_id, vector):
+        """
+        Find a cached answer for a similar question about the same document
+
+        Args:
+            document_id: Document identifier
+            vector: Question embedding
+
+        Returns:
+            dict: {answer, question, similarity} on a hit, else None
+        """
+        query = self._normalize(vector)
+
+        with self.lock:
+            self.counters["lookups"] += 1
+            self._expire(document_id)
+
+            entry_ids = list(self.by_document.get(document_id, ()))
+            best_id, best_similarity = None, -1.0
+            if entry_ids:
+                matrix = np.stack([self.entries[entry_id]["vector"] for entry_id in entry_ids])
+                similarities = matrix @ query
+                best = int(np.argmax(similarities))
+                best_id, best_similarity = entry_ids[best], float(similarities[best])
+
+            if best_id is not None and best_similarity >= self.threshold:
+                self.counters["hits"] += 1
+                self.entries.move_to_end(best_id)
+                entry = self.entries[best_id]
+                return {
+                    "answer": entry["answer"],
+                    "question": entry["question"],
+                    "similarity": best_similarity
+                }
+
+            self.counters["misses"] += 1
+            if best_similarity >= self.threshold - self.near_miss_margin:
+                self.counters["near_misses"] += 1
+            return None
+
+    def store(self, document_id, question, vector, answer, chunk_ids=()):
+        """
+        Cache an answer
+
+        Args:
+            document_id: Document identifier
+            question: Original question text
+            vector: Question embedding
+            answer: Answer text
+            chunk_ids: Ids of the chunks the answer was generated from
+        """
+        with self.lock:
+            entry_id = uuid.uuid4().hex
+            self.entries[entry_id] = {
+                "document_id": document_id,
+                "question": question,
+                "vector": self._normalize(vector),
+                "answer": answer,
+                "chunk_ids": frozenset(chunk_ids),
+                "created": time.time()
+            }
+            self.by_document.setdefault(document_id, set()).add(entry_id)
+
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, document_id):
+        """Drop all cached answers for a document"""
+        with self.lock:
+            for entry_id in list(self.by_document.get(document_id, ())):
+                self._remove(entry_id)
+
+    def invalidate_chunks(self, document_id, chunk_ids):
+        """
+        Drop cached answers built from any of the given chunks
+
+        Args:
+            document_id: Document identifier
+            chunk_ids: Ids of removed or replaced chunks
+
+        Returns:
+            int: Number of answers dropped
+        """
+        chunk_ids = set(chunk_ids)
+        with self.lock:
+            stale = [
+                entry_id for entry_id in self.by_document.get(document_id, ())
+                if self.entries[entry_id]["chunk_ids"] & chunk_ids
+            ]
+            for entry_id in stale:
+                self._remove(entry_id)
+            return len(stale)
+
+    def carry_over(self, document_id, new_document_id, chunk_ids):
+        """
+        Copy cached answers to a new version of a document, except those built from changed chunks
+
+        Args:
+            document_id: Document the answers were cached for
+            new_document_id: Document id of the new version
+            chunk_ids: Ids of removed or replaced chunks
+
+        Returns:
+            int: Number of answers not carried over
+        """
+        chunk_ids = set(chunk_ids)
+        with self.lock:
+            entries = [self.entries[entry_id] for entry_id in self.by_document.get(document_id, ())]
+            stale = 0
+            for entry in entries:
+                if entry["chunk_ids"] & chunk_ids:
+                    stale += 1
+                    continue
+                entry_id = uuid.uuid4().hex
+                self.entries[entry_id] = {**entry, "document_id": new_document_id}
+                self.by_document.setdefault(new_document_id, set()).add(entry_id)
+
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+            return stale
+
+    def _remove(self, entry_id):
+        entry = self.entries.pop(entry_id)
+        ids = self.by_document.get(entry["document_id"])
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self.by_document[entry["document_id"]]
+
+    def _expire(self, document_id):
+        """Drop a document's entries older than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        for entry_id in list(self.by_document.get(document_id, ())):
+            if self.entries[entry_id]["created"] < cutoff:
+                self._remove(entry_id)
+
+    def stats(self):
+        """Get hit, miss and near-miss counts and rates"""
+        with self.lock:
+            lookups = self.counters["lookups"]
+
+            def rate(name):
+                return round(self.counters[name] / lookups, 4) if lookups else 0.0
+
+            return {
+                **self.counters,
+                "hit_rate": rate("hits"),
+                "miss_rate": rate("misses"),
+                "near_miss_rate": rate("near_misses"),
+                "entries": len(self.entries),
+                "documents": len(self.by_document),
+                "threshold": self.threshold,
+                "near_miss_margin": self.near_miss_margin,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries
+            }
@@ -0,0 +1,174 @@
+"""
+Async Loop Module
+Long-lived asyncio event loop on a background thread that request threads submit coroutines to
+"""
+
+import os
+import queue
+import asyncio
+import threading
+import concurrent.futures
+
+
+class AsyncLoopThread:
+    """
+    One event loop shared by all request threads
+
+    Coroutines from different requests interleave on the loop, so network waits
+    (e.g. edge-tts websocket sessions) overlap instead of each request blocking
+    a worker on its own short-lived loop. A semaphore caps how many run at once;
+    the rest wait on the loop without holding a session open.
+    """
+
+    def __init__(self, name="async", max_concurrency=None):
+        """
+        Start the loop thread
+
+        Args:
+            name: Thread name, also used in log messages
+            max_concurrency: Coroutines allowed to run at once (env ASYNC_MAX_CONCURRENCY)
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency or int(os.getenv("ASYNC_MAX_CONCURRENCY", "16"))
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "running": 0, "peak_running": 0}
+        self.lock = threading.Lock()
+
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = None
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, args=(ready,), name=f"{name}-loop", daemon=True)
+        self.thread.start()
+        ready.wait()
+
+        print(f"{name} event loop ready ({self.max_concurrency} concurrent)")
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self.loop)
+        # Created on the loop thread so it belongs to this loop
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    async def _limited(self, coroutine):
+        # Outcomes are counted outside the semaphore so a task cancelled while
+        # still waiting for a slot is counted too and stops showing as waiting
+        running = False
+        try:
+            async with self.semaphore:
+                with self.lock:
+                    self.counters["running"] += 1
+                    self.counters["peak_running"] = max(self.counters["peak_running"], self.counters["running"])
+                running = True
+                try:
+                    result = await coroutine
+                finally:
+                    with self.lock:
+                        self.counters["running"] -= 1
+            with self.lock:
+                self.counters["completed"] += 1
+            return result
+        except asyncio.CancelledError:
+            with self.lock:
+                self.counters["cancelled"] += 1
+            raise
+        except BaseException:
+            with self.lock:
+                self.counters["failed"] += 1
+            raise
+        finally:
+            if not running:
+                # Never started; close it so it is not reported as never awaited
+                coroutine.close()
+
+    def submit(self, coroutine):
+        """
+        Schedule a coroutine on the loop
+
+        Args:
+            coroutine: Coroutine object created by the caller
+
+        Returns:
+            concurrent.futures.Future: Resolves with the coroutine's result
+        """
+        with self.lock:
+            self.counters["submitted"] += 1
+        return asyncio.run_coroutine_threadsafe(self._limited(coroutine), self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """
+        Run a coroutine on the loop and wait for its result
+
+        Args:
+            coroutine: Coroutine object created by the caller
+            timeout: Seconds to wait before cancelling it
+
+        Returns:
+            Result of the coroutine
+
+        Raises:
+            TimeoutError: If it did not finish within timeout
+        """
+        future = self.submit(coroutine)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"{self.name} task did not finish within {timeout}s")
+
+    def stream(self, async_iterable, timeout=None):
+        """
+        Iterate an async iterable on the loop from synchronous code
+
+        Items are handed over through a queue as they are produced. Closing the
+        returned generator early (e.g. the HTTP client went away) cancels the
+        producer on the loop.
+
+        Args:
+            async_iterable: Async generator created by the caller
+            timeout: Seconds to wait for each item before cancelling
+
+        Yields:
+            Items of the async iterable
+
+        Raises:
+            TimeoutError: If no item arrived within timeout
+        """
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in async_iterable:
+                    items.put(("item", item))
+                items.put(("done", None))
+            except Exception as e:
+                items.put(("error", e))
+                raise
+
+        future = self.submit(pump())
+        try:
+            while True:
+                try:
+                    kind, value = items.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"{self.name} stream produced nothing within {timeout}s")
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    def stats(self):
+        """Get submitted, completed, failed, cancelled and running counts"""
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "waiting": (
+                counters["submitted"] - counters["completed"] - counters["failed"]
+                - counters["cancelled"] - counters["running"]
+            ),
+            "max_concurrency": self.max_concurrency
+        }
@@ -4,20 +4,47 @@ Handles TTS (Text-to-Speech), STT (Speech-to-Text), and multilingual support
 """
 
 import os
-import asyncio
+import re
 import tempfile
 import warnings
 import edge_tts
+from .tts_cache import TTSCache
+from .async_loop import AsyncLoopThread
+from .stt_backends import create_transcriber, FasterWhisperTranscriber
+from .segment_transcriber import ParallelTranscriber
+from .model_registry import ModelRegistry
 
 warnings.filterwarnings("ignore")
 
+# Sentence ends: Latin punctuation followed by space, or Devanagari/CJK marks
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[।॥。！？])\s*")
+
 
 class AudioService:
     """Service class for audio operations"""
     
-    def __init__(self):
-        """Initialize audio service"""
+    def __init__(self, tts_cache=None, model_registry=None, parallel_transcriber=None):
+        """
+        Initialize audio service
+
+        Edge-tts sessions from all request threads run on one background event
+        loop, at most TTS_MAX_CONCURRENCY at a time, each cancelled after
+        TTS_TIMEOUT seconds.
+
+        Args:
+            tts_cache: Optional TTSCache for synthesized audio (created if not provided)
+            model_registry: Optional ModelRegistry shared with other services for the Whisper model
+            parallel_transcriber: Optional ParallelTranscriber for long recordings (created if not provided)
+        """
         self.whisper_model = None
+        self.model_registry = model_registry or ModelRegistry()
+        self.parallel_transcriber = parallel_transcriber or ParallelTranscriber()
+        self.tts_cache = tts_cache or TTSCache()
+        self.tts_timeout = float(os.getenv("TTS_TIMEOUT", "60"))
+        self.tts_loop = AsyncLoopThread("tts", int(os.getenv("TTS_MAX_CONCURRENCY", "16")))
+        # Long text is synthesized sentence by sentence, this many at once per request
+        self.tts_segment_min_chars = int(os.getenv("TTS_SEGMENT_MIN_CHARS", "300"))
+        self.tts_segment_parallelism = int(os.getenv("TTS_SEGMENT_PARALLELISM", "4"))
         print("Audio Service initialized")
     
     @staticmethod
@@ -147,37 +174,222 @@ class AudioService:
         Returns:
             tuple: (audio_path, detected_language)
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            self.generate_tts_audio(text, output_path, language)
-        )
-        loop.close()
-        return result
+        return self._run_async(self.generate_tts_audio(text, output_path, language))
+    
+    def _run_async(self, coroutine):
+        """Run a TTS coroutine on the shared loop and wait for it"""
+        return self.tts_loop.run(coroutine, self.tts_timeout)
+    
+    @staticmethod
+    def split_sentences(text, min_chars=12):
+        """
+        Split text into sentences for separate synthesis
+        
+        Fragments shorter than min_chars (abbreviations such as 'Dr.', one-word
+        replies) are joined to the following sentence.
+        
+        Args:
+            text: Input text
+            min_chars: Shortest fragment kept on its own
+            
+        Returns:
+            list: Sentences in order
+        """
+        sentences, pending = [], ""
+        for piece in SENTENCE_END.split(text):
+            piece = " ".join(piece.split())
+            if not piece:
+                continue
+            pending = f"{pending} {piece}" if pending else piece
+            if len(pending) >= min_chars:
+                sentences.append(pending)
+                pending = ""
+        if pending:
+            if sentences:
+                sentences[-1] = f"{sentences[-1]} {pending}"
+            else:
+                sentences.append(pending)
+        return sentences
+    
+    def _segments(self, text):
+        """Sentences of a long text, or the text itself when it is short"""
+        if len(text) < self.tts_segment_min_chars:
+            return [text]
+        return self.split_sentences(text)
+    
+    def _segment_chunks(self, segments, voice, language):
+        """
+        Synthesize segments concurrently and yield their audio in order
+        
+        Each segment is its own TTS cache entry, so sentences shared between
+        texts are synthesized once. At most tts_segment_parallelism segments
+        are in flight ahead of the one being yielded. edge-tts mp3 output has
+        no container header, so segment files concatenate into one stream.
+        """
+        keys = [self.tts_cache.key(segment, voice, language) for segment in segments]
+        jobs = {}  # segment index -> (path, future or None when cached)
+        
+        def start(i):
+            path = self.tts_cache.segment_lookup(keys[i])
+            if path:
+                return path, None
+            temp_path = self.tts_cache.temp_path(keys[i])
+            return temp_path, self.tts_loop.submit(
+                edge_tts.Communicate(segments[i], voice=voice).save(temp_path)
+            )
+        
+        started = 0
+        try:
+            for i in range(len(segments)):
+                while started < min(len(segments), i + self.tts_segment_parallelism):
+                    jobs[started] = start(started)
+                    started += 1
+                
+                path, future = jobs.pop(i)
+                if future is not None:
+                    future.result(self.tts_timeout)
+                    path = self.tts_cache.commit(path, keys[i])
+                with open(path, "rb") as f:
+                    yield f.read()
+        finally:
+            # Stopped early: keep segments that already finished, cancel the rest
+            for i, (path, future) in jobs.items():
+                if future is None:
+                    continue
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    self.tts_cache.commit(path, keys[i])
+                    continue
+                future.cancel()
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def _save_speech(self, text, voice, language, output_path):
+        """Synthesize text with one voice into output_path"""
+        segments = self._segments(text)
+        if len(segments) == 1:
+            self._run_async(edge_tts.Communicate(text, voice=voice).save(output_path))
+            return
+        
+        with open(output_path, "wb") as f:
+            for audio in self._segment_chunks(segments, voice, language):
+                f.write(audio)
+    
+    def cached_text_to_speech(self, text, language=None):
+        """
+        Generate TTS audio, reusing earlier audio of the same text, voice and language
+        
+        Args:
+            text: Text to convert
+            language: Optional language code
+            
+        Returns:
+            tuple: (audio_path, detected_language, cached)
+        """
+        if language is None:
+            language = self.detect_language(text)
+        
+        voice = self.get_voice_for_language(language)
+        
+        try:
+            key = self.tts_cache.key(text, voice, language)
+            path, cached = self.tts_cache.get_or_create(
+                key, lambda output_path: self._save_speech(text, voice, language, output_path)
+            )
+            return path, language, cached
+        except Exception as e:
+            print(f"TTS error with {voice}, falling back to English: {e}")
+            # Fallback audio is cached under the English voice, never under the failed one
+            key = self.tts_cache.key(text, "en-US-AriaNeural", "en-US")
+            path, cached = self.tts_cache.get_or_create(
+                key, lambda output_path: self._save_speech(text, "en-US-AriaNeural", "en-US", output_path)
+            )
+            return path, "en-US", cached
+    
+    def _speech_chunks(self, text, voice, language):
+        """Iterate mp3 chunks of text spoken by one voice as edge-tts produces them"""
+        segments = self._segments(text)
+        if len(segments) > 1:
+            return self._segment_chunks(segments, voice, language)
+        
+        async def audio():
+            async for chunk in edge_tts.Communicate(text, voice=voice).stream():
+                if chunk["type"] == "audio":
+                    yield chunk["data"]
+
+        return self.tts_loop.stream(audio(), self.tts_timeout)
+    
+    def _start_stream(self, text, voice, language):
+        """Open a (possibly cached) audio stream and wait for its first chunk"""
+        key = self.tts_cache.key(text, voice, language)
+        chunks, cached = self.tts_cache.stream_or_create(key, lambda: self._speech_chunks(text, voice, language))
+        try:
+            first = next(chunks)
+        except StopIteration:
+            return iter(()), cached
+        except Exception:
+            chunks.close()
+            raise
+        return self._resume_stream(first, chunks), cached
+    
+    @staticmethod
+    def _resume_stream(first, chunks):
+        """Yield the awaited first chunk, then the rest; closing stops the synthesis"""
+        try:
+            yield first
+            yield from chunks
+        finally:
+            chunks.close()
+    
+    def stream_text_to_speech(self, text, language=None):
+        """
+        Generate TTS audio as a stream of mp3 chunks
+        
+        The first chunk is awaited before returning, so a voice that fails up
+        front falls back to English and errors surface before a response starts.
+        Fully streamed audio is added to the TTS cache.
+        
+        Args:
+            text: Text to convert
+            language: Optional language code
+            
+        Returns:
+            tuple: (iterator of mp3 chunks, detected_language, cached)
+        """
+        if language is None:
+            language = self.detect_language(text)
+        
+        voice = self.get_voice_for_language(language)
+        
+        try:
+            chunks, cached = self._start_stream(text, voice, language)
+            return chunks, language, cached
+        except Exception as e:
+            print(f"TTS error with {voice}, falling back to English: {e}")
+            chunks, cached = self._start_stream(text, "en-US-AriaNeural", "en-US")
+            return chunks, "en-US", cached
     
     def load_whisper_model(self):
-        """Load Whisper model for speech-to-text"""
+        """Load Whisper model for speech-to-text (backend chosen by STT_BACKEND)"""
         if self.whisper_model is not None:
             return self.whisper_model
         
-        try:
-            import whisper
-            self.whisper_model = whisper.load_model("base")
-            print("Whisper model loaded successfully")
-            return self.whisper_model
-        except ImportError:
-            print("Whisper not installed. Install with: pip install openai-whisper")
-            return None
+        # Only the backend configuration is kept here; the model itself lives in the registry
+        self.whisper_model = create_transcriber(model_registry=self.model_registry)
+        return self.whisper_model
     
-    def speech_to_text(self, audio_path):
+    def speech_to_text(self, audio_path, progress_callback=None):
         """
         Convert speech to text using Whisper
         
+        Recordings longer than TRANSCRIBE_PARALLEL_MIN_SECONDS are split at
+        silences and the segments transcribed in parallel (faster-whisper only).
+        
         Args:
-            audio_path: Path to audio file
+            audio_path: Path to audio file, or binary stream of it (e.g. Upload.source())
+            progress_callback: Optional callable(stage, **counters), e.g. a job's update
             
         Returns:
-            dict: {text, detected_language}
+            dict: {text, detected_language, duration, speech_duration, segments}
         """
         if self.whisper_model is None:
             self.whisper_model = self.load_whisper_model()
@@ -185,11 +397,13 @@ class AudioService:
                 raise Exception("Whisper model not available")
         
         try:
+            if isinstance(self.whisper_model, FasterWhisperTranscriber):
+                return self.parallel_transcriber.transcribe(
+                    audio_path, self.whisper_model, progress_callback=progress_callback
+                )
             result = self.whisper_model.transcribe(audio_path)
-            return {
-                "text": result["text"],
-                "detected_language": result.get("language", "unknown")
-            }
+            # openai-whisper has no segment timestamps here; the whole clip is one segment
+            return {**result, "segments": [{"start": 0.0, "end": round(result["duration"], 2), "text": result["text"]}]}
         except Exception as e:
             raise Exception(f"Error in speech-to-text: {str(e)}")
     
@@ -0,0 +1,155 @@
+"""
+Context Packer Module
+Merges overlapping retrieved chunks and packs them into a token budget for the RAG prompt
+"""
+
+import os
+
+
+# Rough chars-per-token ratio of the Llama tokenizer on English prose
+CHARS_PER_TOKEN = 4
+
+# Shortest suffix/prefix match treated as splitter overlap when offsets are unknown
+MIN_TEXT_OVERLAP = 20
+
+# Chunks separated by at most this many (stripped whitespace) chars are adjacent
+MAX_ADJACENT_GAP = 4
+
+
+def estimate_tokens(text):
+    """Approximate token count of a text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class Span:
+    """Contiguous text from one page, built from one or more chunks"""
+
+    def __init__(self, doc, rank):
+        self.source = doc.metadata.get("source")
+        self.page = doc.metadata.get("page")
+        self.start = doc.metadata.get("start_index")
+        self.text = doc.page_content
+        self.rank = rank
+        # Offset on the page just past the span
+        self.end = None if self.start is None else self.start + len(self.text)
+
+    def absorb(self, other):
+        """Append the part of a later, overlapping or adjacent span not already covered"""
+        if other.start > self.end:
+            # Only whitespace was stripped between the chunks
+            self.text += "\n" + other.text
+        elif other.end > self.end:
+            self.text += other.text[self.end - other.start:]
+        self.end = max(self.end, other.end)
+        self.rank = min(self.rank, other.rank)
+
+
+class PackedContext:
+    """Packed context text with token accounting"""
+
+    def __init__(self, text, stats):
+        self.text = text
+        self.stats = stats
+
+
+class ContextPacker:
+    """Assembles retrieved chunks into a deduplicated, token-budgeted context"""
+
+    def __init__(self, token_budget=None):
+        """
+        Initialize the packer
+
+        Args:
+            token_budget: Maximum context tokens (env RAG_CONTEXT_TOKENS)
+        """
+        self.token_budget = token_budget or int(os.getenv("RAG_CONTEXT_TOKENS", "1500"))
+
+    @staticmethod
+    def _text_overlap(first, second):
+        """Length of the longest suffix of first that prefixes second"""
+        for size in range(min(len(first), len(second)), MIN_TEXT_OVERLAP - 1, -1):
+            if first.endswith(second[:size]):
+                return size
+        return 0
+
+    def _merge(self, docs):
+        """Merge chunks that overlap or touch on the same page into spans"""
+        spans = [Span(doc, rank) for rank, doc in enumerate(docs)]
+        with_offsets = sorted(
+            (span for span in spans if span.start is not None),
+            key=lambda span: (str(span.source), span.page or 0, span.start)
+        )
+        without_offsets = [span for span in spans if span.start is None]
+
+        merged = []
+        for span in with_offsets:
+            last = merged[-1] if merged else None
+            if (last and (last.source, last.page) == (span.source, span.page)
+                    and span.start <= last.end + MAX_ADJACENT_GAP):
+                last.absorb(span)
+            else:
+                merged.append(span)
+
+        # Chunks indexed before offsets were recorded: trim splitter overlap by text match
+        for span in without_offsets:
+            for other in merged:
+                if (other.source, other.page) != (span.source, span.page):
+                    continue
+                if span.text in other.text:
+                    other.rank = min(other.rank, span.rank)
+                    break
+                overlap = self._text_overlap(other.text, span.text)
+                if overlap:
+                    other.text += span.text[overlap:]
+                    other.rank = min(other.rank, span.rank)
+                    break
+            else:
+                merged.append(span)
+
+        # Identical text on different pages (headers, repeated boxes) is kept once
+        unique = {}
+        for span in merged:
+            key = " ".join(span.text.split())
+            if key not in unique or span.rank < unique[key].rank:
+                unique[key] = span
+        return list(unique.values())
+
+    def pack(self, docs):
+        """
+        Build prompt context from retrieved documents
+
+        Best-ranked spans are packed first; a span that does not fit is cut at the
+        budget. Packed spans are emitted in document order.
+
+        Args:
+            docs: Retrieved documents, best first
+
+        Returns:
+            PackedContext: Context text and stats (input_tokens, context_tokens, tokens_saved)
+        """
+        input_tokens = estimate_tokens("\n\n".join(doc.page_content for doc in docs))
+
+        remaining = self.token_budget
+        packed = []
+        for span in sorted(self._merge(docs), key=lambda span: span.rank):
+            if remaining <= 0:
+                break
+            tokens = estimate_tokens(span.text)
+            if tokens > remaining:
+                span.text = span.text[:remaining * CHARS_PER_TOKEN]
+                tokens = remaining
+            packed.append(span)
+            remaining -= tokens
+
+        packed.sort(key=lambda span: (str(span.source), span.page or 0, span.start or 0))
+        text = "\n\n".join(span.text for span in packed)
+        context_tokens = estimate_tokens(text)
+
+        return PackedContext(text, {
+            "chunks": len(docs),
+            "spans": len(packed),
+            "input_tokens": input_tokens,
+            "context_tokens": context_tokens,
+            "tokens_saved": max(0, input_tokens - context_tokens),
+            "token_budget": self.token_budget
+        })
@@ -0,0 +1,126 @@
+"""
+Embedding Backends Module
+Full-precision PyTorch or int8-quantized ONNX Runtime versions of the MiniLM sentence model
+"""
+
+import os
+import platform
+import numpy as np
+from typing import List
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# sentence-transformers truncates this model at 256 word pieces
+MAX_SEQ_LENGTH = 256
+
+
+def default_onnx_file():
+    """Quantized export published with the model that suits this CPU"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+class OnnxEmbeddings(Embeddings):
+    """MiniLM sentence embeddings from a quantized ONNX export, mean-pooled and normalized"""
+
+    def __init__(self, model_name=EMBEDDING_MODEL, onnx_file=None, batch_size=None, threads=None):
+        """
+        Load tokenizer and ONNX model from the Hugging Face hub cache
+
+        Args:
+            model_name: Hub repository of the sentence-transformers model
+            onnx_file: ONNX file within the repository (env EMBEDDING_ONNX_FILE)
+            batch_size: Texts per inference call (env EMBEDDING_ONNX_BATCH_SIZE)
+            threads: ONNX Runtime intra-op threads, 0 for all cores (env EMBEDDING_ONNX_THREADS)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+        from huggingface_hub import hf_hub_download
+
+        self.onnx_file = onnx_file or os.getenv("EMBEDDING_ONNX_FILE") or default_onnx_file()
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_ONNX_BATCH_SIZE", "32"))
+        threads = threads if threads is not None else int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(model_name, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            hf_hub_download(model_name, self.onnx_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        print(f"ONNX embedding model loaded ({model_name}/{self.onnx_file})")
+
+    def _embed_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feed["token_type_ids"] = np.zeros_like(input_ids)
+
+        output = self.session.run(None, feed)[0]
+        if output.ndim == 3:
+            # Mean over real tokens, as the sentence-transformers Pooling layer does
+            mask = attention_mask[:, :, None].astype(output.dtype)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return output / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches of similar length to keep padding small"""
+        texts = [text.replace("\n", " ") for text in texts]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def embeddings_id(embeddings):
+    """Identify a loaded model so vectors from different backends are never mixed"""
+    if isinstance(embeddings, OnnxEmbeddings):
+        return f"{EMBEDDING_MODEL}:onnx:{embeddings.onnx_file}"
+    return f"{EMBEDDING_MODEL}:torch"
+
+
+def create_embeddings(backend=None):
+    """
+    Load the sentence embedding model
+
+    Args:
+        backend: "torch" (full precision) or "onnx" (int8 quantized) (env EMBEDDING_BACKEND)
+
+    Returns:
+        Embeddings: LangChain embeddings object
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    if backend == "onnx":
+        try:
+            return OnnxEmbeddings()
+        except ImportError:
+            print("ONNX backend not installed. Install with: pip install onnxruntime tokenizers huggingface_hub")
+            print("Falling back to PyTorch embeddings")
+
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs={"device": "cpu"}
+    )
@@ -0,0 +1,218 @@
+"""
+Embedding Store Module
+Content-addressed chunk embeddings shared across documents, keyed by normalized text hash
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    SQLite store of chunk vectors so identical text is embedded only once
+
+    The file has its own disk budget, separate from the index cache's
+    INDEX_CACHE_MAX_MB even though it lives in the same directory by default.
+    Each vector records when it was last used (to the hour). Once the
+    database outgrows max_bytes, the least recently used vectors are deleted
+    down to 90% of the budget. A vector that is needed again is simply
+    re-embedded.
+    """
+
+    # Keeps IN (...) queries under SQLite's parameter limit
+    QUERY_BATCH = 500
+    # last_used granularity; reads only rewrite rows not touched within it
+    TOUCH_SECONDS = 3600
+
+    def __init__(self, namespace, path=None, max_bytes=None):
+        """
+        Open (or create) the store
+
+        Args:
+            namespace: Embedding model identity; vectors of different models never mix
+            path: SQLite file (env EMBEDDING_STORE_PATH, default inside INDEX_CACHE_DIR)
+            max_bytes: Disk budget of the database (env EMBEDDING_STORE_MAX_MB)
+        """
+        self.namespace = namespace
+        self.path = path or os.getenv(
+            "EMBEDDING_STORE_PATH",
+            os.path.join(os.getenv("INDEX_CACHE_DIR", "index_cache"), "embeddings.sqlite")
+        )
+        if max_bytes is None:
+            max_bytes = int(os.getenv("EMBEDDING_STORE_MAX_MB", "512")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.local = threading.local()
+        self.counters = {"chunks": 0, "reused": 0, "pruned": 0}
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = self._db()
+        # Return pages freed by pruning to the OS (only takes effect for a new file)
+        db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL lets worker processes read while another one writes
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(hash TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in db.execute("PRAGMA table_info(embeddings)")]
+        if "last_used" not in columns:
+            # Stores created before the budget existed
+            db.execute("ALTER TABLE embeddings ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+        db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        db.commit()
+        self.prune()
+
+        print(f"Embedding store ready: {self.path} ({max_bytes / 1024 / 1024:.0f} MB)")
+
+    def _db(self):
+        """SQLite connection of the calling thread"""
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            self.local.db = db
+        return db
+
+    @staticmethod
+    def normalize(text):
+        """Collapse whitespace so layout-only differences share one vector"""
+        return " ".join(text.split())
+
+    def key(self, normalized_text):
+        """Hash of a normalized chunk text within this store's namespace"""
+        return hashlib.sha256(f"{self.namespace}\x00{normalized_text}".encode("utf-8")).hexdigest()
+
+    def _get_many(self, keys):
+        found = {}
+        db = self._db()
+        for start in range(0, len(keys), self.QUERY_BATCH):
+            batch = keys[start:start + self.QUERY_BATCH]
+            rows = db.execute(
+                f"SELECT hash, vector FROM embeddings WHERE hash IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        self._touch(list(found))
+        return found
+
+    def _touch(self, keys):
+        """Mark vectors as used now, skipping rows already touched within TOUCH_SECONDS"""
+        if not keys:
+            return
+        now = int(time.time())
+        db = self._db()
+        for start in range(0, len(keys), self.QUERY_BATCH):
+            batch = keys[start:start + self.QUERY_BATCH]
+            db.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE last_used < ? "
+                f"AND hash IN ({','.join('?' * len(batch))})",
+                [now, now - self.TOUCH_SECONDS, *batch]
+            )
+        db.commit()
+
+    def _put_many(self, items):
+        db = self._db()
+        now = int(time.time())
+        db.executemany(
+            "INSERT OR IGNORE INTO embeddings (hash, vector, last_used) VALUES (?, ?, ?)",
+            [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        )
+        db.commit()
+        self.prune()
+
+    def size_bytes(self):
+        """Bytes of the database file (excluding the WAL)"""
+        db = self._db()
+        return db.execute("PRAGMA page_count").fetchone()[0] * db.execute("PRAGMA page_size").fetchone()[0]
+
+    def prune(self):
+        """
+        Delete least recently used vectors until the database fits 90% of max_bytes
+
+        Returns:
+            int: Number of vectors deleted
+        """
+        if self.size_bytes() <= self.max_bytes:
+            return 0
+
+        db = self._db()
+        # Free pages (from pruning, updates and page splits) go back first; the pragma
+        # releases one page per result row, so every row is fetched
+        db.execute("PRAGMA incremental_vacuum").fetchall()
+        db.commit()
+        used = self.size_bytes()
+        if used <= self.max_bytes:
+            return 0
+
+        count = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if not count:
+            return 0
+        target = int(self.max_bytes * 0.9)
+        doomed = min(count, -(-(used - target) * count // used))
+        db.execute(
+            "DELETE FROM embeddings WHERE hash IN "
+            "(SELECT hash FROM embeddings ORDER BY last_used LIMIT ?)",
+            (doomed,)
+        )
+        db.commit()
+        db.execute("PRAGMA incremental_vacuum").fetchall()
+        db.commit()
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        with self.lock:
+            self.counters["pruned"] += doomed
+        print(f"Pruned {doomed} least recently used embeddings ({used / 1024 / 1024:.1f} MB "
+              f"over the {self.max_bytes / 1024 / 1024:.0f} MB budget)")
+        return doomed
+
+    def embed(self, embeddings, texts):
+        """
+        Embed texts, reusing stored vectors for text seen before
+
+        Args:
+            embeddings: Embedding model for unseen text
+            texts: Chunk texts
+
+        Returns:
+            tuple: (list of vectors, number of texts whose vector was reused)
+        """
+        normalized = [self.normalize(text) for text in texts]
+        keys = [self.key(text) for text in normalized]
+        vectors = self._get_many(list(set(keys)))
+
+        # Unseen texts, each embedded once even if repeated in the batch
+        missing = {}
+        for key, text in zip(keys, normalized):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            new_vectors = embeddings.embed_documents(list(missing.values()))
+            vectors.update(zip(missing, new_vectors))
+            self._put_many(zip(missing, new_vectors))
+
+        reused = len(texts) - len(missing)
+        with self.lock:
+            self.counters["chunks"] += len(texts)
+            self.counters["reused"] += reused
+        return [vectors[key] for key in keys], reused
+
+    def stats(self):
+        """Get stored vector count, size against the budget and lifetime reuse"""
+        entries = self._db().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        with self.lock:
+            chunks, reused, pruned = self.counters["chunks"], self.counters["reused"], self.counters["pruned"]
+        return {
+            "entries": entries,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "chunks": chunks,
+            "reused": reused,
+            "pruned": pruned,
+            "dedup_ratio": round(reused / chunks, 4) if chunks else 0.0,
+            "path": self.path
+        }
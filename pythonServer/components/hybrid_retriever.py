@@ -0,0 +1,416 @@
+"""
+Hybrid Retriever Module
+BM25 inverted index built at ingest time, fused with dense FAISS search via reciprocal rank fusion
+"""
+
+import os
+import re
+import math
+import json
+import threading
+import numpy as np
+from collections import Counter
+from typing import Any, List
+from pydantic import Field
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+# Keeps section numbers ("3.2.1") and formula names ("h2o", "e-mc2") as single terms
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-_][a-z0-9]+)*")
+
+
+def tokenize(text):
+    """Lowercase and split text into BM25 terms"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over chunk texts, addressed by docstore id"""
+
+    FILE_NAME = "bm25.json"
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = []  # slot -> docstore id (None once removed)
+        self.slots = {}  # docstore id -> slot
+        self.lengths = []  # slot -> term count
+        self.postings = {}  # term -> {slot: term frequency}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, doc_ids, texts):
+        """
+        Index chunk texts
+
+        Args:
+            doc_ids: Docstore ids of the chunks
+            texts: Chunk texts
+        """
+        for doc_id, text in zip(doc_ids, texts):
+            terms = Counter(tokenize(text))
+            slot = len(self.ids)
+            self.ids.append(doc_id)
+            self.slots[doc_id] = slot
+            length = sum(terms.values())
+            self.lengths.append(length)
+            self.total_length += length
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, {})[slot] = frequency
+
+    def remove(self, doc_ids, texts):
+        """
+        Drop chunks from the index
+
+        Args:
+            doc_ids: Docstore ids of the chunks
+            texts: Chunk texts (used to find their postings)
+        """
+        for doc_id, text in zip(doc_ids, texts):
+            slot = self.slots.pop(doc_id, None)
+            if slot is None:
+                continue
+            self.ids[slot] = None
+            self.total_length -= self.lengths[slot]
+            for term in set(tokenize(text)):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(slot, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def search(self, query, k):
+        """
+        Rank chunks by BM25 score
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            list: [(docstore id, score)] best first
+        """
+        if not self.slots:
+            return []
+
+        doc_count = len(self.slots)
+        avg_length = self.total_length / doc_count
+        scores = {}
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for slot, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[slot] / avg_length)
+                scores[slot] = scores.get(slot, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.ids[slot], score) for slot, score in best]
+
+    @classmethod
+    def from_store(cls, store):
+        """Build an index from the chunks of an existing FAISS store"""
+        index = cls()
+        doc_ids = list(store.index_to_docstore_id.values())
+        index.add(doc_ids, [store.docstore.search(doc_id).page_content for doc_id in doc_ids])
+        return index
+
+    def materialize(self):
+        """Get a writable index (this one; mmapped indexes return a heap copy)"""
+        return self
+
+    def to_csr(self):
+        """
+        Compact the index into CSR arrays, dropping removed slots
+
+        Returns:
+            tuple: (ids, terms, lengths, offsets, posting slots, posting frequencies)
+        """
+        live = [slot for slot, doc_id in enumerate(self.ids) if doc_id is not None]
+        renumber = {slot: new_slot for new_slot, slot in enumerate(live)}
+        terms = sorted(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        slots, frequencies = [], []
+        for row, term in enumerate(terms):
+            postings = sorted((renumber[slot], frequency) for slot, frequency in self.postings[term].items())
+            slots.extend(slot for slot, _ in postings)
+            frequencies.extend(frequency for _, frequency in postings)
+            offsets[row + 1] = len(slots)
+        return (
+            [self.ids[slot] for slot in live],
+            terms,
+            np.array([self.lengths[slot] for slot in live], dtype=np.int32),
+            offsets,
+            np.array(slots, dtype=np.int32),
+            np.array(frequencies, dtype=np.int32)
+        )
+
+    def save(self, folder):
+        """Write the index into a folder as JSON vocabulary plus .npy postings arrays"""
+        ids, terms, lengths, offsets, slots, frequencies = self.to_csr()
+        for name, array in (("lengths", lengths), ("offsets", offsets), ("slots", slots), ("frequencies", frequencies)):
+            np.save(os.path.join(folder, f"bm25_{name}.npy"), array)
+        with open(os.path.join(folder, self.FILE_NAME), "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "ids": ids, "terms": terms}, f)
+
+    @classmethod
+    def load(cls, folder):
+        """
+        Read an index saved with save()
+
+        Returns:
+            MmapBM25Index (BM25Index for the older all-JSON format) or None if the folder has no index
+        """
+        path = os.path.join(folder, cls.FILE_NAME)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if "postings" not in data:
+            return MmapBM25Index(folder, data)
+
+        index = cls(data["k1"], data["b"])
+        index.ids = data["ids"]
+        index.slots = {doc_id: slot for slot, doc_id in enumerate(index.ids) if doc_id is not None}
+        index.lengths = data["lengths"]
+        index.total_length = sum(index.lengths[slot] for slot in index.slots.values())
+        # JSON object keys are strings
+        index.postings = {
+            term: {int(slot): frequency for slot, frequency in postings.items()}
+            for term, postings in data["postings"].items()
+        }
+        return index
+
+
+class MmapBM25Index(BM25Index):
+    """Read-only BM25 index whose postings stay in memory-mapped arrays"""
+
+    def __init__(self, folder, data):
+        """
+        Open an index written by BM25Index.save()
+
+        Args:
+            folder: Directory holding the index files
+            data: Parsed bm25.json
+        """
+        super().__init__(data["k1"], data["b"])
+        self.ids = data["ids"]
+        self.slots = {doc_id: slot for slot, doc_id in enumerate(self.ids)}
+        self.terms = {term: row for row, term in enumerate(data["terms"])}
+
+        def array(name):
+            return np.load(os.path.join(folder, f"bm25_{name}.npy"), mmap_mode="r")
+
+        self.lengths = array("lengths")
+        self.offsets = array("offsets")
+        self.posting_slots = array("slots")
+        self.posting_frequencies = array("frequencies")
+        self.total_length = int(self.lengths.sum())
+
+    def add(self, doc_ids, texts):
+        raise NotImplementedError("MmapBM25Index is read-only; call materialize() first")
+
+    def remove(self, doc_ids, texts):
+        raise NotImplementedError("MmapBM25Index is read-only; call materialize() first")
+
+    def _postings(self, row):
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self.posting_slots[start:end], self.posting_frequencies[start:end]
+
+    def search(self, query, k):
+        """Rank chunks by BM25 score (see BM25Index.search)"""
+        if not self.slots:
+            return []
+
+        doc_count = len(self.slots)
+        avg_length = self.total_length / doc_count
+        scores = np.zeros(doc_count, dtype=np.float64)
+
+        for term in set(tokenize(query)):
+            row = self.terms.get(term)
+            if row is None:
+                continue
+            slots, frequencies = self._postings(row)
+            idf = math.log(1 + (doc_count - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[slots] / avg_length)
+            scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        # Every matching chunk scores above zero
+        matched = np.flatnonzero(scores)
+        best = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [(self.ids[slot], float(scores[slot])) for slot in best]
+
+    def materialize(self):
+        """Copy the postings into a writable BM25Index"""
+        index = BM25Index(self.k1, self.b)
+        index.ids = list(self.ids)
+        index.slots = dict(self.slots)
+        index.lengths = [int(length) for length in self.lengths]
+        index.total_length = self.total_length
+        for term, row in self.terms.items():
+            slots, frequencies = self._postings(row)
+            index.postings[term] = dict(zip(slots.tolist(), frequencies.tolist()))
+        return index
+
+    def to_csr(self):
+        return self.ids, list(self.terms), self.lengths, self.offsets, self.posting_slots, self.posting_frequencies
+
+
+class HybridRetriever(BaseRetriever):
+    """Fuses dense FAISS and sparse BM25 rankings with reciprocal rank fusion"""
+
+    store: Any
+    bm25: Any
+    k: int = 5
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self._fuse(query, self.store.similarity_search(query, k=self.fetch_k))
+
+    def retrieve(self, query, vector):
+        """
+        Retrieve for a query whose embedding is already known, without embedding it again
+
+        Args:
+            query: Query text, for BM25
+            vector: Query embedding
+
+        Returns:
+            list: Documents, best first
+        """
+        return self._fuse(query, self.store.similarity_search_by_vector(vector, k=self.fetch_k))
+
+    def retrieve_batch(self, queries, vectors):
+        """
+        Retrieve for many queries with a single vector search call
+
+        Args:
+            queries: Query texts
+            vectors: Query embeddings in the same order
+
+        Returns:
+            list: Documents per query, best first
+        """
+        _, rows = self.store.index.search(np.asarray(vectors, dtype="float32"), self.fetch_k)
+        results = []
+        for query, query_rows in zip(queries, rows):
+            dense = []
+            for row in query_rows:
+                if row == -1:
+                    continue
+                doc_id = self.store.index_to_docstore_id[int(row)]
+                doc = self.store.docstore.search(doc_id)
+                if isinstance(doc, Document):
+                    dense.append(Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata))
+            results.append(self._fuse(query, dense))
+        return results
+
+    def _fuse(self, query, dense):
+        """Fuse dense results for a query with its BM25 ranking"""
+        sparse = self.bm25.search(query, self.fetch_k)
+
+        scores = {}
+        documents = {}
+        for rank, doc in enumerate(dense):
+            scores[doc.id] = scores.get(doc.id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+            documents[doc.id] = doc
+        for rank, (doc_id, _) in enumerate(sparse):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+
+        fused = sorted(scores, key=scores.get, reverse=True)[:self.k]
+        results = []
+        for doc_id in fused:
+            doc = documents.get(doc_id) or self.store.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                results.append(doc)
+        return results
+
+
+class LazyRetriever(HybridRetriever):
+    """
+    Hybrid retriever over a lazily ingested document
+
+    Only chunks that BM25 pre-retrieval picks for some question are embedded,
+    on first use; their vectors are added to the store and reused afterwards.
+    Questions sharing no terms with the document only see chunks embedded so far.
+
+    New vectors are written back through persist once persist_every of them
+    accumulated, and by flush() when the document leaves memory. persist runs
+    with the lock held, on_grow without it.
+    """
+
+    embed_texts: Any  # callable(texts) -> (vectors, reused count)
+    candidate_k: int = 50
+    lock: Any = Field(default_factory=threading.Lock)
+    persist: Any = None  # callable(store, bm25) writing the store back, called with the lock held
+    on_grow: Any = None  # callable() after vectors were added, e.g. to re-estimate memory
+    persist_every: int = 256
+    unsaved: int = 0
+
+    def _embed_candidates(self, queries):
+        """Embed the BM25 candidates of the queries that have no vector yet, returning how many"""
+        candidates = []
+        for query in queries:
+            candidates.extend(doc_id for doc_id, _ in self.bm25.search(query, max(self.candidate_k, self.fetch_k)))
+
+        embedded = set(self.store.index_to_docstore_id.values())
+        missing = [doc_id for doc_id in dict.fromkeys(candidates) if doc_id not in embedded]
+        if not missing:
+            return 0
+
+        texts = [self.store.docstore.search(doc_id).page_content for doc_id in missing]
+        vectors, reused = self.embed_texts(texts)
+        # The chunks are already in the docstore, so only the index and its id map grow
+        start = self.store.index.ntotal
+        self.store.index.add(np.asarray(vectors, dtype="float32"))
+        self.store.index_to_docstore_id.update({start + i: doc_id for i, doc_id in enumerate(missing)})
+        print(f"Embedded {len(missing)} chunks on demand ({reused} from the embedding store, "
+              f"{self.store.index.ntotal} of {len(self.bm25)} embedded)")
+        self.unsaved += len(missing)
+        return len(missing)
+
+    def _grown(self, added):
+        """Persist a full batch of new vectors and report the growth"""
+        if not added:
+            return
+        if self.unsaved >= self.persist_every:
+            self.flush()
+        if self.on_grow is not None:
+            self.on_grow()
+
+    def flush(self):
+        """Write vectors embedded since the last write back"""
+        with self.lock:
+            if self.unsaved and self.persist is not None:
+                self.persist(self.store, self.bm25)
+                self.unsaved = 0
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        # faiss indexes are not safe to search while vectors are added
+        with self.lock:
+            added = self._embed_candidates([query])
+            docs = super()._get_relevant_documents(query, run_manager=run_manager)
+        self._grown(added)
+        return docs
+
+    def retrieve(self, query, vector):
+        with self.lock:
+            added = self._embed_candidates([query])
+            docs = super().retrieve(query, vector)
+        self._grown(added)
+        return docs
+
+    def retrieve_batch(self, queries, vectors):
+        with self.lock:
+            added = self._embed_candidates(queries)
+            results = super().retrieve_batch(queries, vectors)
+        self._grown(added)
+        return results
@@ -0,0 +1,299 @@
+"""
+Index Cache Module
+Persists processed PDF vector stores on disk, keyed by a hash of the PDF content
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+from langchain_community.vectorstores import FAISS
+from .hybrid_retriever import BM25Index
+from .embedding_backends import embeddings_id
+from .mmap_store import save_store, load_store, has_store
+
+try:
+    import fcntl
+except ImportError:  # Windows: the manifest is only guarded within one process
+    fcntl = None
+
+
+class IndexCache:
+    """
+    Content-addressed on-disk cache of FAISS stores with LRU eviction
+
+    Entries are opened with mmap, so worker processes sharing a cache directory
+    share one copy of each index through the OS page cache. The manifest is
+    re-read under a file lock before every change.
+
+    Pinned entries (edited documents, which cannot be rebuilt from an upload)
+    count against the budget but are never evicted.
+
+    Each entry records the embedding model its vectors came from; opening it
+    with another model (e.g. after switching EMBEDDING_BACKEND) is a miss.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    LOCK_NAME = "manifest.lock"
+    # Keys are hash_file() digests, which also keeps them safe as directory names
+    KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Initialize the index cache
+
+        Args:
+            cache_dir: Directory holding cached indexes (env INDEX_CACHE_DIR)
+            max_bytes: Disk budget for all entries (env INDEX_CACHE_MAX_MB)
+        """
+        self.cache_dir = cache_dir or os.getenv("INDEX_CACHE_DIR", "index_cache")
+        if max_bytes is None:
+            max_bytes = int(os.getenv("INDEX_CACHE_MAX_MB", "2048")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+        print(f"Index cache ready: {len(self.manifest)} entries in {self.cache_dir}")
+
+    @staticmethod
+    def hash_file(path, block_size=1024 * 1024):
+        """
+        Compute the content hash used as cache key
+
+        Args:
+            path: Path to file, or binary stream (hashed from its start)
+            block_size: Bytes read per iteration
+
+        Returns:
+            str: Hex SHA-256 digest of the file content
+        """
+        digest = hashlib.sha256()
+        if not isinstance(path, (str, os.PathLike)):
+            path.seek(0)
+            for block in iter(lambda: path.read(block_size), b""):
+                digest.update(block)
+            path.seek(0)
+            return digest.hexdigest()
+
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def is_valid_key(cls, key):
+        """Check that a key has the form of a hash_file() digest (64 lowercase hex characters)"""
+        return isinstance(key, str) and cls.KEY_PATTERN.fullmatch(key) is not None
+
+    @staticmethod
+    def derive_key(parent, *parts):
+        """
+        Key of an entry derived from another one (e.g. an edited document)
+
+        Args:
+            parent: Key of the entry it was derived from
+            parts: Strings identifying the change
+
+        Returns:
+            str: Hex SHA-256 digest, distinct from any content hash
+        """
+        return hashlib.sha256("\x00".join(["derived", parent, *parts]).encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key):
+        if not self.is_valid_key(key):
+            raise ValueError(f"Invalid index cache key: {key!r}")
+        return os.path.join(self.cache_dir, key)
+
+    def _manifest_path(self):
+        return os.path.join(self.cache_dir, self.MANIFEST_NAME)
+
+    def _load_manifest(self):
+        """Load manifest, dropping entries whose directories have vanished"""
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+
+        return {
+            key: entry for key, entry in manifest.items()
+            if os.path.isdir(self._entry_dir(key))
+        }
+
+    def _save_manifest(self):
+        """Atomically write the manifest to disk"""
+        tmp_path = self._manifest_path() + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    @contextmanager
+    def _locked(self):
+        """Hold the manifest lock across threads and processes, with the manifest freshly loaded"""
+        with self.lock:
+            with open(os.path.join(self.cache_dir, self.LOCK_NAME), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.manifest = self._load_manifest()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                total += os.path.getsize(os.path.join(root, name))
+        return total
+
+    def __contains__(self, key):
+        # Entries written by other workers count too
+        return self.is_valid_key(key) and os.path.isdir(self._entry_dir(key))
+
+    def version(self, key):
+        """
+        Identify the current on-disk copy of an entry
+
+        put() swaps in a new directory, so the version changes whenever any
+        process rewrites the entry.
+
+        Returns:
+            tuple: (inode, mtime) of the entry directory, or None if absent
+        """
+        try:
+            stat = os.stat(self._entry_dir(key))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def get(self, key, embeddings):
+        """
+        Open a cached vector store
+
+        Args:
+            key: Content hash of the source document
+            embeddings: Embedding model used to query the store
+
+        Returns:
+            tuple: (FAISS store, BM25Index) or None on a cache miss, including
+            entries embedded with a different model.
+            Entries in the mmap layout are read-only; see mmap_store.materialize().
+        """
+        with self._locked():
+            entry = self.manifest.get(key)
+            if entry is None:
+                return None
+
+            model = entry["metadata"].get("embeddings")
+            if model != embeddings_id(embeddings):
+                print(f"Cached index {key[:12]} was embedded with {model or 'an unknown model'}; not reusing it")
+                return None
+
+            entry_dir = self._entry_dir(key)
+            try:
+                if has_store(entry_dir):
+                    store = load_store(entry_dir, embeddings)
+                else:
+                    # Entries cached before the mmap layout
+                    store = FAISS.load_local(
+                        entry_dir,
+                        embeddings,
+                        allow_dangerous_deserialization=True  # Only files written by put()
+                    )
+                # Entries cached before hybrid retrieval get their lexical index rebuilt
+                bm25 = BM25Index.load(entry_dir) or BM25Index.from_store(store)
+            except Exception as e:
+                print(f"⚠ Dropping unreadable cache entry {key[:12]}: {str(e)}")
+                self._remove(key)
+                self._save_manifest()
+                return None
+
+            entry["last_used"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._save_manifest()
+            return store, bm25
+
+    def metadata(self, key):
+        """Get the metadata of an entry (empty if absent)"""
+        with self._locked():
+            return dict(self.manifest.get(key, {}).get("metadata", {}))
+
+    def put(self, key, store, bm25, metadata=None, pinned=False):
+        """
+        Persist a vector store and evict least recently used entries over budget
+
+        Args:
+            key: Content hash of the source document, or a derive_key() key
+            store: FAISS store to save
+            bm25: BM25Index over the same chunks
+            metadata: Optional dict merged into the entry's existing metadata
+            pinned: Never evict this entry (it cannot be rebuilt from its source)
+        """
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        save_store(store, tmp_dir)
+        bm25.save(tmp_dir)
+
+        with self._locked():
+            # Processes that mapped the old files keep reading them until they reload
+            old_dir = f"{tmp_dir}.old"
+            if os.path.isdir(entry_dir):
+                os.replace(entry_dir, old_dir)
+            os.replace(tmp_dir, entry_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+            now = time.time()
+            previous = self.manifest.get(key, {})
+            self.manifest[key] = {
+                "size_bytes": self._dir_size(entry_dir),
+                "created": previous.get("created", now),
+                "last_used": now,
+                "hits": previous.get("hits", 0),
+                "pinned": pinned or previous.get("pinned", False),
+                "metadata": {
+                    **previous.get("metadata", {}),
+                    **(metadata or {}),
+                    "embeddings": embeddings_id(store.embedding_function)
+                }
+            }
+            self._evict(keep=key)
+            self._save_manifest()
+
+    def _remove(self, key):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+        self.manifest.pop(key, None)
+
+    def _evict(self, keep=None):
+        """Remove least recently used entries until the cache fits its budget"""
+        total = sum(entry["size_bytes"] for entry in self.manifest.values())
+        by_age = sorted(self.manifest.items(), key=lambda item: item[1]["last_used"])
+
+        for key, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if key == keep or entry.get("pinned"):
+                continue
+            total -= entry["size_bytes"]
+            self._remove(key)
+            print(f"Evicted cached index {key[:12]} ({entry['size_bytes'] / 1024 / 1024:.1f} MB)")
+
+    def stats(self):
+        """Get cache usage statistics"""
+        with self._locked():
+            return {
+                "entries": len(self.manifest),
+                "pinned": sum(1 for entry in self.manifest.values() if entry.get("pinned")),
+                "size_bytes": sum(entry["size_bytes"] for entry in self.manifest.values()),
+                "max_bytes": self.max_bytes
+            }
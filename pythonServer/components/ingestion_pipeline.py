@@ -0,0 +1,259 @@
+"""
+Ingestion Pipeline Module
+Streams PDF pages through splitting and batched embedding into a FAISS store
+"""
+
+import os
+import time
+import hashlib
+import faiss
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from .hybrid_retriever import BM25Index
+from .pdf_extractor import ParallelPDFExtractor
+
+
+def chunk_id(page, text, occurrence=0):
+    """
+    Stable chunk id derived from page number and text
+
+    Re-ingesting an unchanged page yields the same ids, so incremental updates
+    only touch chunks whose text actually changed.
+
+    Args:
+        page: 0-based page number
+        text: Chunk text
+        occurrence: Index among identical chunks on the same page
+    """
+    digest = hashlib.sha1(f"{page}\x00{occurrence}\x00{text}".encode("utf-8")).hexdigest()
+    return f"p{page}-{digest[:20]}"
+
+
+def dedup_stats(chunks, reused):
+    """Share of chunks whose vector came from the embedding store"""
+    return {
+        "chunks": chunks,
+        "reused": reused,
+        "embedded": chunks - reused,
+        "ratio": round(reused / chunks, 4) if chunks else 0.0
+    }
+
+
+class StageStats:
+    """Item count and busy time of one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.seconds = 0.0
+
+    def add(self, items, seconds):
+        self.items += items
+        self.seconds += seconds
+
+    def to_dict(self):
+        return {
+            "items": self.items,
+            "seconds": round(self.seconds, 3),
+            "items_per_second": round(self.items / self.seconds, 1) if self.seconds else None
+        }
+
+
+class StreamingIngestor:
+    """Page-by-page PDF ingestion with fixed-size embedding batches"""
+
+    def __init__(self, embeddings, splitter, batch_size=None, workers=None, extractor=None,
+                 embedding_store=None):
+        """
+        Initialize the ingestor
+
+        Args:
+            embeddings: Embedding model
+            splitter: Text splitter applied to each page
+            batch_size: Chunks embedded per batch (env EMBED_BATCH_SIZE)
+            workers: Batches embedded concurrently (env EMBED_WORKERS)
+            extractor: Optional ParallelPDFExtractor for page text
+            embedding_store: Optional EmbeddingStore reusing vectors of text seen before
+        """
+        self.embeddings = embeddings
+        self.splitter = splitter
+        self.extractor = extractor or ParallelPDFExtractor()
+        self.embedding_store = embedding_store
+        self.dimension = None
+        self.batch_size = batch_size or int(os.getenv("EMBED_BATCH_SIZE", "64"))
+        self.workers = workers or int(os.getenv("EMBED_WORKERS", "1"))
+
+    def iter_pages(self, pdf_path, stats=None):
+        """Lazily load PDF pages in order, extracted in parallel for large PDFs"""
+        stats = stats or StageStats("loading")
+        pages = self.extractor.iter_pages(pdf_path)
+        while True:
+            start = time.perf_counter()
+            page = next(pages, None)
+            stats.add(0 if page is None else 1, time.perf_counter() - start)
+            if page is None:
+                return
+            yield page
+
+    def split_page(self, page):
+        """Split one page into chunks carrying stable ids"""
+        chunks = self.splitter.split_documents([page])
+        seen = Counter()
+        for chunk in chunks:
+            page_number = chunk.metadata.get("page", 0)
+            chunk.id = chunk_id(page_number, chunk.page_content, seen[chunk.page_content])
+            seen[chunk.page_content] += 1
+        return chunks
+
+    def iter_batches(self, pages, stats):
+        """Split pages incrementally and group chunks into embedding batches"""
+        batch = []
+        for page in pages:
+            start = time.perf_counter()
+            chunks = self.split_page(page)
+            stats.add(len(chunks), time.perf_counter() - start)
+
+            for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def embed_texts(self, texts):
+        """
+        Embed chunk texts, through the embedding store when there is one
+
+        Returns:
+            tuple: (vectors, number of texts whose stored vector was reused)
+        """
+        if self.embedding_store is None:
+            return self.embeddings.embed_documents(texts), 0
+        return self.embedding_store.embed(self.embeddings, texts)
+
+    def _embed_batch(self, batch):
+        """Embed one batch, returning it with its vectors, reuse count and busy time"""
+        start = time.perf_counter()
+        vectors, reused = self.embed_texts([chunk.page_content for chunk in batch])
+        return batch, vectors, reused, time.perf_counter() - start
+
+    def build_store(self, pdf_path, progress_callback=None):
+        """
+        Build a FAISS store from a PDF without holding the whole document in memory
+
+        Args:
+            pdf_path: Path to PDF file
+            progress_callback: Optional callable(stage, **counters) for progress reporting
+
+        Returns:
+            tuple: (FAISS store, BM25Index over the same chunks, dict of per-stage throughput,
+                    dict of dedup counts {chunks, reused, embedded, ratio})
+        """
+        report = progress_callback or (lambda stage, **counters: None)
+        stats = {name: StageStats(name) for name in ("loading", "splitting", "embedding", "indexing")}
+        store = None
+        bm25 = BM25Index()
+        pages_loaded = 0
+        chunks_embedded = 0
+        chunks_reused = 0
+
+        def counted_pages():
+            nonlocal pages_loaded
+            for page in self.iter_pages(pdf_path, stats["loading"]):
+                pages_loaded += 1
+                report("loading", pages_loaded=pages_loaded, total_pages=page.metadata.get("total_pages"))
+                yield page
+
+        batches = self.iter_batches(counted_pages(), stats["splitting"])
+
+        # Keep at most 2 batches per worker in flight so memory stays bounded
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed") as executor:
+            in_flight = deque()
+
+            def fill():
+                while len(in_flight) < self.workers * 2:
+                    batch = next(batches, None)
+                    if batch is None:
+                        return
+                    in_flight.append(executor.submit(self._embed_batch, batch))
+
+            fill()
+            while in_flight:
+                batch, vectors, reused, seconds = in_flight.popleft().result()
+                stats["embedding"].add(len(batch), seconds)
+
+                start = time.perf_counter()
+                texts = [chunk.page_content for chunk in batch]
+                text_embeddings = list(zip(texts, vectors))
+                metadatas = [chunk.metadata for chunk in batch]
+                ids = [chunk.id for chunk in batch]
+                if store is None:
+                    store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=ids)
+                else:
+                    store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+                bm25.add(ids, texts)
+                stats["indexing"].add(len(batch), time.perf_counter() - start)
+
+                chunks_embedded += len(batch)
+                chunks_reused += reused
+                report("embedding", pages_loaded=pages_loaded, chunks_embedded=chunks_embedded,
+                       chunks_reused=chunks_reused)
+                fill()
+
+        if store is None:
+            raise Exception("No text could be extracted from the PDF")
+
+        throughput = {name: stage.to_dict() for name, stage in stats.items()}
+        dedup = dedup_stats(chunks_embedded, chunks_reused)
+        report("indexing", throughput=throughput, dedup=dedup)
+        return store, bm25, throughput, dedup
+
+    def build_lexical_store(self, pdf_path, progress_callback=None):
+        """
+        Extract and split a PDF without embedding it (lazy ingestion)
+
+        The returned store holds every chunk in its docstore but no vectors;
+        LazyRetriever embeds chunks as questions select them.
+
+        Args:
+            pdf_path: Path to PDF file
+            progress_callback: Optional callable(stage, **counters) for progress reporting
+
+        Returns:
+            tuple: (FAISS store with an empty index, BM25Index over all chunks, dict of per-stage throughput)
+        """
+        report = progress_callback or (lambda stage, **counters: None)
+        stats = {name: StageStats(name) for name in ("loading", "splitting", "indexing")}
+        bm25 = BM25Index()
+        docs = {}
+
+        for pages_loaded, page in enumerate(self.iter_pages(pdf_path, stats["loading"]), start=1):
+            start = time.perf_counter()
+            chunks = self.split_page(page)
+            stats["splitting"].add(len(chunks), time.perf_counter() - start)
+
+            start = time.perf_counter()
+            docs.update((chunk.id, chunk) for chunk in chunks)
+            bm25.add([chunk.id for chunk in chunks], [chunk.page_content for chunk in chunks])
+            stats["indexing"].add(len(chunks), time.perf_counter() - start)
+            report("loading", pages_loaded=pages_loaded, total_pages=page.metadata.get("total_pages"),
+                   chunks_indexed=len(docs))
+
+        if not docs:
+            raise Exception("No text could be extracted from the PDF")
+
+        if self.dimension is None:
+            self.dimension = len(self.embeddings.embed_query("dimension probe"))
+        store = FAISS(
+            embedding_function=self.embeddings,
+            index=faiss.IndexFlatL2(self.dimension),
+            docstore=InMemoryDocstore(docs),
+            index_to_docstore_id={}
+        )
+
+        throughput = {name: stage.to_dict() for name, stage in stats.items()}
+        report("indexing", throughput=throughput)
+        return store, bm25, throughput
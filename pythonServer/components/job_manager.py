@@ -0,0 +1,156 @@
+"""
+Job Manager Module
+Runs long tasks (e.g. PDF ingestion) on a bounded background worker pool with pollable progress
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued or running"""
+
+
+class Job:
+    """Progress record of a single background job"""
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def update(self, stage=None, **progress):
+        """
+        Record stage and progress counters
+
+        Args:
+            stage: Current stage name (e.g. 'loading', 'embedding')
+            **progress: Counters such as pages_loaded or chunks_embedded
+        """
+        with self.lock:
+            if stage is not None:
+                self.stage = stage
+            self.progress.update(progress)
+
+    def to_dict(self):
+        """Get a JSON-serializable snapshot of the job"""
+        with self.lock:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished
+            }
+
+
+class JobManager:
+    """Bounded worker pool that tracks jobs by id"""
+
+    def __init__(self, max_workers=None, max_pending=None, ttl_seconds=3600):
+        """
+        Initialize the job manager
+
+        Args:
+            max_workers: Concurrent jobs (env JOB_WORKERS)
+            max_pending: Queued + running jobs accepted before rejecting (env JOB_MAX_PENDING)
+            ttl_seconds: How long finished jobs stay pollable
+        """
+        self.max_workers = max_workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("JOB_MAX_PENDING", "16"))
+        self.ttl_seconds = ttl_seconds
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="job"
+        )
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+        print(f"Job manager ready ({self.max_workers} workers, {self.max_pending} pending max)")
+
+    def submit(self, kind, func, *args, **kwargs):
+        """
+        Queue a job
+
+        Args:
+            kind: Job type label (e.g. 'ingest')
+            func: Callable invoked as func(job, *args, **kwargs); its return value becomes the result
+
+        Returns:
+            str: Job id
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+        """
+        with self.lock:
+            self._cleanup()
+            pending = sum(1 for job in self.jobs.values() if job.finished is None)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Too many jobs in progress ({pending}). Please retry shortly.")
+
+            job = Job(kind)
+            self.jobs[job.id] = job
+
+        self.executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _run(self, job, func, args, kwargs):
+        """Execute a job and record its outcome"""
+        with job.lock:
+            job.status = "running"
+            job.started = time.time()
+
+        try:
+            result = func(job, *args, **kwargs)
+            with job.lock:
+                job.result = result
+                job.status = "completed"
+                job.stage = "completed"
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            with job.lock:
+                job.error = str(e)
+                job.status = "failed"
+        finally:
+            with job.lock:
+                job.finished = time.time()
+
+    def get(self, job_id):
+        """
+        Get job snapshot
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            dict: Job snapshot or None if unknown or expired
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def _cleanup(self):
+        """Forget finished jobs older than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished is not None and job.finished < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
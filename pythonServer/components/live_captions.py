@@ -0,0 +1,293 @@
+"""
+Live Captions Module
+Incremental speech-to-text for live classes: audio arrives in small frames and
+captions come back as partial and final segments
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .stt_backends import STT_MODEL, faster_whisper_model
+
+SAMPLE_RATE = 16000
+
+
+class CaptionSessionLimit(Exception):
+    """Raised when the maximum number of live caption sessions is already open"""
+
+
+class CaptionSession:
+    """Audio window and pending caption events of one speaker"""
+
+    def __init__(self, language=None):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.samples = np.zeros(0, dtype=np.float32)  # undecided audio, starting at offset
+        self.offset = 0.0  # seconds of audio already finalized or dropped
+        self.new_samples = 0  # received since the last decode was scheduled
+        self.received = 0  # total samples received
+        self.last_frame = time.time()
+        self.prompt = ""  # tail of the final captions, to keep wording consistent across windows
+        self.events = []
+        self.decoding = None  # future of the scheduled decode
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def drain(self):
+        """Take the caption events produced since the last call"""
+        with self.lock:
+            events, self.events = self.events, []
+        return events
+
+
+class LiveCaptionService:
+    """
+    Rolling-window Whisper decoding for many concurrent caption sessions
+
+    Each session keeps the audio that has not been captioned for good yet.
+    Once step_seconds of new audio arrived, the window is decoded on a shared
+    pool of cpu_budget threads (one CTranslate2 worker each). Every segment but
+    the last is final and leaves the window; the last one is a partial caption
+    that is decoded again with more audio, unless a pause follows it or the
+    window reached window_seconds. A session has at most one decode queued, so
+    audio that arrives meanwhile is folded into its next decode instead of
+    queuing work the pool cannot keep up with.
+    """
+
+    def __init__(self, model_registry=None, cpu_budget=None, max_sessions=None, model_size=None,
+                 step_seconds=None, window_seconds=None, idle_seconds=None):
+        """
+        Initialize the service and start its idle-session sweeper
+
+        Args:
+            model_registry: Optional ModelRegistry holding the caption model
+            cpu_budget: Cores used for decoding across all sessions (env STT_LIVE_CPU_BUDGET)
+            max_sessions: Open sessions accepted before rejecting (env STT_LIVE_MAX_SESSIONS)
+            model_size: Whisper model size (env STT_LIVE_MODEL, default STT_MODEL)
+            step_seconds: New audio that triggers a decode (env STT_LIVE_STEP_SECONDS)
+            window_seconds: Longest audio window before captions are forced final (env STT_LIVE_WINDOW_SECONDS)
+            idle_seconds: Sessions without frames for this long are closed (env STT_LIVE_IDLE_SECONDS)
+        """
+        cpus = os.cpu_count() or 1
+        self.model_registry = model_registry
+        self.cpu_budget = cpu_budget or int(os.getenv("STT_LIVE_CPU_BUDGET", str(max(1, cpus // 2))))
+        self.max_sessions = max_sessions or int(os.getenv("STT_LIVE_MAX_SESSIONS", "32"))
+        self.model_size = model_size or os.getenv("STT_LIVE_MODEL", os.getenv("STT_MODEL", STT_MODEL))
+        self.compute_type = os.getenv("STT_COMPUTE_TYPE", "int8")
+        self.step_seconds = step_seconds or float(os.getenv("STT_LIVE_STEP_SECONDS", "1.0"))
+        self.window_seconds = window_seconds or float(os.getenv("STT_LIVE_WINDOW_SECONDS", "15"))
+        self.idle_seconds = idle_seconds or int(os.getenv("STT_LIVE_IDLE_SECONDS", "60"))
+        # A partial caption becomes final once this much silence follows it
+        self.pause_seconds = 0.8
+
+        self.executor = ThreadPoolExecutor(max_workers=self.cpu_budget, thread_name_prefix="captions")
+        self.sessions = {}
+        self.counters = {"sessions": 0, "decodes": 0, "decode_seconds": 0.0, "audio_seconds": 0.0,
+                         "finals": 0, "rejected": 0, "max_lag": 0.0}
+        self.lock = threading.Lock()
+
+        self.sweeper = threading.Thread(target=self._sweep_loop, name="captions-sweeper", daemon=True)
+        self.sweeper.start()
+
+        print(f"Live captions ready ({self.cpu_budget} cores, {self.max_sessions} sessions max, "
+              f"{self.step_seconds}s step, {self.window_seconds}s window)")
+
+    def _model(self):
+        # One CTranslate2 worker per core of the budget, single-threaded, so sessions decode side by side
+        return faster_whisper_model(
+            self.model_size, self.compute_type, cpu_threads=1,
+            model_registry=self.model_registry, num_workers=self.cpu_budget
+        )
+
+    def start(self, language=None):
+        """
+        Open a caption session
+
+        Args:
+            language: Language code, or None to detect it on every window
+
+        Returns:
+            str: Session id
+
+        Raises:
+            CaptionSessionLimit: If max_sessions are already open
+        """
+        with self.lock:
+            if len(self.sessions) >= self.max_sessions:
+                self.counters["rejected"] += 1
+                raise CaptionSessionLimit(f"Too many live caption sessions ({len(self.sessions)}). Please retry shortly.")
+            session = CaptionSession(language)
+            self.sessions[session.id] = session
+            self.counters["sessions"] += 1
+        return session.id
+
+    def get(self, session_id):
+        """Get an open session, or None if unknown or closed"""
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def add_audio(self, session, pcm):
+        """
+        Append an audio frame and schedule a decode when enough new audio arrived
+
+        Args:
+            session: CaptionSession from get()
+            pcm: 16 kHz mono signed 16-bit little-endian PCM bytes
+
+        Returns:
+            list: Caption events finished since the previous call
+        """
+        samples = np.frombuffer(pcm[:len(pcm) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+        with session.lock:
+            session.samples = np.concatenate([session.samples, samples])
+            session.new_samples += len(samples)
+            session.received += len(samples)
+            session.last_frame = time.time()
+            if session.decoding is None and session.new_samples >= self.step_seconds * SAMPLE_RATE:
+                self._schedule(session)
+        return session.drain()
+
+    def _schedule(self, session):
+        """Queue a decode of the session's window (caller holds session.lock)"""
+        session.new_samples = 0
+        session.decoding = self.executor.submit(self._decode, session, False)
+
+    def finish(self, session_id, timeout=None):
+        """
+        Close a session, captioning the rest of its audio as final
+
+        Args:
+            session_id: Id returned by start()
+            timeout: Seconds to wait for the last decode
+
+        Returns:
+            list: Remaining caption events, or None if the session is unknown
+        """
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+
+        with session.lock:
+            session.closed = True
+            pending = session.decoding
+        if pending is not None:
+            pending.result(timeout)
+        self.executor.submit(self._decode, session, True).result(timeout)
+        return session.drain()
+
+    def _decode(self, session, final):
+        """Decode a session's window and turn its segments into caption events"""
+        with session.lock:
+            samples = session.samples
+            offset = session.offset
+            language = session.language
+            prompt = session.prompt
+            received = session.received
+
+        duration = len(samples) / SAMPLE_RATE
+        segments = []
+        start = time.time()
+        try:
+            if len(samples):
+                with self._model() as model:
+                    decoded, _ = model.transcribe(
+                        samples,
+                        language=language,
+                        beam_size=1,
+                        vad_filter=True,
+                        vad_parameters={"min_silence_duration_ms": 300},
+                        condition_on_previous_text=False,
+                        initial_prompt=prompt or None
+                    )
+                    segments = [(segment.start, segment.end, segment.text.strip()) for segment in decoded]
+                    segments = [segment for segment in segments if segment[2]]
+        except Exception as e:
+            print(f"Live caption decode failed ({session.id}): {str(e)}")
+            segments = []
+        elapsed = time.time() - start
+
+        if final:
+            done, keep_from = segments, len(samples)
+        elif not segments:
+            # Silence: keep only a short tail in case a word is starting
+            done, keep_from = [], max(0, len(samples) - int(self.pause_seconds * SAMPLE_RATE))
+        else:
+            done = segments[:-1]
+            if duration - segments[-1][1] >= self.pause_seconds or duration >= self.window_seconds:
+                done = segments
+            if len(done) < len(segments):
+                keep_from = int(segments[len(done)][0] * SAMPLE_RATE)
+            else:
+                keep_from = int(min(done[-1][1] + 0.2, duration) * SAMPLE_RATE)
+
+        events = [
+            {"type": "final", "text": text, "start": round(offset + seg_start, 2), "end": round(offset + seg_end, 2)}
+            for seg_start, seg_end, text in done
+        ]
+        if len(done) < len(segments):
+            seg_start, seg_end, text = segments[-1]
+            events.append(
+                {"type": "partial", "text": text, "start": round(offset + seg_start, 2), "end": round(offset + seg_end, 2)}
+            )
+
+        with session.lock:
+            # Frames that arrived during the decode sit after the decoded window and are kept
+            session.samples = session.samples[keep_from:]
+            session.offset = offset + keep_from / SAMPLE_RATE
+            if done:
+                session.prompt = (prompt + " " + " ".join(text for _, _, text in done)).strip()[-200:]
+            session.events.extend(events)
+            session.decoding = None
+            # Audio decoded so far trails the newest frame by this much
+            lag = (session.received - received) / SAMPLE_RATE + elapsed
+            if not session.closed and session.new_samples >= self.step_seconds * SAMPLE_RATE:
+                self._schedule(session)
+
+        with self.lock:
+            self.counters["decodes"] += 1
+            self.counters["decode_seconds"] += elapsed
+            self.counters["audio_seconds"] += duration
+            self.counters["finals"] += len(done)
+            self.counters["max_lag"] = max(self.counters["max_lag"], round(lag, 3))
+
+    def sweep(self):
+        """Close sessions that stopped sending frames"""
+        cutoff = time.time() - self.idle_seconds
+        with self.lock:
+            idle = [session_id for session_id, session in self.sessions.items() if session.last_frame < cutoff]
+            for session_id in idle:
+                self.sessions[session_id].closed = True
+                del self.sessions[session_id]
+        if idle:
+            print(f"Closed {len(idle)} idle live caption sessions")
+        return idle
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(max(1, self.idle_seconds // 4))
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Live caption sweep failed: {str(e)}")
+
+    def stats(self):
+        """Get open sessions, decode throughput and the worst caption lag seen"""
+        with self.lock:
+            counters = dict(self.counters)
+            open_sessions = len(self.sessions)
+        return {
+            **counters,
+            "decode_seconds": round(counters["decode_seconds"], 3),
+            "audio_seconds": round(counters["audio_seconds"], 3),
+            "open_sessions": open_sessions,
+            "max_sessions": self.max_sessions,
+            "cpu_budget": self.cpu_budget,
+            "step_seconds": self.step_seconds,
+            "window_seconds": self.window_seconds
+        }
@@ -0,0 +1,204 @@
+"""
+Mmap Store Module
+On-disk FAISS store layout that worker processes open with mmap and share through the page cache
+"""
+
+import os
+import json
+import numpy as np
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+
+INDEX_FILE = "index.faiss"
+LAYOUT_FILE = "layout.json"
+RECORDS_FILE = "docstore.bin"
+OFFSETS_FILE = "docstore_offsets.npy"
+
+
+def mmap_flags(index):
+    """
+    faiss read flags that leave an index's vector data on disk
+
+    IVF inverted lists map with IO_FLAG_MMAP; flat codes (flat, sq8, fp16 and
+    HNSW storage) with IO_FLAG_MMAP_IFC. faiss rejects the two combined.
+    """
+    if faiss.try_extract_index_ivf(index) is not None:
+        return faiss.IO_FLAG_MMAP
+    return faiss.IO_FLAG_MMAP_IFC
+
+
+class MmapDocstore:
+    """Read-only docstore over JSON records in a memory-mapped file"""
+
+    def __init__(self, folder, ids):
+        """
+        Open the records of a saved store
+
+        Args:
+            folder: Directory written by save_store()
+            ids: Docstore ids in record order
+        """
+        self.folder = folder
+        self.rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        self.mapped_index = None  # index opened from the same folder, set by load_store()
+        self.offsets = np.load(os.path.join(folder, OFFSETS_FILE), mmap_mode="r")
+        size = int(self.offsets[-1])
+        # np.memmap cannot map an empty file
+        self.records = np.memmap(os.path.join(folder, RECORDS_FILE), dtype=np.uint8, mode="r") if size else b""
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(self, search):
+        """Get the Document with the given id, or a not-found message like InMemoryDocstore"""
+        row = self.rows.get(search)
+        if row is None:
+            return f"ID {search} not found."
+        record = json.loads(bytes(self.records[int(self.offsets[row]):int(self.offsets[row + 1])]))
+        return Document(id=search, page_content=record["text"], metadata=record["metadata"])
+
+    def add(self, texts):
+        raise NotImplementedError("MmapDocstore is read-only; call materialize() first")
+
+    def delete(self, ids):
+        raise NotImplementedError("MmapDocstore is read-only; call materialize() first")
+
+
+def is_mmapped(store):
+    """Whether a store was opened with load_store()"""
+    return isinstance(store.docstore, MmapDocstore)
+
+
+def index_is_mapped(store):
+    """Whether a store's vectors are still read from its mapped file (not copied by materialize_index())"""
+    return is_mmapped(store) and store.index is store.docstore.mapped_index
+
+
+def docstore_ids(store):
+    """Ids of every chunk in a store's docstore, embedded or not"""
+    if is_mmapped(store):
+        return list(store.docstore.rows)
+    return list(store.docstore._dict)
+
+
+def pending_ids(store):
+    """Ids of chunks in the docstore that have no vector yet (lazy ingestion)"""
+    embedded = set(store.index_to_docstore_id.values())
+    return [doc_id for doc_id in docstore_ids(store) if doc_id not in embedded]
+
+
+def save_store(store, folder):
+    """
+    Write a FAISS store in the mmap layout
+
+    Args:
+        store: FAISS store (in-memory or mmapped)
+        folder: Existing directory to write into
+    """
+    ids = [store.index_to_docstore_id[row] for row in range(store.index.ntotal)]
+    pending = pending_ids(store)
+    faiss.write_index(store.index, os.path.join(folder, INDEX_FILE))
+
+    # Records of embedded chunks in index row order, then the not yet embedded ones
+    offsets = np.zeros(len(ids) + len(pending) + 1, dtype=np.int64)
+    with open(os.path.join(folder, RECORDS_FILE), "wb") as f:
+        for row, doc_id in enumerate(ids + pending):
+            doc = store.docstore.search(doc_id)
+            record = json.dumps({"text": doc.page_content, "metadata": doc.metadata}).encode("utf-8")
+            f.write(record)
+            offsets[row + 1] = offsets[row] + len(record)
+    np.save(os.path.join(folder, OFFSETS_FILE), offsets)
+
+    with open(os.path.join(folder, LAYOUT_FILE), "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "pending": pending, "mmap_flags": mmap_flags(store.index)}, f)
+
+
+def has_store(folder):
+    """Whether a directory holds a store written by save_store()"""
+    return os.path.exists(os.path.join(folder, LAYOUT_FILE))
+
+
+def load_store(folder, embeddings):
+    """
+    Open a store written by save_store() without reading it into the heap
+
+    Vector codes and chunk records stay in the OS page cache, shared by every
+    process that opens the same files.
+
+    Args:
+        folder: Directory written by save_store()
+        embeddings: Embedding model used to query the store
+
+    Returns:
+        FAISS: Read-only store
+    """
+    with open(os.path.join(folder, LAYOUT_FILE), "r", encoding="utf-8") as f:
+        layout = json.load(f)
+    ids = layout["ids"]
+    docstore = MmapDocstore(folder, ids + layout.get("pending", []))
+    docstore.mapped_index = faiss.read_index(os.path.join(folder, INDEX_FILE), layout["mmap_flags"])
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=docstore.mapped_index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids))
+    )
+
+
+def materialize(store):
+    """
+    Copy a mmapped store into the heap so it can be modified
+
+    faiss aborts the process when a mapped index is written to, so every
+    mutation path must go through this first.
+
+    Args:
+        store: FAISS store
+
+    Returns:
+        FAISS: Writable store (the store itself if it is not mmapped)
+    """
+    if not is_mmapped(store):
+        return store
+
+    return FAISS(
+        embedding_function=store.embedding_function,
+        index=_heap_index(store),
+        docstore=InMemoryDocstore({doc_id: store.docstore.search(doc_id) for doc_id in docstore_ids(store)}),
+        index_to_docstore_id=dict(store.index_to_docstore_id)
+    )
+
+
+def materialize_index(store):
+    """
+    Copy only the vector index of a mmapped store into the heap
+
+    For stores that grow by adding vectors for chunks already in the docstore
+    (lazy ingestion); the chunk records stay mapped.
+
+    Args:
+        store: FAISS store
+
+    Returns:
+        FAISS: Store whose index accepts new vectors
+    """
+    if not is_mmapped(store):
+        return store
+
+    return FAISS(
+        embedding_function=store.embedding_function,
+        index=_heap_index(store),
+        docstore=store.docstore,
+        index_to_docstore_id=dict(store.index_to_docstore_id)
+    )
+
+
+def _heap_index(store):
+    if faiss.try_extract_index_ivf(store.index) is not None:
+        # Mapped IVF lists serialize as references to their file; read it into the heap instead
+        return faiss.read_index(os.path.join(store.docstore.folder, INDEX_FILE))
+    return faiss.deserialize_index(faiss.serialize_index(store.index))
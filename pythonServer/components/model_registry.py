@@ -0,0 +1,284 @@
+"""
+Model Registry Module
+Loads ML models on demand, shares one instance per model between services and evicts idle ones under a memory budget
+"""
+
+import os
+import gc
+import time
+import ctypes
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+
+def resident_bytes():
+    """Resident memory of this process, or 0 where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def release_memory():
+    """Collect dropped models and hand freed heap pages back to the OS"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):  # not glibc
+        pass
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models keyed by name
+
+    Services ask for a model by name (e.g. 'faster-whisper:base:int8') together
+    with a loader; the first request loads it and later ones, from any service,
+    get the same instance. Each model's size is the growth in resident memory
+    while it loaded (loads are serialized so they do not overlap).
+
+    When loaded models exceed the memory budget, the least recently used ones
+    that have been idle for idle_seconds are dropped. Models in use (inside
+    using()) or pinned are never evicted.
+
+    Models loaded outside this process (e.g. by transcription worker processes)
+    are recorded with reserve(); they count against the budget and in stats()
+    but cannot be evicted from here.
+    """
+
+    def __init__(self, max_bytes=None, idle_seconds=None, sweep_interval=None):
+        """
+        Initialize the registry and start its idle sweeper
+
+        Args:
+            max_bytes: Memory budget for loaded models (env MODEL_REGISTRY_MAX_MB)
+            idle_seconds: Minimum idle time before a model may be evicted (env MODEL_IDLE_SECONDS)
+            sweep_interval: Seconds between budget checks (env MODEL_SWEEP_INTERVAL)
+        """
+        if max_bytes is None:
+            max_bytes = int(os.getenv("MODEL_REGISTRY_MAX_MB", "4096")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds if idle_seconds is not None else int(os.getenv("MODEL_IDLE_SECONDS", "600"))
+        self.sweep_interval = sweep_interval or int(os.getenv("MODEL_SWEEP_INTERVAL", "60"))
+
+        self.entries = OrderedDict()  # name -> entry, least recently used first
+        self.known_sizes = {}  # name -> size at its last load, to make room before reloading
+        self.reserved = {}  # name -> {size_bytes, since} of models held by other processes
+        self.counters = {"loads": 0, "evictions": 0}
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+
+        self.sweeper = threading.Thread(target=self._sweep_loop, name="model-registry-sweeper", daemon=True)
+        self.sweeper.start()
+
+        print(f"Model registry ready (budget {max_bytes / 1024 / 1024:.0f} MB, idle after {self.idle_seconds}s)")
+
+    def get(self, name, loader, pinned=False):
+        """
+        Get a model, loading it if needed
+
+        Args:
+            name: Model identity; equal names share one instance
+            loader: Callable returning the model
+            pinned: Never evict this model (e.g. the embedder every request uses)
+
+        Returns:
+            The loaded model
+        """
+        with self.lock:
+            entry = self._touch(name)
+            if entry is not None:
+                entry["pinned"] = entry["pinned"] or pinned
+                return entry["model"]
+
+        # One load at a time, so the memory delta belongs to this model
+        with self.load_lock:
+            with self.lock:
+                entry = self._touch(name)
+                if entry is not None:
+                    entry["pinned"] = entry["pinned"] or pinned
+                    return entry["model"]
+                evicted = self._evict(self.known_sizes.get(name, 0))
+            if evicted:
+                release_memory()
+
+            before = resident_bytes()
+            start = time.time()
+            model = loader()
+            size = max(resident_bytes() - before, 0)
+
+            with self.lock:
+                now = time.time()
+                self.entries[name] = {
+                    "model": model,
+                    "size_bytes": size,
+                    "load_seconds": round(now - start, 3),
+                    "loaded": now,
+                    "last_used": now,
+                    "uses": 1,
+                    "active": 0,
+                    "pinned": pinned
+                }
+                self.known_sizes[name] = size
+                self.counters["loads"] += 1
+                evicted = self._evict(0, keep=name)
+            if evicted:
+                release_memory()
+
+        print(f"Model loaded: {name} ({size / 1024 / 1024:.0f} MB in {now - start:.1f}s)")
+        return model
+
+    @contextmanager
+    def using(self, name, loader):
+        """
+        Hold a model for the duration of a with block so it cannot be evicted
+
+        Args:
+            name: Model identity
+            loader: Callable returning the model
+        """
+        while True:
+            model = self.get(name, loader)
+            with self.lock:
+                entry = self.entries.get(name)
+                # Evicted between get() and here: load it again
+                if entry is not None and entry["model"] is model:
+                    entry["active"] += 1
+                    break
+
+        try:
+            yield model
+        finally:
+            with self.lock:
+                entry["active"] -= 1
+                entry["last_used"] = time.time()
+
+    def _touch(self, name):
+        entry = self.entries.get(name)
+        if entry is not None:
+            entry["last_used"] = time.time()
+            entry["uses"] += 1
+            self.entries.move_to_end(name)
+        return entry
+
+    def _evict(self, incoming, keep=None):
+        """Drop idle models, least recently used first, until incoming bytes fit the budget"""
+        total = sum(entry["size_bytes"] for entry in self.entries.values()) + incoming
+        total += sum(reservation["size_bytes"] for reservation in self.reserved.values())
+        cutoff = time.time() - self.idle_seconds
+        evicted = []
+        for name, entry in list(self.entries.items()):
+            if total <= self.max_bytes:
+                break
+            if name == keep or entry["pinned"] or entry["active"] or entry["last_used"] > cutoff:
+                continue
+            del self.entries[name]
+            total -= entry["size_bytes"]
+            evicted.append(name)
+
+        if evicted:
+            self.counters["evictions"] += len(evicted)
+            print(f"Evicted idle models: {', '.join(evicted)}")
+        return evicted
+
+    def evict(self, name):
+        """
+        Drop a model now unless it is in use
+
+        Returns:
+            bool: Whether the model was dropped
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None or entry["active"]:
+                return False
+            del self.entries[name]
+            self.counters["evictions"] += 1
+        release_memory()
+        print(f"Evicted model: {name}")
+        return True
+
+    def reserve(self, name, size_bytes):
+        """
+        Count a model loaded by another process against the budget
+
+        Idle models of this process are evicted to make room; if the
+        reservations alone exceed the budget a warning is printed.
+
+        Args:
+            name: Model identity, unique per process (e.g. '...:worker<pid>')
+            size_bytes: Memory the model takes in that process
+        """
+        with self.lock:
+            self.reserved[name] = {"size_bytes": size_bytes, "since": time.time()}
+            evicted = self._evict(0)
+            reserved = sum(reservation["size_bytes"] for reservation in self.reserved.values())
+        if evicted:
+            release_memory()
+        print(f"Model reserved: {name} ({size_bytes / 1024 / 1024:.0f} MB in another process)")
+        if reserved > self.max_bytes:
+            print(f"Warning: models in other processes take {reserved / 1024 / 1024:.0f} MB, "
+                  f"over the {self.max_bytes / 1024 / 1024:.0f} MB model budget")
+
+    def release(self, names):
+        """Stop counting models of other processes (e.g. after their workers exited)"""
+        with self.lock:
+            for name in names:
+                self.reserved.pop(name, None)
+
+    def loaded(self):
+        """Names of loaded models"""
+        with self.lock:
+            return list(self.entries)
+
+    def sweep(self):
+        """Enforce the budget now that more models may have gone idle"""
+        with self.lock:
+            evicted = self._evict(0)
+        if evicted:
+            release_memory()
+        return evicted
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Model registry sweep failed: {str(e)}")
+
+    def stats(self):
+        """Get loaded and reserved models with their size and usage, and totals against the budget"""
+        now = time.time()
+        with self.lock:
+            models = [
+                {
+                    "name": name,
+                    "size_bytes": entry["size_bytes"],
+                    "load_seconds": entry["load_seconds"],
+                    "loaded": entry["loaded"],
+                    "idle_seconds": round(now - entry["last_used"], 1),
+                    "uses": entry["uses"],
+                    "in_use": entry["active"],
+                    "pinned": entry["pinned"]
+                }
+                for name, entry in self.entries.items()
+            ]
+            reserved = [
+                {"name": name, "size_bytes": reservation["size_bytes"], "since": reservation["since"]}
+                for name, reservation in self.reserved.items()
+            ]
+            counters = dict(self.counters)
+        reserved_bytes = sum(reservation["size_bytes"] for reservation in reserved)
+        return {
+            "models": models,
+            "reserved": reserved,
+            "reserved_bytes": reserved_bytes,
+            "size_bytes": sum(model["size_bytes"] for model in models) + reserved_bytes,
+            "max_bytes": self.max_bytes,
+            "idle_seconds": self.idle_seconds,
+            "process_rss_bytes": resident_bytes(),
+            **counters
+        }
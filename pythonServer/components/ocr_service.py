@@ -3,29 +3,31 @@ OCR Service Module
 Handles image text extraction and question answering using OCR + LLM
 """
 
-import os
 import easyocr
 import numpy as np
 from PIL import Image
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
+from .model_registry import ModelRegistry
+from .uploads import source_name
 
 
 class OCRService:
     """Service class for OCR and image-based question answering"""
     
-    def __init__(self, groq_api_key):
+    def __init__(self, groq_api_key, model_registry=None):
         """
         Initialize OCR service with API key
         
         Args:
             groq_api_key: GROQ API key for LLM
+            model_registry: Optional ModelRegistry shared with other services for EasyOCR readers
         """
         if not groq_api_key:
             raise ValueError("GROQ_API_KEY is required")
         
         self.groq_api_key = groq_api_key
-        self.reader = None
+        self.model_registry = model_registry or ModelRegistry()
         self.llm = None
         
         print("OCR Service initialized")
@@ -40,45 +42,51 @@ class OCRService:
         Returns:
             reader: EasyOCR Reader object
         """
-        if self.reader is None:
-            try:
-                print(f"Loading OCR model for languages: {languages}")
-                self.reader = easyocr.Reader(
-                    languages,
-                    gpu=False,  # Set to True if you have CUDA-enabled GPU
-                    verbose=False
-                )
-                print("OCR model loaded successfully")
-            except Exception as e:
-                raise Exception(f"Error loading OCR model: {str(e)}")
-        
-        return self.reader
+        try:
+            return self.model_registry.get(self._reader_name(languages), lambda: self._create_reader(languages))
+        except Exception as e:
+            raise Exception(f"Error loading OCR model: {str(e)}")
     
-    def extract_text_from_image(self, image_path):
+    @staticmethod
+    def _reader_name(languages):
+        """Model registry name of the reader for a language set"""
+        return "easyocr:" + ",".join(sorted(languages))
+    
+    @staticmethod
+    def _create_reader(languages):
+        print(f"Loading OCR model for languages: {languages}")
+        reader = easyocr.Reader(
+            languages,
+            gpu=False,  # Set to True if you have CUDA-enabled GPU
+            verbose=False
+        )
+        print("OCR model loaded successfully")
+        return reader
+    
+    def extract_text_from_image(self, image_path, languages=['en', 'hi']):
         """
         Extract text from image using OCR
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or binary stream of it (e.g. Upload.source())
+            languages: OCR languages to use
             
         Returns:
             str: Extracted text from image
         """
         try:
-            # Load OCR reader if not already loaded
-            if self.reader is None:
-                self.load_ocr_reader()
-            
             # Read image
             image = Image.open(image_path)
             
             # Convert PIL image to numpy array
             image_np = np.array(image)
             
-            print(f"Processing image: {os.path.basename(image_path)}")
+            print(f"Processing image: {source_name(image_path)}")
             
-            # Extract text using EasyOCR
-            results = self.reader.readtext(image_np)
+            # Extract text using EasyOCR (held so the registry cannot evict it mid-read)
+            reader_name = self._reader_name(languages)
+            with self.model_registry.using(reader_name, lambda: self._create_reader(languages)) as reader:
+                results = reader.readtext(image_np)
             
             # Combine all detected text
             extracted_text = ""
@@ -118,6 +126,45 @@ class OCRService:
         
         return self.llm
     
+    def _build_answer_chain(self):
+        """
+        Build prompt | LLM chain for answering questions about extracted text
+        
+        Returns:
+            chain: LangChain runnable expecting extracted_text and user_question
+        """
+        # Load LLM if not already loaded
+        if self.llm is None:
+            self.load_llm()
+        
+        # Create prompt template
+        prompt = ChatPromptTemplate.from_template("""
+        You are an intelligent AI assistant helping students understand questions from images.
+        
+        The following text was extracted from an image using OCR:
+        
+        --------------------
+        Extracted Text:
+        {extracted_text}
+        --------------------
+        
+        Student's Question:
+        {user_question}
+        
+        Instructions:
+        1. If the extracted text contains a mathematical problem, solve it step-by-step
+        2. If it's a conceptual question, provide a clear explanation
+        3. If the OCR text seems incomplete or unclear, work with what's available and mention any assumptions
+        4. Provide examples where helpful
+        5. Break down complex problems into simple steps
+        6. If the question cannot be answered from the extracted text, say so clearly
+        
+        Answer:
+        """)
+        
+        # Create chain
+        return prompt | self.llm
+    
     def answer_question(self, extracted_text, user_question):
         """
         Answer user's question based on extracted text from image
@@ -130,37 +177,7 @@ class OCRService:
             str: AI-generated answer
         """
         try:
-            # Load LLM if not already loaded
-            if self.llm is None:
-                self.load_llm()
-            
-            # Create prompt template
-            prompt = ChatPromptTemplate.from_template("""
-            You are an intelligent AI assistant helping students understand questions from images.
-            
-            The following text was extracted from an image using OCR:
-            
-            --------------------
-            Extracted Text:
-            {extracted_text}
-            --------------------
-            
-            Student's Question:
-            {user_question}
-            
-            Instructions:
-            1. If the extracted text contains a mathematical problem, solve it step-by-step
-            2. If it's a conceptual question, provide a clear explanation
-            3. If the OCR text seems incomplete or unclear, work with what's available and mention any assumptions
-            4. Provide examples where helpful
-            5. Break down complex problems into simple steps
-            6. If the question cannot be answered from the extracted text, say so clearly
-            
-            Answer:
-            """)
-            
-            # Create chain
-            chain = prompt | self.llm
+            chain = self._build_answer_chain()
             
             print(f"Processing question: {user_question[:100]}...")
             
@@ -179,12 +196,34 @@ class OCRService:
         except Exception as e:
             raise Exception(f"Error answering question: {str(e)}")
     
+    def answer_question_stream(self, extracted_text, user_question):
+        """
+        Answer user's question, yielding text as the model produces it
+        
+        Args:
+            extracted_text: Text extracted from image via OCR
+            user_question: User's question about the image
+            
+        Yields:
+            str: Answer text fragments
+        """
+        chain = self._build_answer_chain()
+        
+        print(f"Streaming answer for: {user_question[:100]}...")
+        
+        for chunk in chain.stream({
+            "extracted_text": extracted_text,
+            "user_question": user_question
+        }):
+            if chunk.content:
+                yield chunk.content
+    
     def process_image_and_question(self, image_path, user_question, languages=['en', 'hi']):
         """
         Complete workflow: Extract text from image and answer question
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or binary stream of it
             user_question: User's question
             languages: OCR languages to use
             
@@ -192,11 +231,8 @@ class OCRService:
             dict: {extracted_text, answer}
         """
         try:
-            # Load OCR reader with specified languages
-            self.load_ocr_reader(languages)
-            
-            # Extract text from image
-            extracted_text = self.extract_text_from_image(image_path)
+            # Extract text from image with the reader for the specified languages
+            extracted_text = self.extract_text_from_image(image_path, languages)
             
             # Answer the question
             answer = self.answer_question(extracted_text, user_question)
@@ -246,6 +282,8 @@ class OCRService:
     
     def cleanup(self):
         """Clean up resources"""
-        self.reader = None
+        for name in self.model_registry.loaded():
+            if name.startswith("easyocr:"):
+                self.model_registry.evict(name)
         self.llm = None
         print("OCR Service resources cleaned up")
\ No newline at end of file
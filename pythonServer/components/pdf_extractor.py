@@ -0,0 +1,155 @@
+"""
+PDF Extractor Module
+Extracts PDF page text in page-range shards across a process pool
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pypdf import PdfReader
+from langchain_core.documents import Document
+from .uploads import source_name
+from .worker_pool import pool_context
+
+
+def _extract_pages(reader, start, end):
+    """Extract (page number, page label, text) for pages [start, end) of an open reader"""
+    pages = []
+    for number in range(start, min(end, len(reader.pages))):
+        text = reader.pages[number].extract_text(extraction_mode="plain")
+        pages.append((number, reader.page_labels[number], text.strip()))
+    return pages
+
+
+def extract_page_range(pdf_path, start, end):
+    """
+    Extract the text of pages [start, end) of a PDF
+
+    Runs inside pool workers; each worker opens the file itself so only the
+    path and page numbers cross the process boundary.
+
+    Returns:
+        list: [(page number, page label, text)] in page order
+    """
+    return _extract_pages(PdfReader(pdf_path), start, end)
+
+
+class ParallelPDFExtractor:
+    """Page-range sharded PDF text extraction with in-order merging"""
+
+    def __init__(self, workers=None, shard_pages=None, min_pages=None):
+        """
+        Initialize the extractor
+
+        Args:
+            workers: Extraction processes (env PDF_EXTRACT_WORKERS, default: CPU count)
+            shard_pages: Pages per shard (env PDF_SHARD_PAGES)
+            min_pages: Smaller PDFs are extracted in-process (env PDF_PARALLEL_MIN_PAGES)
+        """
+        self.workers = workers or int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+        self.shard_pages = shard_pages or int(os.getenv("PDF_SHARD_PAGES", "16"))
+        self.min_pages = min_pages or int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def start(self, after_startup=False):
+        """
+        Start the worker processes
+
+        At startup, call before request threads and model thread pools exist:
+        on POSIX the workers are forked, and a fork context launches every
+        worker at the first submit. Starts from request threads (after the pool
+        broke) pass after_startup and use a forkserver instead.
+
+        Args:
+            after_startup: Started while the server is running (see worker_pool.pool_context)
+        """
+        if self.workers < 2:
+            return
+
+        with self.lock:
+            if self.pool is not None:
+                return
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context(after_startup))
+            self.pool.submit(os.getpid).result()
+
+        print(f"PDF extraction pool started ({self.workers} workers, {self.shard_pages} pages per shard)")
+
+    def _reset_pool(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+    def iter_pages(self, pdf_path):
+        """
+        Lazily yield PDF pages as Documents, in page order
+
+        Pages carry source, total_pages, page (0-based) and page_label metadata
+        like PyPDFLoader. Large PDFs are sharded across the pool with at most two
+        shards per worker in flight; shards are yielded in order as they finish.
+
+        Args:
+            pdf_path: Path to PDF file, or binary stream of it (e.g. an in-memory upload)
+        """
+        reader = PdfReader(pdf_path)
+        total_pages = len(reader.pages)
+        is_path = isinstance(pdf_path, (str, os.PathLike))
+        metadata = {"source": pdf_path if is_path else source_name(pdf_path), "total_pages": total_pages}
+
+        def to_documents(shard):
+            for number, label, text in shard:
+                yield Document(
+                    page_content=text,
+                    metadata={**metadata, "page": number, "page_label": label}
+                )
+
+        next_page = 0
+        pool = None
+        if total_pages >= self.min_pages:
+            self.start(after_startup=True)
+            pool = self.pool
+
+        if pool is not None:
+            shared = pdf_path
+            if not is_path:
+                # Workers get a path, never the PDF itself: spool an in-memory upload to disk once
+                pdf_path.seek(0)
+                with tempfile.NamedTemporaryFile(prefix="pdf_", suffix=".pdf", delete=False) as f:
+                    shutil.copyfileobj(pdf_path, f)
+                shared = f.name
+            starts = iter(range(0, total_pages, self.shard_pages))
+            in_flight = deque()
+
+            def fill():
+                while len(in_flight) < self.workers * 2:
+                    start = next(starts, None)
+                    if start is None:
+                        return
+                    in_flight.append(
+                        pool.submit(extract_page_range, shared, start, start + self.shard_pages)
+                    )
+
+            try:
+                fill()
+                while in_flight:
+                    shard = in_flight.popleft().result()
+                    fill()
+                    yield from to_documents(shard)
+                    next_page += len(shard)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a hostile PDF); finish in-process
+                print(f"PDF extraction pool failed at page {next_page}, continuing in-process")
+                self._reset_pool()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                if not is_path:
+                    os.remove(shared)
+
+        for start in range(next_page, total_pages, self.shard_pages):
+            yield from to_documents(_extract_pages(reader, start, start + self.shard_pages))
@@ -0,0 +1,162 @@
+"""
+RAG Registry Module
+Keeps retrievers and RAG chains for many active documents under a memory budget
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from .mmap_store import is_mmapped, index_is_mapped
+
+
+class RAGRegistry:
+    """LRU registry of per-document vector stores, retrievers and RAG chains"""
+
+    def __init__(self, max_bytes=None):
+        """
+        Initialize the registry
+
+        Args:
+            max_bytes: Memory budget for loaded indexes (env RAG_REGISTRY_MAX_MB)
+        """
+        if max_bytes is None:
+            max_bytes = int(os.getenv("RAG_REGISTRY_MAX_MB", "1024")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        print(f"RAG registry ready (budget {max_bytes / 1024 / 1024:.0f} MB)")
+
+    @staticmethod
+    def estimate_size(store):
+        """
+        Estimate resident memory of a vector store
+
+        Args:
+            store: FAISS store
+
+        Returns:
+            int: Approximate size in bytes (vectors + chunk text + id map)
+        """
+        # Mapped vectors and text live in the shared page cache; the id map is always private
+        size = 2 * sum(len(doc_id) for doc_id in store.index_to_docstore_id.values())
+
+        if not index_is_mapped(store):
+            # A heap index, including a lazily ingested document's copy that grows on demand;
+            # compressed indexes (sq8, fp16, ivfpq) expose their per-vector code size
+            index = store.index
+            size += index.ntotal * getattr(index, "code_size", index.d * 4)
+
+        if not is_mmapped(store):
+            size += sum(len(doc.page_content) for doc in getattr(store.docstore, "_dict", {}).values())
+        return size
+
+    def put(self, document_id, store, retriever, chain, version=None):
+        """
+        Register a document and evict least recently used ones over budget
+
+        Args:
+            document_id: Document identifier returned to clients
+            store: FAISS store backing the retriever
+            retriever: Retriever over the store
+            chain: RAG chain built on the retriever
+            version: Index cache version the store was loaded from
+        """
+        with self.lock:
+            self.entries[document_id] = {
+                "store": store,
+                "retriever": retriever,
+                "chain": chain,
+                "size_bytes": self.estimate_size(store),
+                "version": version,
+                "last_used": time.time()
+            }
+            self.entries.move_to_end(document_id)
+            evicted = self._evict(keep=document_id)
+        self._flush(evicted)
+
+    def refresh(self, document_id):
+        """
+        Re-estimate a document whose store grew (lazy ingestion) and evict others over budget
+
+        Args:
+            document_id: Document identifier
+        """
+        with self.lock:
+            entry = self.entries.get(document_id)
+            if entry is None:
+                return
+            entry["size_bytes"] = self.estimate_size(entry["store"])
+            evicted = self._evict(keep=document_id)
+        self._flush(evicted)
+
+    def set_version(self, document_id, version):
+        """Record that a document's store was written back to the index cache as this version"""
+        with self.lock:
+            entry = self.entries.get(document_id)
+            if entry is not None:
+                entry["version"] = version
+
+    def get(self, document_id):
+        """
+        Look up a registered document and mark it as recently used
+
+        Args:
+            document_id: Document identifier
+
+        Returns:
+            dict: Registry entry or None if not loaded
+        """
+        with self.lock:
+            entry = self.entries.get(document_id)
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            self.entries.move_to_end(document_id)
+            return entry
+
+    def remove(self, document_id):
+        """Drop a document from memory"""
+        with self.lock:
+            self.entries.pop(document_id, None)
+
+    def __contains__(self, document_id):
+        with self.lock:
+            return document_id in self.entries
+
+    def _evict(self, keep=None):
+        """Evict least recently used documents until the budget is met, returning their entries"""
+        total = sum(entry["size_bytes"] for entry in self.entries.values())
+        evicted = []
+
+        for document_id in list(self.entries.keys()):
+            if total <= self.max_bytes:
+                break
+            if document_id == keep:
+                continue
+            entry = self.entries.pop(document_id)
+            total -= entry["size_bytes"]
+            evicted.append(entry)
+            print(f"Evicted idle document {document_id[:12]} from memory")
+        return evicted
+
+    @staticmethod
+    def _flush(entries):
+        """Let evicted retrievers persist state they hold only in memory (called without the lock)"""
+        for entry in entries:
+            flush = getattr(entry["retriever"], "flush", None)
+            if flush is not None:
+                try:
+                    flush()
+                except Exception as e:
+                    print(f"Error persisting evicted document: {str(e)}")
+
+    def stats(self):
+        """Get registry usage statistics"""
+        with self.lock:
+            return {
+                "documents": len(self.entries),
+                "size_bytes": sum(entry["size_bytes"] for entry in self.entries.values()),
+                "max_bytes": self.max_bytes
+            }
@@ -4,81 +4,224 @@ Handles PDF processing, embeddings, and question-answering
 """
 
 import os
-from langchain_community.document_loaders import PyPDFLoader
+import threading
+from contextlib import nullcontext
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough
+from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
+from .index_cache import IndexCache
+from .rag_registry import RAGRegistry
+from .ingestion_pipeline import StreamingIngestor, dedup_stats
+from .pdf_extractor import ParallelPDFExtractor
+from .embedding_backends import create_embeddings, embeddings_id
+from .embedding_store import EmbeddingStore
+from .model_registry import ModelRegistry
+from .mmap_store import materialize, materialize_index, docstore_ids, pending_ids
+from .ann_index import choose_index_type, effective_index_type, compact_store, remove_vectors
+from .answer_cache import SemanticAnswerCache
+from .hybrid_retriever import HybridRetriever, LazyRetriever
+from .context_packer import ContextPacker
+from .uploads import source_name
 
 
 class RAGService:
     """Service class for RAG operations"""
     
-    def __init__(self, groq_api_key):
-        """Initialize RAG service with API key"""
+    def __init__(self, groq_api_key, index_cache=None, registry=None, answer_cache=None,
+                 embedding_store=None, model_registry=None):
+        """
+        Initialize RAG service with API key
+        
+        Args:
+            groq_api_key: GROQ API key for LLM
+            index_cache: Optional IndexCache for processed PDFs
+            registry: Optional RAGRegistry for documents held in memory
+            answer_cache: Optional SemanticAnswerCache for repeated questions
+            embedding_store: Optional EmbeddingStore for chunk vectors shared across documents
+            model_registry: Optional ModelRegistry accounting for the embedding model
+        """
         if not groq_api_key:
             raise ValueError("GROQ_API_KEY is required")
         
         self.groq_api_key = groq_api_key
-        self.current_rag_chain = None
+        self.index_cache = index_cache or IndexCache()
+        self.registry = registry or RAGRegistry()
+        self.answer_cache = answer_cache or SemanticAnswerCache()
         
-        # Initialize embeddings
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={"device": "cpu"}
+        # Most recent upload, used when a request names no document
+        self.latest_document_id = None
+        
+        # Serializes incremental document updates
+        self.update_lock = threading.Lock()
+        
+        # Fork extraction workers before the embedding model starts its threads
+        self.pdf_extractor = ParallelPDFExtractor()
+        self.pdf_extractor.start()
+        
+        # Initialize embeddings (EMBEDDING_BACKEND=onnx for the int8 model); every
+        # upload and question needs them, so they are pinned in the model registry
+        self.model_registry = model_registry or ModelRegistry()
+        self.embeddings = self.model_registry.get(
+            f"embeddings:{os.getenv('EMBEDDING_BACKEND', 'torch').lower()}", create_embeddings, pinned=True
         )
+        self.embedding_store = embedding_store or EmbeddingStore(embeddings_id(self.embeddings))
+        
+        # Pages are split one at a time and embedded in fixed-size batches;
+        # start offsets let the context packer merge overlapping chunks
+        self.ingestor = StreamingIngestor(
+            self.embeddings,
+            RecursiveCharacterTextSplitter(
+                chunk_size=800,
+                chunk_overlap=100,
+                add_start_index=True
+            ),
+            extractor=self.pdf_extractor,
+            embedding_store=self.embedding_store
+        )
+        self.context_packer = ContextPacker()
         
         print("RAG Service initialized")
     
-    def process_pdf(self, pdf_path):
+    def process_pdf(self, pdf_path, progress_callback=None, lazy=False):
         """
         Load and process PDF file into chunks
         
         Args:
-            pdf_path: Path to PDF file
+            pdf_path: Path to PDF file, or binary stream of it (e.g. Upload.source())
+            progress_callback: Optional callable(stage, **counters) for progress reporting
+            lazy: Only extract text and build the lexical index; chunks are embedded
+                  when questions select them
             
         Returns:
-            retriever: FAISS retriever object
+            tuple: (document_id, FAISS store, BM25Index)
         """
+        report = progress_callback or (lambda stage, **counters: None)
+        
         try:
-            # Load PDF
-            loader = PyPDFLoader(pdf_path)
-            docs = loader.load()
-            
-            # Split into chunks
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=800,
-                chunk_overlap=100
-            )
-            chunks = splitter.split_documents(docs)
-            
-            print(f"PDF split into {len(chunks)} chunks")
+            # Reuse a previously embedded copy of the same document
+            report("hashing")
+            content_hash = IndexCache.hash_file(pdf_path)
+            cached = self.index_cache.get(content_hash, self.embeddings)
+            if cached is not None and not lazy and pending_ids(cached[0]):
+                # An eager upload of a lazily ingested PDF embeds it fully
+                cached = None
             
-            # Create vector store
-            store = FAISS.from_documents(chunks, self.embeddings)
+            if cached is not None:
+                store, bm25 = cached
+                print(f"Loaded cached index for {source_name(pdf_path)} ({content_hash[:12]})")
+                report("cached", chunks_embedded=store.index.ntotal,
+                       dedup=dedup_stats(store.index.ntotal, store.index.ntotal))
+            elif lazy:
+                store, bm25, throughput = self.ingestor.build_lexical_store(pdf_path, report)
+                print(f"PDF split into {len(bm25)} chunks, indexed lexically (lazy embedding)")
+                
+                self.index_cache.put(content_hash, store, bm25, {
+                    "filename": source_name(pdf_path),
+                    "pages": throughput["loading"]["items"],
+                    "chunks": len(bm25),
+                    "index_type": "flat",
+                    "lazy": True,
+                    "throughput": throughput
+                })
+                store, bm25 = self._reopen_mapped(content_hash, store, bm25)
+            else:
+                # Load, split and embed page by page, building the lexical index alongside;
+                # chunks already embedded for any earlier document reuse their vectors
+                store, bm25, throughput, dedup = self.ingestor.build_store(pdf_path, report)
+                
+                print(f"PDF split into {store.index.ntotal} chunks "
+                      f"({dedup['reused']} reused, dedup ratio {dedup['ratio']})")
+                for stage, stage_stats in throughput.items():
+                    print(f"  {stage}: {stage_stats['items']} items in {stage_stats['seconds']}s "
+                          f"({stage_stats['items_per_second']}/s)")
+                
+                # Large collections get an approximate / compressed index
+                index_type = effective_index_type(choose_index_type(store.index.ntotal), store.index.ntotal)
+                store = compact_store(store, index_type)
+                
+                self.index_cache.put(content_hash, store, bm25, {
+                    "filename": source_name(pdf_path),
+                    "pages": throughput["loading"]["items"],
+                    "chunks": store.index.ntotal,
+                    "index_type": index_type,
+                    "throughput": throughput,
+                    "dedup": dedup
+                })
+                store, bm25 = self._reopen_mapped(content_hash, store, bm25)
             
-            # Create retriever with improved settings
-            retriever = store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": 8}
-            )
-            
-            return retriever
+            return content_hash, store, bm25
             
         except Exception as e:
             raise Exception(f"Error processing PDF: {str(e)}")
     
-    def build_rag_chain(self, retriever):
+    def _reopen_mapped(self, document_id, store, bm25):
+        """Swap a freshly cached heap copy for the mmapped one other workers share"""
+        cached = self.index_cache.get(document_id, self.embeddings)
+        return cached if cached is not None else (store, bm25)
+    
+    @staticmethod
+    def create_retriever(store, bm25):
         """
-        Build RAG chain with retriever and LLM
+        Create hybrid dense + BM25 retriever over a document
         
         Args:
-            retriever: FAISS retriever object
+            store: FAISS store
+            bm25: BM25Index over the same chunks
             
         Returns:
-            rag_chain: Complete RAG chain
+            retriever: HybridRetriever object
+        """
+        # Exact-term matches let a smaller k reach the recall dense-only k=8 had
+        return HybridRetriever(
+            store=store,
+            bm25=bm25,
+            k=int(os.getenv("RAG_TOP_K", "5")),
+            fetch_k=int(os.getenv("RAG_FETCH_K", "20"))
+        )
+    
+    def create_lazy_retriever(self, store, bm25, document_id):
+        """
+        Create a retriever that embeds BM25 candidates on demand
+        
+        Vectors it adds count in the registry's memory estimate and are written
+        back to the index cache every RAG_LAZY_PERSIST_EVERY vectors and when
+        the document is evicted, so a reload does not embed them again.
+        
+        Args:
+            store: FAISS store whose docstore holds every chunk
+            bm25: BM25Index over all chunks
+            document_id: Document identifier of the store
+            
+        Returns:
+            retriever: LazyRetriever object
+        """
+        def persist(store, bm25):
+            self.index_cache.put(document_id, store, bm25, {"chunks_embedded": store.index.ntotal})
+            # This process already serves what it wrote; only other writers should trigger a reload
+            self.registry.set_version(document_id, self.index_cache.version(document_id))
+            print(f"Saved {store.index.ntotal} on-demand vectors of {document_id[:12]} to index cache")
+        
+        return LazyRetriever(
+            store=materialize_index(store),
+            bm25=bm25,
+            k=int(os.getenv("RAG_TOP_K", "5")),
+            fetch_k=int(os.getenv("RAG_FETCH_K", "20")),
+            candidate_k=int(os.getenv("RAG_LAZY_CANDIDATES", "50")),
+            embed_texts=self.ingestor.embed_texts,
+            persist=persist,
+            on_grow=lambda: self.registry.refresh(document_id),
+            persist_every=int(os.getenv("RAG_LAZY_PERSIST_EVERY", "256"))
+        )
+    
+    def build_answer_chain(self):
+        """
+        Build the generation half of the RAG chain
+        
+        Returns:
+            answer_chain: Chain from {docs, question} to {answer, context_stats, chunk_ids}
         """
         try:
             # Initialize LLM
@@ -106,23 +249,55 @@ class RAGService:
             Answer:
             """)
             
-            # Format retrieved documents
-            def format_docs(docs):
-                return "\n\n".join(doc.page_content for doc in docs)
+            # Merge overlapping chunks and pack them into the token budget
+            def pack_docs(inputs):
+                packed = self.context_packer.pack(inputs["docs"])
+                stats = packed.stats
+                print(f"Context: {stats['chunks']} chunks -> {stats['spans']} spans, "
+                      f"{stats['context_tokens']} tokens ({stats['tokens_saved']} saved)")
+                return {
+                    "context": packed.text,
+                    "question": inputs["question"],
+                    "stats": stats,
+                    "chunk_ids": [doc.id for doc in inputs["docs"]]
+                }
+            
+            return (
+                RunnableLambda(pack_docs)
+                | RunnableParallel(
+                    {
+                        "answer": prompt | llm,
+                        "context_stats": itemgetter("stats"),
+                        "chunk_ids": itemgetter("chunk_ids"),
+                    }
+                )
+            )
+            
+        except Exception as e:
+            raise Exception(f"Error building answer chain: {str(e)}")
+    
+    def build_rag_chain(self, retriever):
+        """
+        Build RAG chain with retriever and LLM
+        
+        Args:
+            retriever: Retriever returning context documents
             
+        Returns:
+            rag_chain: Complete RAG chain producing {answer, context_stats, chunk_ids}
+        """
+        try:
             # Build RAG chain
             rag_chain = (
                 RunnableParallel(
                     {
-                        "context": retriever | format_docs,
+                        "docs": retriever,
                         "question": RunnablePassthrough(),
                     }
                 )
-                | prompt
-                | llm
+                | self.build_answer_chain()
             )
             
-            self.current_rag_chain = rag_chain
             print("RAG chain built successfully")
             
             return rag_chain
@@ -130,47 +305,395 @@ class RAGService:
         except Exception as e:
             raise Exception(f"Error building RAG chain: {str(e)}")
     
-    def upload_and_process(self, pdf_path):
+    def register_document(self, document_id, store, bm25):
+        """
+        Build retriever and RAG chain for a store and add it to the registry
+        
+        Args:
+            document_id: Document identifier
+            store: FAISS store
+            bm25: BM25Index over the same chunks
+            
+        Returns:
+            dict: Registry entry
+        """
+        if pending_ids(store):
+            retriever = self.create_lazy_retriever(store, bm25, document_id)
+            store = retriever.store
+        else:
+            retriever = self.create_retriever(store, bm25)
+        chain = self.build_rag_chain(retriever)
+        self.registry.put(document_id, store, retriever, chain, version=self.index_cache.version(document_id))
+        return self.registry.get(document_id)
+    
+    def upload_and_process(self, pdf_path, progress_callback=None, lazy=False):
         """
         Complete workflow: process PDF and build RAG chain
         
         Args:
-            pdf_path: Path to PDF file
+            pdf_path: Path to PDF file, or binary stream of it
+            progress_callback: Optional callable(stage, **counters) for progress reporting
+            lazy: Defer embedding to question time (see process_pdf)
             
         Returns:
-            bool: Success status
+            str: Document id to pass to get_answer
         """
         try:
-            retriever = self.process_pdf(pdf_path)
-            self.build_rag_chain(retriever)
-            return True
+            document_id, store, bm25 = self.process_pdf(pdf_path, progress_callback, lazy)
+            self.register_document(document_id, store, bm25)
+            self.latest_document_id = document_id
+            return document_id
         except Exception as e:
             raise Exception(f"Error in upload and process: {str(e)}")
     
-    def get_answer(self, question):
+    def resolve_document_id(self, document_id=None):
+        """Fall back to the most recent upload when no document id is given"""
+        return document_id or self.latest_document_id
+    
+    @staticmethod
+    def is_valid_document_id(document_id):
+        """Check that a client-supplied document id is a content hash (64 hex characters)"""
+        return IndexCache.is_valid_key(document_id)
+    
+    def load_document(self, document_id):
         """
-        Get answer for a question using current RAG chain
+        Get registry entry for a document, reloading it from the index cache when
+        it was evicted, uploaded by another worker, or updated since it was loaded
         
         Args:
-            question: User's question
+            document_id: Document identifier
             
         Returns:
-            str: Answer from RAG chain
+            dict: Registry entry or None if the document is unknown
+        """
+        entry = self.registry.get(document_id)
+        version = self.index_cache.version(document_id)
+        if entry is not None and (version is None or entry["version"] == version):
+            return entry
+        
+        cached = self.index_cache.get(document_id, self.embeddings)
+        if cached is None:
+            return entry
+        
+        if entry is not None:
+            # Another worker changed the document; answers cached here may be stale
+            self.answer_cache.invalidate(document_id)
+        
+        print(f"Reloaded document {document_id[:12]} from index cache")
+        return self.register_document(document_id, *cached)
+    
+    def update_document(self, document_id, pdf_path, start_page=None):
         """
-        if self.current_rag_chain is None:
+        Add or replace pages of an existing document index
+        
+        The edited document gets its own id, derived from the original and the
+        update; the original stays as uploaded, since its id is the content hash
+        every upload of the same PDF resolves to. The edited copy is pinned in
+        the index cache, as it cannot be rebuilt from an upload.
+        
+        Only chunks whose text changed are embedded. Unchanged chunks keep their
+        ids and vectors, and cached answers built from them carry over.
+        
+        Args:
+            document_id: Document id returned by upload_and_process or a previous update
+            pdf_path: PDF holding the new or revised pages (path or binary stream)
+            start_page: 1-based page the first uploaded page replaces (default: append at the end)
+            
+        Returns:
+            dict: document_id of the edited document, and page and chunk counts of the update
+        """
+        with self.update_lock:
+            entry = self.load_document(document_id)
+            if entry is None:
+                raise Exception(f"Document not found: {document_id}")
+            
+            # Edit heap copies; the mmapped originals keep serving until the swap.
+            # A lazy document's retriever adds vectors to its store under its lock
+            with getattr(entry["retriever"], "lock", None) or nullcontext():
+                store = materialize(entry["store"])
+                bm25 = entry["retriever"].bm25.materialize()
+            existing = {doc_id: store.docstore.search(doc_id) for doc_id in docstore_ids(store)}
+            page_count = 1 + max((doc.metadata.get("page", 0) for doc in existing.values()), default=-1)
+            
+            if start_page is None:
+                start_page = page_count + 1
+            if not 1 <= start_page <= page_count + 1:
+                raise ValueError(f"start_page must be between 1 and {page_count + 1}")
+            
+            try:
+                new_document_id = IndexCache.derive_key(document_id, IndexCache.hash_file(pdf_path), str(start_page))
+                source = next(iter(existing.values())).metadata.get("source") if existing else source_name(pdf_path)
+                
+                # Renumber uploaded pages to their place in the document and re-split them
+                target_pages = set()
+                new_chunks = []
+                for offset, page in enumerate(self.ingestor.iter_pages(pdf_path)):
+                    number = start_page - 1 + offset
+                    page.metadata.update({"source": source, "page": number, "page_label": str(number + 1)})
+                    target_pages.add(number)
+                    new_chunks.extend(self.ingestor.split_page(page))
+                
+                old_ids = {
+                    doc_id for doc_id, doc in existing.items()
+                    if doc.metadata.get("page") in target_pages
+                }
+                removed = old_ids - {chunk.id for chunk in new_chunks}
+                added = [chunk for chunk in new_chunks if chunk.id not in old_ids]
+                
+                if removed:
+                    # Lazily ingested documents may hold chunks that were never embedded
+                    embedded = set(store.index_to_docstore_id.values())
+                    remove_vectors(store, [doc_id for doc_id in removed if doc_id in embedded])
+                    unembedded = [doc_id for doc_id in removed if doc_id not in embedded]
+                    if unembedded:
+                        store.docstore.delete(unembedded)
+                    bm25.remove(removed, [existing[doc_id].page_content for doc_id in removed])
+                
+                # Embed only chunks whose text is new
+                batch_size = self.ingestor.batch_size
+                reused = 0
+                for start in range(0, len(added), batch_size):
+                    batch = added[start:start + batch_size]
+                    texts = [chunk.page_content for chunk in batch]
+                    ids = [chunk.id for chunk in batch]
+                    vectors, batch_reused = self.ingestor.embed_texts(texts)
+                    reused += batch_reused
+                    store.add_embeddings(
+                        list(zip(texts, vectors)),
+                        metadatas=[chunk.metadata for chunk in batch],
+                        ids=ids
+                    )
+                    bm25.add(ids, texts)
+                
+                invalidated = self.answer_cache.carry_over(document_id, new_document_id, removed)
+                
+                # Lazily ingested documents embed only some chunks; count all of them
+                total_chunks = len(docstore_ids(store))
+                
+                # Persist, then serve the new version from the mmapped copy
+                self.index_cache.put(new_document_id, store, bm25, {
+                    **self.index_cache.metadata(document_id),
+                    "pages": max(page_count, max(target_pages, default=-1) + 1),
+                    "chunks": total_chunks,
+                    "parent": document_id
+                }, pinned=True)
+                self.register_document(new_document_id, *self._reopen_mapped(new_document_id, store, bm25))
+                if self.latest_document_id == document_id:
+                    self.latest_document_id = new_document_id
+                
+                result = {
+                    "document_id": new_document_id,
+                    "parent_document_id": document_id,
+                    "pages_added": len([n for n in target_pages if n >= page_count]),
+                    "pages_replaced": len([n for n in target_pages if n < page_count]),
+                    "chunks_added": len(added),
+                    "chunks_reused": reused,
+                    "chunks_removed": len(removed),
+                    "chunks_unchanged": len(old_ids) - len(removed),
+                    "cached_answers_invalidated": invalidated,
+                    "total_chunks": total_chunks
+                }
+                print(f"Updated document {document_id[:12]} as {new_document_id[:12]}: {result}")
+                return result
+                
+            except Exception as e:
+                raise Exception(f"Error updating document: {str(e)}")
+    
+    def _prepare_question(self, question, document_id):
+        """Validate a question and load the document it is about"""
+        document_id = self.resolve_document_id(document_id)
+        if document_id is None:
             raise Exception("No PDF uploaded yet. Please upload a PDF first.")
         
         if not question or not question.strip():
             raise Exception("Question cannot be empty")
         
+        entry = self.load_document(document_id)
+        if entry is None:
+            raise Exception(f"Document not found: {document_id}")
+        
+        return document_id, entry
+    
+    def get_answer(self, question, document_id=None):
+        """
+        Get answer for a question about an uploaded document
+        
+        Args:
+            question: User's question
+            document_id: Document id returned by upload_and_process
+            
+        Returns:
+            dict: {answer, cached, similarity, context_stats}; cached answers come from a similar
+                  earlier question, context_stats reports prompt tokens saved by the context packer
+        """
+        document_id, entry = self._prepare_question(question, document_id)
+        
         try:
             print(f"Processing question: {question}")
-            answer = self.current_rag_chain.invoke(question)
+            
+            question_vector = self.embeddings.embed_query(question)
+            cached = self.answer_cache.lookup(document_id, question_vector)
+            if cached is not None:
+                print(f"Answer served from cache (similarity {cached['similarity']:.3f})")
+                return {
+                    "answer": cached["answer"],
+                    "cached": True,
+                    "similarity": cached["similarity"],
+                    "context_stats": None
+                }
+            
+            # The question was embedded for the cache lookup; retrieval reuses that vector
+            docs = entry["retriever"].retrieve(question, question_vector)
+            result = self.build_answer_chain().invoke({"docs": docs, "question": question})
+            answer = result["answer"]
             print(f"Answer generated: {answer.content[:100]}...")
-            return answer.content
+            self.answer_cache.store(
+                document_id, question, question_vector, answer.content, result["chunk_ids"]
+            )
+            return {
+                "answer": answer.content,
+                "cached": False,
+                "similarity": None,
+                "context_stats": result["context_stats"]
+            }
         except Exception as e:
             raise Exception(f"Error getting answer: {str(e)}")
     
-    def is_ready(self):
-        """Check if RAG chain is ready"""
-        return self.current_rag_chain is not None
\ No newline at end of file
+    def stream_answer(self, question, document_id=None):
+        """
+        Answer a question, streaming tokens as the LLM produces them
+        
+        Validation and the cache lookup happen before returning, so errors
+        surface before any token is sent.
+        
+        Args:
+            question: User's question
+            document_id: Document id returned by upload_and_process
+            
+        Returns:
+            tuple: (cached, iterator of answer text fragments)
+        """
+        document_id, entry = self._prepare_question(question, document_id)
+        
+        print(f"Streaming answer for: {question}")
+        question_vector = self.embeddings.embed_query(question)
+        cached = self.answer_cache.lookup(document_id, question_vector)
+        if cached is not None:
+            print(f"Answer served from cache (similarity {cached['similarity']:.3f})")
+            return True, iter([cached["answer"]])
+        
+        def tokens():
+            parts = []
+            chunk_ids = ()
+            docs = entry["retriever"].retrieve(question, question_vector)
+            for chunk in self.build_answer_chain().stream({"docs": docs, "question": question}):
+                chunk_ids = chunk.get("chunk_ids", chunk_ids)
+                message = chunk.get("answer")
+                if message is not None and message.content:
+                    parts.append(message.content)
+                    yield message.content
+            
+            # Only complete answers are cached; a cancelled stream never gets here
+            answer = "".join(parts)
+            print(f"Answer streamed: {answer[:100]}...")
+            self.answer_cache.store(document_id, question, question_vector, answer, chunk_ids)
+        
+        return False, tokens()
+    
+    def answer_batch(self, questions, document_id=None, concurrency=None):
+        """
+        Answer many questions about one document, yielding results as they finish
+        
+        All questions are embedded in one forward pass and searched in one
+        vector search; cache misses go to the LLM with bounded concurrency.
+        Validation, embedding and cache lookups happen before returning.
+        
+        Args:
+            questions: List of questions
+            document_id: Document id returned by upload_and_process
+            concurrency: Parallel LLM calls (env RAG_BATCH_CONCURRENCY)
+            
+        Returns:
+            iterator: dicts {index, question, answer, cached, similarity, context_stats},
+                      or {index, question, error} for a failed question
+        """
+        if not questions:
+            raise Exception("No questions provided")
+        if any(not isinstance(question, str) or not question.strip() for question in questions):
+            raise Exception("Questions cannot be empty")
+        
+        document_id, entry = self._prepare_question(questions[0], document_id)
+        concurrency = concurrency or int(os.getenv("RAG_BATCH_CONCURRENCY", "4"))
+        
+        print(f"Processing batch of {len(questions)} questions")
+        vectors = self.embeddings.embed_documents(questions)
+        
+        answered = []
+        pending = {}  # question -> indices asking it, answered once
+        for index, (question, vector) in enumerate(zip(questions, vectors)):
+            if question in pending:
+                pending[question].append(index)
+                continue
+            cached = self.answer_cache.lookup(document_id, vector)
+            if cached is not None:
+                answered.append({
+                    "index": index,
+                    "question": question,
+                    "answer": cached["answer"],
+                    "cached": True,
+                    "similarity": cached["similarity"],
+                    "context_stats": None
+                })
+            else:
+                pending[question] = [index]
+        
+        misses = list(pending)
+        miss_vectors = [vectors[pending[question][0]] for question in misses]
+        print(f"Batch: {len(answered)} cached, {len(misses)} to generate")
+        
+        def results():
+            yield from answered
+            if not misses:
+                return
+            
+            docs = entry["retriever"].retrieve_batch(misses, miss_vectors)
+            answer_chain = self.build_answer_chain()
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rag-batch")
+            futures = {
+                executor.submit(answer_chain.invoke, {"docs": question_docs, "question": question}): position
+                for position, (question, question_docs) in enumerate(zip(misses, docs))
+            }
+            try:
+                for future in as_completed(futures):
+                    position = futures[future]
+                    question = misses[position]
+                    try:
+                        result = future.result()
+                        answer = result["answer"].content
+                        self.answer_cache.store(
+                            document_id, question, miss_vectors[position], answer, result["chunk_ids"]
+                        )
+                        outcome = {
+                            "answer": answer,
+                            "cached": False,
+                            "similarity": None,
+                            "context_stats": result["context_stats"]
+                        }
+                    except Exception as e:
+                        print(f"Error answering batch question: {str(e)}")
+                        outcome = {"error": str(e)}
+                    
+                    for index in pending[question]:
+                        yield {"index": index, "question": question, **outcome}
+            finally:
+                # A disconnected client cancels questions not yet sent to the LLM
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results()
+    
+    def is_ready(self, document_id=None):
+        """Check if a document is available for questions"""
+        document_id = self.resolve_document_id(document_id)
+        if document_id is None:
+            return False
+        return document_id in self.registry or document_id in self.index_cache
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+Segment Transcriber Module
+Transcribes long recordings as silence-bounded segments across a process pool, with ordered partial results
+"""
+
+import os
+import bisect
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from .worker_pool import pool_context
+
+SAMPLE_RATE = 16000
+
+# Whisper backend of each worker process and its memory, built on its first segment
+_worker_transcribers = {}
+
+
+def worker_model_name(config, pid):
+    """Model registry name of the Whisper model a worker process holds"""
+    return f"faster-whisper:{config['model_size']}:{config['compute_type']}:worker{pid}"
+
+
+def transcribe_samples(config, samples, offset, language):
+    """
+    Transcribe one segment inside a pool worker
+
+    The worker keeps its model between segments; only the samples and the
+    backend configuration cross the process boundary. The model's memory is
+    reported back so the parent can count it in its model registry.
+
+    Args:
+        config: FasterWhisperTranscriber.config() of the parent's backend
+        samples: 16 kHz float32 samples of the segment
+        offset: Start of the segment in the recording, in seconds
+        language: Language code, or None to detect it
+
+    Returns:
+        tuple: (FasterWhisperTranscriber.transcribe() result with absolute timestamps,
+                worker pid, bytes the worker's model takes)
+    """
+    from .stt_backends import FasterWhisperTranscriber
+    from .model_registry import resident_bytes
+
+    key = tuple(sorted(config.items()))
+    if key not in _worker_transcribers:
+        before = resident_bytes()
+        transcriber = FasterWhisperTranscriber(**config)
+        _worker_transcribers[key] = (transcriber, max(resident_bytes() - before, 0))
+    transcriber, model_bytes = _worker_transcribers[key]
+    return transcriber.transcribe(samples, language=language, offset=offset), os.getpid(), model_bytes
+
+
+def split_at_silence(speech, total, target, maximum):
+    """
+    Plan segment boundaries in the pauses between speech
+
+    Args:
+        speech: VAD speech regions [{start, end}] in samples, in order
+        total: Length of the recording in samples
+        target: Preferred segment length in samples
+        maximum: Longest allowed segment; longer stretches of speech are cut hard
+
+    Returns:
+        list: [(start, end)] sample ranges covering the recording
+    """
+    # Candidate cuts: the middle of every pause
+    cuts = [(before["end"] + after["start"]) // 2 for before, after in zip(speech, speech[1:])]
+
+    segments, start = [], 0
+    while total - start > maximum:
+        # Latest pause within the target, else the first one within the maximum
+        i = bisect.bisect_right(cuts, start + target) - 1
+        if i >= 0 and cuts[i] > start:
+            end = cuts[i]
+        else:
+            j = bisect.bisect_right(cuts, start)
+            end = cuts[j] if j < len(cuts) and cuts[j] <= start + maximum else start + maximum
+        segments.append((start, end))
+        start = end
+    if start < total:
+        segments.append((start, total))
+    return segments
+
+
+class ParallelTranscriber:
+    """Silence-bounded segments of long audio transcribed in parallel and stitched in order"""
+
+    def __init__(self, workers=None, segment_seconds=None, min_seconds=None):
+        """
+        Initialize the transcriber
+
+        Args:
+            workers: Transcription processes, each holding its own model (reserved in the model registry)
+                     (env TRANSCRIBE_WORKERS, default: half the CPUs)
+            segment_seconds: Preferred segment length (env TRANSCRIBE_SEGMENT_SECONDS)
+            min_seconds: Shorter recordings are transcribed in one pass (env TRANSCRIBE_PARALLEL_MIN_SECONDS)
+        """
+        cpus = os.cpu_count() or 1
+        self.workers = workers or int(os.getenv("TRANSCRIBE_WORKERS", str(max(1, cpus // 2))))
+        self.segment_seconds = segment_seconds or int(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "60"))
+        self.min_seconds = min_seconds or int(os.getenv("TRANSCRIBE_PARALLEL_MIN_SECONDS", "300"))
+        # Split the cores between workers instead of each one using all of them
+        self.worker_threads = max(1, cpus // self.workers)
+        self.pool = None
+        self.model_registry = None  # registry the workers' models are reserved in
+        self.worker_models = set()  # their registry names
+        self.lock = threading.Lock()
+
+    def start(self, after_startup=False):
+        """
+        Start the worker processes
+
+        At startup, call before request threads and model thread pools exist:
+        on POSIX the workers are forked, and a fork context launches every
+        worker at the first submit. Starts from request threads (after the pool
+        broke) pass after_startup and use a forkserver instead.
+
+        Args:
+            after_startup: Started while the server is running (see worker_pool.pool_context)
+        """
+        if self.workers < 2:
+            return
+
+        with self.lock:
+            if self.pool is not None:
+                return
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context(after_startup))
+            self.pool.submit(os.getpid).result()
+
+        print(f"Transcription pool started ({self.workers} workers, {self.segment_seconds}s segments)")
+
+    def _reset_pool(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+            worker_models, self.worker_models = self.worker_models, set()
+        if self.model_registry is not None:
+            self.model_registry.release(worker_models)
+
+    def _reserve_worker_model(self, registry, name, model_bytes):
+        """Count a worker's model in the registry the first time the worker reports it"""
+        with self.lock:
+            if registry is None or name in self.worker_models:
+                return
+            self.worker_models.add(name)
+            self.model_registry = registry
+        registry.reserve(name, model_bytes)
+
+    def check_budget(self, registry, model_name):
+        """
+        Check that a model in every worker fits the registry's memory budget
+
+        Uses the size the registry measured when it loaded the same model
+        in-process; unknown sizes pass.
+
+        Returns:
+            bool: False if workers x model size exceeds the budget
+        """
+        if registry is None:
+            return True
+        size = registry.known_sizes.get(model_name, 0)
+        if size * self.workers <= registry.max_bytes:
+            return True
+        print(f"Transcription pool needs {self.workers} x {size / 1024 / 1024:.0f} MB for {model_name}, "
+              f"over the {registry.max_bytes / 1024 / 1024:.0f} MB model budget; transcribing in-process")
+        return False
+
+    def plan(self, samples):
+        """
+        Split decoded audio at silences
+
+        Args:
+            samples: 16 kHz float32 samples
+
+        Returns:
+            list: [(start, end)] sample ranges
+        """
+        from faster_whisper.vad import get_speech_timestamps, VadOptions
+
+        speech = get_speech_timestamps(samples, VadOptions(min_silence_duration_ms=500))
+        target = self.segment_seconds * SAMPLE_RATE
+        return split_at_silence(speech, len(samples), target, target * 3 // 2)
+
+    def transcribe(self, audio, transcriber, language=None, progress_callback=None):
+        """
+        Transcribe a recording, in parallel segments when it is long enough
+
+        Args:
+            audio: Path or file-like object of the audio
+            transcriber: FasterWhisperTranscriber whose configuration the workers use;
+                         it also transcribes in-process when the pool is unavailable
+            language: Language code, or None to detect it per segment
+            progress_callback: Optional callable(stage, **counters); receives
+                               segments_done/segments_total and the transcript of
+                               the finished segments at the start of the recording
+
+        Returns:
+            dict: {text, detected_language, duration, speech_duration, segments: [{start, end, text}]}
+        """
+        from faster_whisper import decode_audio
+
+        def report(stage, **counters):
+            if progress_callback:
+                progress_callback(stage, **counters)
+
+        report("decoding")
+        samples = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+        duration = len(samples) / SAMPLE_RATE
+
+        ranges = [(0, len(samples))]
+        if duration >= self.min_seconds:
+            report("segmenting", duration=round(duration, 1))
+            ranges = self.plan(samples)
+
+        results = [None] * len(ranges)
+        done = 0
+
+        def finish(i, result):
+            nonlocal done
+            results[i] = result
+            done += 1
+            # Partial transcript: every segment up to the first one still running
+            finished = []
+            for segment_result in results:
+                if segment_result is None:
+                    break
+                finished.extend(segment_result["segments"])
+            report(
+                "transcribing",
+                segments_done=done,
+                segments_total=len(ranges),
+                partial_text="".join(segment["text"] for segment in finished).strip(),
+                partial_until=finished[-1]["end"] if finished else 0.0
+            )
+
+        report("transcribing", segments_done=0, segments_total=len(ranges))
+
+        registry = getattr(transcriber, "model_registry", None)
+        pool = None
+        if len(ranges) > 1 and self.check_budget(registry, f"faster-whisper:{transcriber.model_size}:{transcriber.compute_type}"):
+            self.start(after_startup=True)
+            pool = self.pool
+
+        if pool is not None:
+            config = {**transcriber.config(), "cpu_threads": self.worker_threads}
+            futures = {}
+            try:
+                for i, (start, end) in enumerate(ranges):
+                    futures[pool.submit(transcribe_samples, config, samples[start:end], start / SAMPLE_RATE, language)] = i
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        result, pid, model_bytes = future.result()
+                        self._reserve_worker_model(registry, worker_model_name(config, pid), model_bytes)
+                        finish(futures[future], result)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); finish the rest in-process
+                print(f"Transcription pool failed after {done} of {len(ranges)} segments, continuing in-process")
+                self._reset_pool()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        for i, (start, end) in enumerate(ranges):
+            if results[i] is None:
+                finish(i, transcriber.transcribe(samples[start:end], language=language, offset=start / SAMPLE_RATE))
+
+        segments = [segment for result in results for segment in result["segments"]]
+        languages = Counter(result["detected_language"] for result in results if result["segments"])
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "detected_language": language or (languages.most_common(1)[0][0] if languages else results[0]["detected_language"]),
+            "duration": duration,
+            "speech_duration": sum(result["speech_duration"] for result in results),
+            "segments": segments
+        }
@@ -0,0 +1,254 @@
+"""
+STT Backends Module
+Whisper speech-to-text on CTranslate2 (faster-whisper, int8 with voice-activity detection) or PyTorch (openai-whisper)
+"""
+
+import os
+import tempfile
+import subprocess
+from contextlib import nullcontext
+from .uploads import read_source
+
+
+STT_MODEL = "base"
+
+
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ("true", "1", "yes")
+
+
+def load_audio_bytes(data, sample_rate=16000):
+    """
+    Decode an in-memory audio file like whisper.load_audio, piping it through ffmpeg
+
+    Containers that cannot be demuxed from a pipe (e.g. mp4 with the index at
+    the end) go through a temporary file instead.
+
+    Returns:
+        numpy.ndarray: Mono float32 samples at sample_rate
+    """
+    import numpy as np
+
+    def ffmpeg(source, stdin=None):
+        command = ["ffmpeg", "-threads", "0", "-i", source, "-f", "s16le", "-ac", "1",
+                   "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"]
+        return subprocess.run(command, input=stdin, capture_output=True, check=True).stdout
+
+    try:
+        pcm = ffmpeg("pipe:0", data)
+    except subprocess.CalledProcessError:
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            pcm = ffmpeg(f.name)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to load audio: {e.stderr.decode(errors='ignore')}") from e
+        finally:
+            os.remove(f.name)
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def faster_whisper_model(model_size, compute_type="default", cpu_threads=0, model_registry=None, num_workers=1):
+    """
+    Hold a CTranslate2 Whisper model for a with block, shared through the model registry if given
+
+    Services asking for the same size and compute type get the same instance,
+    which the registry will not evict until the block exits.
+
+    Args:
+        model_size: Whisper model size or path
+        compute_type: CTranslate2 weight type
+        cpu_threads: CTranslate2 threads, 0 for its default (used when this call loads it)
+        model_registry: Optional ModelRegistry
+        num_workers: Transcriptions the model runs at once from different threads;
+                     a model with several workers is registered under its own name
+
+    Returns:
+        Context manager yielding a faster_whisper.WhisperModel
+    """
+    from faster_whisper import WhisperModel
+
+    def load():
+        return WhisperModel(
+            model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers
+        )
+
+    if model_registry is None:
+        return nullcontext(load())
+    name = f"faster-whisper:{model_size}:{compute_type}"
+    if num_workers > 1:
+        name += f":x{num_workers}"
+    return model_registry.using(name, load)
+
+
+class FasterWhisperTranscriber:
+    """Whisper on CTranslate2; VAD drops silence before it reaches the decoder"""
+
+    def __init__(self, model_size=None, compute_type=None, vad_filter=None, beam_size=None, cpu_threads=None,
+                 model_registry=None):
+        """
+        Configure the CTranslate2 Whisper backend
+
+        Without a model registry the model is loaded now and kept; with one it is
+        fetched from the registry for every transcription, so it can be evicted
+        while idle and is shared with other services.
+
+        Args:
+            model_size: Whisper model size or path (env STT_MODEL)
+            compute_type: CTranslate2 weight type, e.g. int8 or float32 (env STT_COMPUTE_TYPE)
+            vad_filter: Skip non-speech with Silero VAD (env STT_VAD)
+            beam_size: Decoder beam size, 1 for greedy like openai-whisper's default (env STT_BEAM_SIZE)
+            cpu_threads: CTranslate2 threads, 0 for its default (env STT_CPU_THREADS)
+            model_registry: Optional ModelRegistry holding the model
+        """
+        # Fail now, not on the first request, when faster-whisper is not installed
+        import faster_whisper
+
+        self.model_size = model_size or os.getenv("STT_MODEL", STT_MODEL)
+        self.compute_type = compute_type or os.getenv("STT_COMPUTE_TYPE", "int8")
+        self.vad_filter = vad_filter if vad_filter is not None else env_flag("STT_VAD", "true")
+        self.beam_size = beam_size or int(os.getenv("STT_BEAM_SIZE", "1"))
+        self.cpu_threads = cpu_threads if cpu_threads is not None else int(os.getenv("STT_CPU_THREADS", "0"))
+        self.model_registry = model_registry
+        self.name = f"faster-whisper:{self.model_size}:{self.compute_type}{':vad' if self.vad_filter else ''}"
+
+        self.model = None
+        if model_registry is None:
+            with self._model() as model:
+                self.model = model
+        print(f"Whisper backend ready ({self.name})")
+
+    def _model(self):
+        if self.model is not None:
+            return nullcontext(self.model)
+        return faster_whisper_model(self.model_size, self.compute_type, self.cpu_threads, self.model_registry)
+
+    def config(self):
+        """Constructor arguments that rebuild this backend, e.g. in a worker process"""
+        return {
+            "model_size": self.model_size,
+            "compute_type": self.compute_type,
+            "vad_filter": self.vad_filter,
+            "beam_size": self.beam_size,
+            "cpu_threads": self.cpu_threads
+        }
+
+    def transcribe(self, audio, language=None, offset=0.0):
+        """
+        Transcribe an audio file
+
+        Args:
+            audio: Path, file-like object, or 16 kHz float32 samples of the audio
+            language: Language code, or None to detect it
+            offset: Seconds added to segment timestamps (for a slice of longer audio)
+
+        Returns:
+            dict: {text, detected_language, duration, speech_duration, segments: [{start, end, text}]}
+        """
+        with self._model() as model:
+            segments, info = model.transcribe(
+                audio,
+                language=language,
+                beam_size=self.beam_size,
+                vad_filter=self.vad_filter,
+                # Split at half-second pauses rather than the 2s default so short clips still lose their silence
+                vad_parameters={"min_silence_duration_ms": 500} if self.vad_filter else None
+            )
+            # Segments are decoded lazily while iterating
+            segments = [
+                {"start": round(offset + segment.start, 2), "end": round(offset + segment.end, 2), "text": segment.text}
+                for segment in segments
+            ]
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "detected_language": info.language,
+            "duration": info.duration,
+            "speech_duration": info.duration_after_vad if self.vad_filter else info.duration,
+            "segments": segments
+        }
+
+
+class OpenAIWhisperTranscriber:
+    """Reference Whisper in float32 PyTorch"""
+
+    def __init__(self, model_size=None, model_registry=None):
+        """
+        Configure the openai-whisper backend
+
+        Args:
+            model_size: Whisper model size (env STT_MODEL)
+            model_registry: Optional ModelRegistry holding the model
+        """
+        # Fail now, not on the first request, when openai-whisper is not installed
+        import whisper
+
+        self.model_size = model_size or os.getenv("STT_MODEL", STT_MODEL)
+        self.model_registry = model_registry
+        self.name = f"openai-whisper:{self.model_size}"
+
+        self.model = None if model_registry else whisper.load_model(self.model_size, device="cpu")
+        print(f"Whisper backend ready ({self.name})")
+
+    def _model(self):
+        import whisper
+
+        if self.model is not None:
+            return nullcontext(self.model)
+        return self.model_registry.using(
+            self.name, lambda: whisper.load_model(self.model_size, device="cpu")
+        )
+
+    def transcribe(self, audio):
+        """
+        Transcribe an audio file
+
+        Args:
+            audio: Path or binary stream of the audio
+
+        Returns:
+            dict: {text, detected_language, duration, speech_duration}
+        """
+        import whisper
+
+        if isinstance(audio, (str, os.PathLike)):
+            samples = whisper.load_audio(audio)
+        else:
+            samples = load_audio_bytes(read_source(audio))
+        duration = len(samples) / whisper.audio.SAMPLE_RATE
+        with self._model() as model:
+            result = model.transcribe(samples, fp16=False)
+        return {
+            "text": result["text"].strip(),
+            "detected_language": result.get("language", "unknown"),
+            "duration": duration,
+            "speech_duration": duration
+        }
+
+
+def create_transcriber(backend=None, model_registry=None):
+    """
+    Set up the speech-to-text backend
+
+    Args:
+        backend: "faster" (CTranslate2 int8 + VAD) or "openai" (PyTorch float32) (env STT_BACKEND)
+        model_registry: Optional ModelRegistry that loads and shares the model
+
+    Returns:
+        Transcriber with transcribe(audio) -> dict, or None if no backend is installed
+    """
+    backend = (backend or os.getenv("STT_BACKEND", "faster")).lower()
+    if backend not in ("faster", "openai"):
+        raise ValueError(f"Unknown STT backend: {backend}")
+
+    if backend == "faster":
+        try:
+            return FasterWhisperTranscriber(model_registry=model_registry)
+        except ImportError:
+            print("faster-whisper not installed. Install with: pip install faster-whisper")
+            print("Falling back to openai-whisper")
+
+    try:
+        return OpenAIWhisperTranscriber(model_registry=model_registry)
+    except ImportError:
+        print("Whisper not installed. Install with: pip install openai-whisper")
+        return None
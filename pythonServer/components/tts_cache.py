@@ -0,0 +1,287 @@
+"""
+TTS Cache Module
+Content-addressed store of synthesized speech in audio_outputs with a size and age budget
+"""
+
+import os
+import time
+import uuid
+import hashlib
+import threading
+from contextlib import contextmanager
+
+
+class TTSCache:
+    """
+    Synthesized audio keyed by a hash of text, voice and language
+
+    Files are named tts_<hash>.mp3, so identical requests from any worker process
+    map to the same file. A hit refreshes the file's mtime; a background sweeper
+    deletes files unused for longer than the age budget, then the least recently
+    used ones until the directory fits the size budget.
+    """
+
+    PREFIX = "tts_"
+    SUFFIX = ".mp3"
+    # Partial writes left behind by a crashed worker are removed after this long
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self, folder=None, max_bytes=None, max_age_seconds=None, sweep_interval=None):
+        """
+        Initialize the cache and start its sweeper thread
+
+        Args:
+            folder: Directory for audio files (env TTS_CACHE_DIR)
+            max_bytes: Disk budget for cached audio (env TTS_CACHE_MAX_MB)
+            max_age_seconds: Delete files unused for this long (env TTS_CACHE_MAX_AGE)
+            sweep_interval: Seconds between sweeps (env TTS_CACHE_SWEEP_INTERVAL)
+        """
+        self.folder = os.path.abspath(folder or os.getenv("TTS_CACHE_DIR", "audio_outputs"))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds or int(os.getenv("TTS_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+        self.sweep_interval = sweep_interval or int(os.getenv("TTS_CACHE_SWEEP_INTERVAL", "300"))
+
+        self.counters = {
+            "lookups": 0, "hits": 0, "misses": 0, "segment_hits": 0, "segment_misses": 0, "evicted": 0
+        }
+        self.key_locks = {}  # key -> [lock, waiters], so one request synthesizes while others wait
+        self.lock = threading.Lock()
+
+        os.makedirs(self.folder, exist_ok=True)
+        self.sweeper = threading.Thread(target=self._sweep_loop, name="tts-cache-sweeper", daemon=True)
+        self.sweeper.start()
+
+        print(f"TTS cache ready: {self.folder} ({self.max_bytes // (1024 * 1024)} MB, {self.max_age_seconds}s max age)")
+
+    @staticmethod
+    def key(text, voice, language):
+        """Hash identifying the audio for a text spoken by a voice"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{voice}\x00{language}\x00{normalized}".encode("utf-8")).hexdigest()[:32]
+
+    def filename(self, key):
+        return f"{self.PREFIX}{key}{self.SUFFIX}"
+
+    def path(self, key):
+        return os.path.join(self.folder, self.filename(key))
+
+    def lookup(self, key):
+        """
+        Find cached audio
+
+        Args:
+            key: Cache key from key()
+
+        Returns:
+            str: Path of the audio file on a hit, else None
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)  # mark as recently used for the sweeper
+            return path
+        except FileNotFoundError:
+            return None
+
+    def _count(self, hit):
+        with self.lock:
+            self.counters["lookups"] += 1
+            self.counters["hits" if hit else "misses"] += 1
+
+    def segment_lookup(self, key):
+        """lookup() for one segment of a longer text, counted separately"""
+        path = self.lookup(key)
+        with self.lock:
+            self.counters["segment_hits" if path else "segment_misses"] += 1
+        return path
+
+    def temp_path(self, key):
+        """Unique path to write new audio for a key before commit()"""
+        return f"{self.path(key)}.{uuid.uuid4().hex}.tmp"
+
+    def commit(self, temp_path, key):
+        """Move finished audio into place as the entry for key"""
+        os.replace(temp_path, self.path(key))
+        return self.path(key)
+
+    def get_or_create(self, key, synthesize):
+        """
+        Return cached audio, synthesizing it on a miss
+
+        Concurrent misses for the same key in this process synthesize once.
+
+        Args:
+            key: Cache key from key()
+            synthesize: Callable writing the audio to the temporary path it is given
+
+        Returns:
+            tuple: (audio_path, cached)
+        """
+        path = self.lookup(key)
+        if path:
+            self._count(hit=True)
+            return path, True
+
+        with self._key_lock(key):
+            # Another request may have finished the same audio while we waited
+            path = self.lookup(key)
+            if path:
+                self._count(hit=True)
+                return path, True
+            self._count(hit=False)
+
+            temp_path = self.temp_path(key)
+            try:
+                synthesize(temp_path)
+                self.commit(temp_path, key)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return self.path(key), False
+
+    def stream_or_create(self, key, produce):
+        """
+        Stream cached audio, or stream newly synthesized audio while caching it
+
+        On a miss the chunks are written to a temporary file as they pass
+        through, which becomes the cache entry only if the stream completes.
+
+        Args:
+            key: Cache key from key()
+            produce: Callable returning an iterator of audio chunks
+
+        Returns:
+            tuple: (iterator of audio chunks, cached)
+        """
+        path = self.lookup(key)
+        if path:
+            try:
+                # Opened now so a concurrent sweep cannot remove it before reading
+                audio = open(path, "rb")
+            except FileNotFoundError:
+                pass
+            else:
+                self._count(hit=True)
+                return self._read_chunks(audio), True
+
+        self._count(hit=False)
+        return self._tee(key, produce()), False
+
+    @staticmethod
+    def _read_chunks(audio, chunk_size=64 * 1024):
+        with audio:
+            while True:
+                chunk = audio.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def _tee(self, key, chunks):
+        temp_path = self.temp_path(key)
+        complete = False
+        try:
+            with open(temp_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+            self.commit(temp_path, key)
+        finally:
+            if not complete and os.path.exists(temp_path):
+                os.remove(temp_path)
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self.lock:
+            entry = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+        try:
+            yield
+        finally:
+            entry[0].release()
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.key_locks[key]
+
+    def _files(self):
+        """(path, size, mtime) of every cached audio file"""
+        files = []
+        for name in os.listdir(self.folder):
+            if not name.startswith(self.PREFIX):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # removed by another worker's sweep
+                continue
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def sweep(self):
+        """
+        Enforce the age and size budget once
+
+        Returns:
+            int: Number of files deleted
+        """
+        now = time.time()
+        keep, delete = [], []
+        for path, size, mtime in self._files():
+            if path.endswith(".tmp"):
+                if now - mtime > self.STALE_TEMP_SECONDS:
+                    delete.append(path)
+            elif now - mtime > self.max_age_seconds:
+                delete.append(path)
+            else:
+                keep.append((path, size, mtime))
+
+        # Least recently used first until the rest fits
+        total = sum(size for _, size, _ in keep)
+        for path, size, _ in sorted(keep, key=lambda item: item[2]):
+            if total <= self.max_bytes:
+                break
+            delete.append(path)
+            total -= size
+
+        deleted = 0
+        for path in delete:
+            try:
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+
+        if deleted:
+            with self.lock:
+                self.counters["evicted"] += deleted
+            print(f"TTS cache sweep: deleted {deleted} files")
+        return deleted
+
+    def _sweep_loop(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"TTS cache sweep failed: {str(e)}")
+            time.sleep(self.sweep_interval)
+
+    def stats(self):
+        """Get cache counters, hit rate and disk usage"""
+        files = [item for item in self._files() if not item[0].endswith(".tmp")]
+        with self.lock:
+            counters = dict(self.counters)
+        lookups = counters["lookups"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            "files": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "folder": self.folder
+        }
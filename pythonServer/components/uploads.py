@@ -0,0 +1,151 @@
+"""
+Uploads Module
+Parses uploaded files straight into memory, spilling large ones to uniquely named files, and hands them to services
+"""
+
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from flask import Request
+from werkzeug.utils import secure_filename
+
+UPLOAD_FOLDER = os.path.abspath(os.getenv("UPLOAD_DIR", "uploads"))
+UPLOAD_MAX_MEMORY_BYTES = int(os.getenv("UPLOAD_MAX_MEMORY_MB", "16")) * 1024 * 1024
+
+
+def source_name(source):
+    """File name of a path or named stream, for logs and document metadata"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(source)
+    return os.path.basename(getattr(source, "name", None) or "upload")
+
+
+def read_source(source):
+    """All bytes of a path or binary stream (a stream is read from its start)"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    source.seek(0)
+    return source.read()
+
+
+class Upload:
+    """
+    One uploaded file: its bytes in memory, or a spill file on disk when large
+
+    Services take source(), which is a fresh in-memory stream or the spill
+    file's path, so a file is never written to disk just to be read back.
+    The caller owns the upload and closes it (e.g. a background job, after the
+    request has ended); closing deletes the spill file.
+    """
+
+    def __init__(self, filename, data=None, path=None):
+        self.filename = filename
+        self.data = data
+        self.path = path
+        self.size = len(data) if data is not None else os.path.getsize(path)
+
+    @property
+    def in_memory(self):
+        return self.data is not None
+
+    def source(self):
+        """A path or binary stream that readers such as PdfReader, PIL and faster-whisper accept"""
+        if self.in_memory:
+            stream = io.BytesIO(self.data)
+            stream.name = self.filename
+            return stream
+        return self.path
+
+    def read(self):
+        """All bytes of the upload"""
+        return self.data if self.in_memory else read_source(self.path)
+
+    @contextmanager
+    def local_path(self):
+        """
+        A path to the upload for tools that only open files (e.g. ffmpeg)
+
+        A spilled upload is used in place; an in-memory one is written to a
+        uniquely named temporary file for the duration of the with block.
+        """
+        if not self.in_memory:
+            yield self.path
+            return
+
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(self.filename)[1], delete=False) as f:
+            f.write(self.data)
+        try:
+            yield f.name
+        finally:
+            os.remove(f.name)
+
+    def close(self):
+        """Delete the spill file, if any"""
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class UploadRequest(Request):
+    """
+    Flask request whose multipart file fields stay in memory up to
+    UPLOAD_MAX_MEMORY_MB and otherwise stream into a uniquely named file in
+    UPLOAD_DIR, instead of Werkzeug's 500 KB spool that routes then copied
+    again into uploads/<filename>. Spill files not taken with upload() are
+    deleted when the request ends.
+    """
+
+    max_memory_bytes = UPLOAD_MAX_MEMORY_BYTES
+    upload_folder = UPLOAD_FOLDER
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spill_paths = set()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= self.max_memory_bytes:
+            return io.BytesIO()
+
+        os.makedirs(self.upload_folder, exist_ok=True)
+        stream = tempfile.NamedTemporaryFile(
+            dir=self.upload_folder, prefix="upload_",
+            suffix=f"_{secure_filename(filename or '') or 'file'}", delete=False
+        )
+        self.spill_paths.add(stream.name)
+        return stream
+
+    def upload(self, field):
+        """
+        Take ownership of an uploaded file
+
+        Args:
+            field: Form field name
+
+        Returns:
+            Upload, or None if the field is missing or has no file name
+        """
+        file = self.files.get(field)
+        if file is None or file.filename == "":
+            return None
+
+        stream = file.stream
+        if isinstance(stream, io.BytesIO):
+            return Upload(file.filename, data=stream.getvalue())
+
+        stream.flush()
+        self.spill_paths.discard(stream.name)
+        return Upload(file.filename, path=stream.name)
+
+    def close(self):
+        super().close()
+        for path in self.spill_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self.spill_paths.clear()
@@ -0,0 +1,29 @@
+"""
+Worker Pool Module
+Chooses how the extraction and transcription process pools start their workers
+"""
+
+import multiprocessing
+
+
+def pool_context(after_startup=False):
+    """
+    Multiprocessing context for a process pool
+
+    At startup the process has no threads yet, so workers are forked: they
+    start fast and share the parent's memory. A pool started later (e.g.
+    restarted after a worker died) is started from a request thread while model
+    and BLAS thread pools are live, and a forked child could inherit their locks
+    held and deadlock; those workers come from a forkserver (spawn where there
+    is none) and import what they need themselves.
+
+    Args:
+        after_startup: The pool is started while the server is running
+
+    Returns:
+        Multiprocessing context, or None for the platform default
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if not after_startup:
+        return multiprocessing.get_context("fork") if "fork" in methods else None
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
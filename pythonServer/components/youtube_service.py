@@ -7,36 +7,34 @@ Supports captions, auto-generated subtitles, and Whisper fallback
 import os
 import subprocess
 import tempfile
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Iterator
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
-from faster_whisper import WhisperModel
 from groq import Groq
+from .stt_backends import faster_whisper_model
+from .model_registry import ModelRegistry
 
 
 class YouTubeService:
     """Service for YouTube transcript extraction and summarization"""
     
-    def __init__(self, groq_api_key: str):
+    def __init__(self, groq_api_key: str, model_registry: Optional[ModelRegistry] = None):
         """
         Initialize YouTube Service
         
         Args:
             groq_api_key: Groq API key for AI summarization
+            model_registry: Optional ModelRegistry shared with other services for the Whisper model
         """
         self.groq_api_key = groq_api_key
         self.client = Groq(api_key=groq_api_key)
-        self.whisper_model = None
+        self.model_registry = model_registry or ModelRegistry()
         
         print("✓ YouTube Service initialized")
     
-    def _load_whisper_model(self):
-        """Lazy load Whisper model (only when needed)"""
-        if self.whisper_model is None:
-            print("Loading Whisper model (small)...")
-            self.whisper_model = WhisperModel("small", device="cpu")
-            print("✓ Whisper model loaded")
-        return self.whisper_model
+    def _whisper_model(self):
+        """Hold the Whisper model (small), loaded on first use through the model registry"""
+        return faster_whisper_model("small", model_registry=self.model_registry)
     
     def _extract_video_id(self, youtube_url: str) -> Optional[str]:
         """
@@ -246,10 +244,10 @@ class YouTubeService:
                 
                 # Transcribe with Whisper
                 print("Transcribing with Whisper (this may take a while)...")
-                model = self._load_whisper_model()
-                segments, info = model.transcribe(audio_path)
+                with self._whisper_model() as model:
+                    segments, info = model.transcribe(audio_path)
+                    transcript = " ".join([segment.text for segment in segments])
                 
-                transcript = " ".join([segment.text for segment in segments])
                 print(f"✓ Whisper transcription complete ({len(transcript)} characters)")
                 return transcript
                 
@@ -300,16 +298,16 @@ class YouTubeService:
         print("\n❌ All transcript extraction methods failed")
         return None
     
-    def generate_summary(self, transcript: str, summary_type: str = "detailed") -> str:
+    def _build_summary_messages(self, transcript: str, summary_type: str) -> List[Dict[str, str]]:
         """
-        Generate AI summary of transcript
+        Build chat messages for summarizing a transcript
         
         Args:
             transcript: Video transcript text
             summary_type: Type of summary ("bullet", "detailed", "brief")
             
         Returns:
-            AI-generated summary
+            List of chat messages for the Groq API
         """
         print(f"\n{'='*60}")
         print(f"📝 Generating {summary_type} summary...")
@@ -345,19 +343,34 @@ capturing the main message and key points:
 Transcript:
 {transcript}"""
         
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert at summarizing educational video content. Provide clear, well-structured summaries."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def generate_summary(self, transcript: str, summary_type: str = "detailed") -> str:
+        """
+        Generate AI summary of transcript
+        
+        Args:
+            transcript: Video transcript text
+            summary_type: Type of summary ("bullet", "detailed", "brief")
+            
+        Returns:
+            AI-generated summary
+        """
+        messages = self._build_summary_messages(transcript, summary_type)
+        
         try:
             # Use Groq API for summarization
             chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at summarizing educational video content. Provide clear, well-structured summaries."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=messages,
                 model="llama-3.3-70b-versatile",
                 temperature=0.3,
                 max_tokens=1500
@@ -371,6 +384,37 @@ Transcript:
             print(f"❌ Summary generation failed: {str(e)}")
             return f"Error generating summary: {str(e)}"
     
+    def generate_summary_stream(self, transcript: str, summary_type: str = "detailed") -> Iterator[str]:
+        """
+        Generate AI summary of transcript, yielding text as the model produces it
+        
+        Args:
+            transcript: Video transcript text
+            summary_type: Type of summary ("bullet", "detailed", "brief")
+            
+        Yields:
+            Summary text fragments
+        """
+        messages = self._build_summary_messages(transcript, summary_type)
+        
+        stream = self.client.chat.completions.create(
+            messages=messages,
+            model="llama-3.3-70b-versatile",
+            temperature=0.3,
+            max_tokens=1500,
+            stream=True
+        )
+        
+        # Closing the generator (client disconnect) closes the upstream stream
+        try:
+            for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    yield text
+            print("✓ Summary streamed successfully\n")
+        finally:
+            stream.close()
+    
     def process_youtube_video(
         self, 
         youtube_url: str, 
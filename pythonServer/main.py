@@ -4,14 +4,20 @@ Handles API endpoints and routes requests to appropriate services
 """
 
 import os
+import json
+import time
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
-import tempfile
 import base64
 
 # Import service modules from components package
 from components import RAGService, AudioService, OCRService, YouTubeService
+from components.job_manager import JobManager, JobQueueFull
+from components.model_registry import ModelRegistry
+from components.segment_transcriber import ParallelTranscriber
+from components.live_captions import LiveCaptionService, CaptionSessionLimit
+from components.uploads import UploadRequest
 
 
 # Load environment variables
@@ -24,29 +30,63 @@ if not GROQ_API_KEY:
 
 # ---------- Flask App Setup ----------
 app = Flask(__name__)
+# Uploaded files are parsed into memory, or into a uniquely named file when large
+app.request_class = UploadRequest
 CORS(app)  # Enable CORS for frontend requests
 
-# Initialize services
-rag_service = RAGService(GROQ_API_KEY)
-audio_service = AudioService()
-ocr_service = OCRService(GROQ_API_KEY)
-youtube_service = YouTubeService(GROQ_API_KEY)
+# Pool workers started after startup (forkserver/spawn) import this script as
+# __mp_main__; they only run component functions, so they skip the services
+if __name__ != "__mp_main__":
+    # Fork the transcription workers first, while this process has no threads yet
+    parallel_transcriber = ParallelTranscriber()
+    parallel_transcriber.start()
+    
+    # Initialize services; they share one registry of loaded models
+    model_registry = ModelRegistry()
+    rag_service = RAGService(GROQ_API_KEY, model_registry=model_registry)
+    audio_service = AudioService(model_registry=model_registry, parallel_transcriber=parallel_transcriber)
+    ocr_service = OCRService(GROQ_API_KEY, model_registry=model_registry)
+    youtube_service = YouTubeService(GROQ_API_KEY, model_registry=model_registry)
+    live_captions = LiveCaptionService(model_registry=model_registry)
+    job_manager = JobManager()
 
 
 # ---------- Utility Functions ----------
 
-def create_upload_folder():
-    """Create uploads folder if it doesn't exist"""
-    upload_folder = 'uploads'
-    os.makedirs(upload_folder, exist_ok=True)
-    return upload_folder
+def wants_stream(value):
+    """Check whether a request opted into SSE streaming ('stream': true)"""
+    return str(value).lower() in ('true', '1', 'yes')
+
+
+def sse_response(events):
+    """
+    Send (event, data) pairs as Server-Sent Events
+    
+    Each item becomes 'event: <name>' with a JSON 'data' line. Exceptions raised
+    while streaming are sent as a final 'error' event. If the client disconnects,
+    the generator is closed, which cancels the upstream model stream.
+    """
+    def generate():
+        try:
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            print(f"Error while streaming: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
-def create_audio_folder():
-    """Create audio outputs folder if it doesn't exist"""
-    audio_folder = 'audio_outputs'
-    os.makedirs(audio_folder, exist_ok=True)
-    return audio_folder
+def stream_tokens(tokens, meta, done=None):
+    """Yield a 'meta' event, one 'token' event per text fragment, then 'done'"""
+    yield "meta", meta
+    for text in tokens:
+        yield "token", {"text": text}
+    yield "done", done or {"success": True}
 
 
 # ---------- API Endpoints ----------
@@ -65,9 +105,19 @@ def home():
         "endpoints": {
             "health": "GET /",
             "upload": "POST /upload",
+            "jobs": "GET /jobs/<job_id>",
+            "models": "GET /models",
+            "update_pages": "POST /documents/<document_id>/pages",
             "retrieve": "POST /retrieve",
+            "retrieve_batch": "POST /retrieve/batch",
+            "retrieve_cache": "GET /retrieve/cache",
             "tts": "POST /tts",
+            "tts_stream": "POST /tts/stream",
+            "tts_cache": "GET /tts/cache",
             "stt": "POST /stt",
+            "stt_live": "POST /stt/live",
+            "stt_live_audio": "POST /stt/live/<session_id>/audio",
+            "stt_live_end": "POST /stt/live/<session_id>/end",
             "multilingual": "POST /multilingual",
             "audio": "GET /audio/<filename>",
             "ocr_extract": "POST /ocr/extract",
@@ -84,8 +134,11 @@ def home():
 def upload():
     """
     Upload and process a PDF file
-    Expects: multipart/form-data with 'file' field
-    Returns: Success message with filename
+    Expects: multipart/form-data with 'file' field and optional 'async' (true/false)
+             and 'lazy' (true/false: index text only and embed chunks as questions need
+             them, so very large PDFs are queryable in seconds)
+    Returns: Success message with filename and document_id,
+             or a job_id to poll at /jobs/<job_id> when 'async' is true
     """
     try:
         if 'file' not in request.files:
@@ -99,25 +152,47 @@ def upload():
         if not file.filename.endswith('.pdf'):
             return jsonify({"error": "Only PDF files are allowed"}), 400
         
-        # Save uploaded file temporarily
-        upload_folder = create_upload_folder()
-        pdf_path = os.path.join(upload_folder, file.filename)
-        file.save(pdf_path)
+        run_async = request.form.get('async', 'false').lower() == 'true'
+        lazy = request.form.get('lazy', 'false').lower() == 'true'
         
-        print(f"Processing PDF: {file.filename}")
+        # In memory, or already on disk when large; the job owns it from here
+        upload = request.upload('file')
         
-        # Process PDF using RAG service
-        rag_service.upload_and_process(pdf_path)
+        if run_async:
+            try:
+                job_id = job_manager.submit('ingest', ingest_pdf_job, upload, lazy)
+            except JobQueueFull as e:
+                upload.close()
+                return jsonify({"error": str(e)}), 503
+            
+            print(f"Queued PDF ingestion: {file.filename} (job {job_id})")
+            
+            return jsonify({
+                "success": True,
+                "message": "PDF queued for processing",
+                "filename": file.filename,
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}"
+            }), 202
         
-        # Clean up uploaded file
-        os.remove(pdf_path)
+        print(f"Processing PDF: {file.filename}")
+        
+        # Process PDF using RAG service, keeping the final progress counters
+        progress = {}
+        with upload:
+            document_id = rag_service.upload_and_process(
+                upload.source(), lambda stage, **counters: progress.update(counters), lazy
+            )
         
         print(f"PDF processed successfully: {file.filename}")
         
         return jsonify({
             "success": True,
             "message": "PDF uploaded and processed successfully",
-            "filename": file.filename
+            "filename": file.filename,
+            "document_id": document_id,
+            "lazy": lazy,
+            "dedup": progress.get("dedup")
         }), 200
         
     except Exception as e:
@@ -125,36 +200,148 @@ def upload():
         return jsonify({"error": str(e)}), 500
 
 
+def ingest_pdf_job(job, upload, lazy=False):
+    """Background ingestion job: process the uploaded PDF and report progress"""
+    with upload:
+        print(f"Processing PDF: {upload.filename} (job {job.id})")
+        document_id = rag_service.upload_and_process(upload.source(), job.update, lazy)
+        print(f"PDF processed successfully: {upload.filename}")
+        return {
+            "document_id": document_id,
+            "filename": upload.filename,
+            "lazy": lazy,
+            "dedup": job.progress.get("dedup")
+        }
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Report status and stage progress of a background job
+    Args: job_id - Id returned by an async endpoint
+    Returns: Job status, stage, progress counters and result when completed
+    """
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify({"success": True, **job}), 200
+
+
+@app.route('/models', methods=['GET'])
+def loaded_models():
+    """
+    Report models loaded in this worker
+    Returns: Each model's name, resident size, load time, idle time, use count and
+             whether it is in use or pinned, plus totals against the memory budget
+    """
+    return jsonify({"success": True, **model_registry.stats()}), 200
+
+
+@app.route('/documents/<document_id>/pages', methods=['POST'])
+def update_document_pages(document_id):
+    """
+    Add or replace pages of an uploaded document without re-processing it
+    Expects: multipart/form-data with 'file' (PDF of new/revised pages) and
+             optional 'start_page' (1-based page the first uploaded page replaces;
+             defaults to appending after the last page)
+    Returns: document_id of the edited document (the original keeps its id and
+             content), counts of pages and chunks added, replaced and unchanged
+    """
+    try:
+        if not rag_service.is_valid_document_id(document_id):
+            return jsonify({"error": "Invalid document_id"}), 400
+        
+        if 'file' not in request.files:
+            return jsonify({"error": "No file provided"}), 400
+        
+        file = request.files['file']
+        
+        if file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
+        
+        if not file.filename.endswith('.pdf'):
+            return jsonify({"error": "Only PDF files are allowed"}), 400
+        
+        start_page = request.form.get('start_page')
+        if start_page is not None:
+            if not start_page.isdigit():
+                return jsonify({"error": "start_page must be a positive integer"}), 400
+            start_page = int(start_page)
+        
+        if not rag_service.is_ready(document_id):
+            return jsonify({"error": "Document not found. Please upload the PDF again."}), 404
+        
+        print(f"Updating document {document_id} with {file.filename}")
+        
+        with request.upload('file') as upload:
+            result = rag_service.update_document(document_id, upload.source(), start_page)
+        
+        return jsonify({
+            "success": True,
+            "filename": file.filename,
+            **result
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error updating document: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/retrieve', methods=['POST'])
 def retrieve():
     """
     Retrieve answer based on uploaded PDF
-    Expects: JSON with 'question' field
+    Expects: JSON with 'question' and optional 'document_id' (defaults to latest upload)
+             and 'stream' (bool) for Server-Sent Events token streaming
     Returns: Answer from RAG chain
     """
     try:
-        if not rag_service.is_ready():
-            return jsonify({
-                "error": "No PDF uploaded yet. Please upload a PDF first."
-            }), 400
-        
         data = request.get_json()
         
         if not data or 'question' not in data:
             return jsonify({"error": "No question provided"}), 400
         
         question = data['question']
+        document_id = rag_service.resolve_document_id(data.get('document_id'))
         
         if not question.strip():
             return jsonify({"error": "Question cannot be empty"}), 400
         
+        if document_id is None:
+            return jsonify({
+                "error": "No PDF uploaded yet. Please upload a PDF first."
+            }), 400
+        
+        if not rag_service.is_valid_document_id(document_id):
+            return jsonify({"error": "Invalid document_id"}), 400
+        
+        if not rag_service.is_ready(document_id):
+            return jsonify({
+                "error": "Document not found. Please upload the PDF again."
+            }), 404
+        
+        if wants_stream(data.get('stream', False)):
+            cached, tokens = rag_service.stream_answer(question, document_id)
+            return sse_response(stream_tokens(tokens, {
+                "question": question,
+                "document_id": document_id,
+                "cached": cached
+            }))
+        
         # Get answer from RAG service
-        answer = rag_service.get_answer(question)
+        result = rag_service.get_answer(question, document_id)
         
         return jsonify({
             "success": True,
             "question": question,
-            "answer": answer
+            "document_id": document_id,
+            "answer": result["answer"],
+            "cached": result["cached"],
+            "context": result["context_stats"]
         }), 200
         
     except Exception as e:
@@ -162,6 +349,98 @@ def retrieve():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/retrieve/batch', methods=['POST'])
+def retrieve_batch():
+    """
+    Answer many questions about one uploaded PDF
+    Expects: JSON with 'questions' (list), optional 'document_id' (defaults to latest upload),
+             'concurrency' (parallel LLM calls) and 'stream' (default true)
+    Returns: Server-Sent Events - 'meta', one 'result' per question as it finishes
+             (with its 'index' in the request), then 'done'; with stream=false,
+             one JSON body with results in request order
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('questions'), list) or not data['questions']:
+            return jsonify({"error": "No questions provided"}), 400
+        
+        questions = data['questions']
+        max_questions = int(os.getenv('RAG_BATCH_MAX_QUESTIONS', '100'))
+        if len(questions) > max_questions:
+            return jsonify({"error": f"At most {max_questions} questions per batch"}), 400
+        
+        if any(not isinstance(question, str) or not question.strip() for question in questions):
+            return jsonify({"error": "Questions cannot be empty"}), 400
+        
+        document_id = rag_service.resolve_document_id(data.get('document_id'))
+        
+        if document_id is None:
+            return jsonify({
+                "error": "No PDF uploaded yet. Please upload a PDF first."
+            }), 400
+        
+        if not rag_service.is_valid_document_id(document_id):
+            return jsonify({"error": "Invalid document_id"}), 400
+        
+        if not rag_service.is_ready(document_id):
+            return jsonify({
+                "error": "Document not found. Please upload the PDF again."
+            }), 404
+        
+        concurrency = data.get('concurrency')
+        if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+            return jsonify({"error": "concurrency must be a positive integer"}), 400
+        
+        start = time.time()
+        results = rag_service.answer_batch(questions, document_id, concurrency)
+        
+        def summary(completed):
+            return {
+                "success": True,
+                "count": len(completed),
+                "cached": sum(1 for result in completed if result.get("cached")),
+                "failed": sum(1 for result in completed if "error" in result),
+                "seconds": round(time.time() - start, 3)
+            }
+        
+        if not wants_stream(data.get('stream', True)):
+            completed = sorted(results, key=lambda result: result["index"])
+            return jsonify({
+                **summary(completed),
+                "document_id": document_id,
+                "results": completed
+            }), 200
+        
+        def events():
+            yield "meta", {"document_id": document_id, "count": len(questions)}
+            completed = []
+            for result in results:
+                completed.append(result)
+                yield "result", result
+            yield "done", summary(completed)
+        
+        return sse_response(events())
+        
+    except Exception as e:
+        print(f"Error answering batch: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/retrieve/cache', methods=['GET'])
+def retrieve_cache_stats():
+    """
+    Report semantic answer cache and chunk embedding store statistics
+    Returns: Lookups, hit/miss/near-miss counts and rates, cache settings,
+             and stored vectors with their lifetime dedup ratio
+    """
+    return jsonify({
+        "success": True,
+        "answer_cache": rag_service.answer_cache.stats(),
+        "embedding_store": rag_service.embedding_store.stats()
+    }), 200
+
+
 # ---------- Audio Endpoints ----------
 
 @app.route('/tts', methods=['POST'])
@@ -169,7 +448,8 @@ def text_to_speech():
     """
     Convert text to speech
     Expects: JSON with 'text' and optional 'language' and 'inline' (bool)
-    Returns: Audio URL or base64 encoded audio
+    Returns: Audio URL or base64 encoded audio; identical text, voice and language
+             is served from the TTS cache ('cached': true)
     """
     try:
         data = request.get_json()
@@ -186,16 +466,11 @@ def text_to_speech():
         
         print(f"TTS Request: {text[:50]}... (Language: {language or 'auto-detect'}, inline={inline})")
         
-        # Generate audio using audio service
-        audio_folder = create_audio_folder()
-        audio_filename = f"tts_{os.urandom(8).hex()}.mp3"
-        audio_path = os.path.join(audio_folder, audio_filename)
-        
-        audio_file, detected_lang = audio_service.text_to_speech(
-            text, audio_path, language
-        )
+        # Generate audio using audio service, or reuse it from the cache
+        audio_path, detected_lang, cached = audio_service.cached_text_to_speech(text, language)
+        audio_filename = os.path.basename(audio_path)
         
-        print(f"TTS generated: {audio_filename} (Language: {detected_lang})")
+        print(f"TTS {'served from cache' if cached else 'generated'}: {audio_filename} (Language: {detected_lang})")
         
         if inline:
             # Return base64 encoded audio
@@ -207,7 +482,8 @@ def text_to_speech():
                 "audio_base64": b64,
                 "detected_language": detected_lang,
                 "text": text,
-                "audio_url": f"/audio/{audio_filename}"
+                "audio_url": f"/audio/{audio_filename}",
+                "cached": cached
             }), 200
         
         # Return audio URL
@@ -215,7 +491,8 @@ def text_to_speech():
             "success": True,
             "audio_url": f"/audio/{audio_filename}",
             "detected_language": detected_lang,
-            "text": text
+            "text": text,
+            "cached": cached
         }), 200
         
     except Exception as e:
@@ -223,12 +500,71 @@ def text_to_speech():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/tts/stream', methods=['GET', 'POST'])
+def text_to_speech_stream():
+    """
+    Convert text to speech, streaming mp3 chunks as they are synthesized
+    Expects: JSON with 'text' and optional 'language' (POST),
+             or the same as query parameters (GET, usable as an <audio> src)
+    Returns: audio/mpeg over chunked transfer encoding; the detected language and
+             whether the audio came from the TTS cache are in the
+             X-Detected-Language and X-TTS-Cached headers
+    """
+    try:
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        
+        if not data or 'text' not in data:
+            return jsonify({"error": "No text provided"}), 400
+        
+        text = data['text']
+        language = data.get('language') or None
+        
+        if not text.strip():
+            return jsonify({"error": "Text cannot be empty"}), 400
+        
+        print(f"TTS Stream Request: {text[:50]}... (Language: {language or 'auto-detect'})")
+        
+        chunks, detected_lang, cached = audio_service.stream_text_to_speech(text, language)
+        
+        return Response(
+            chunks,
+            mimetype='audio/mpeg',
+            headers={
+                'X-Detected-Language': detected_lang,
+                'X-TTS-Cached': str(cached).lower(),
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except Exception as e:
+        print(f"Error in TTS stream: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/tts/cache', methods=['GET'])
+def tts_cache_stats():
+    """
+    Report TTS cache and synthesis loop statistics
+    Returns: Lookups, hits, misses, hit rate, evicted files and disk usage against the budget,
+             and running/waiting edge-tts sessions against the concurrency limit
+    """
+    return jsonify({
+        "success": True,
+        "tts_cache": audio_service.tts_cache.stats(),
+        "tts_loop": audio_service.tts_loop.stats()
+    }), 200
+
+
 @app.route('/stt', methods=['POST'])
 def speech_to_text():
     """
-    Convert speech to text using Whisper
-    Expects: multipart/form-data with 'audio' field
-    Returns: Transcribed text and detected language
+    Convert speech to text using Whisper (int8 CTranslate2 with silence skipped by default)
+    Long recordings are split at silences and the segments transcribed in parallel
+    Expects: multipart/form-data with 'audio' field and optional 'async' ("true" to
+             transcribe in the background; poll /jobs/<job_id> for partial text)
+    Returns: Transcribed text, detected language, audio/speech duration in seconds and
+             timestamped segments, or 202 with a job id when async
     """
     try:
         if 'audio' not in request.files:
@@ -239,25 +575,41 @@ def speech_to_text():
         if audio_file.filename == '':
             return jsonify({"error": "No file selected"}), 400
         
-        # Save audio temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            audio_file.save(tmp_file.name)
-            tmp_path = tmp_file.name
+        run_async = request.form.get('async', 'false').lower() == 'true'
+        upload = request.upload('audio')
+        
+        if run_async:
+            try:
+                job_id = job_manager.submit('transcribe', transcribe_audio_job, upload)
+            except JobQueueFull as e:
+                upload.close()
+                return jsonify({"error": str(e)}), 503
+            
+            print(f"Queued transcription: {audio_file.filename} (job {job_id})")
+            
+            return jsonify({
+                "success": True,
+                "message": "Audio queued for transcription",
+                "filename": audio_file.filename,
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}"
+            }), 202
         
         print(f"Transcribing audio: {audio_file.filename}")
         
         # Transcribe using audio service
-        result = audio_service.speech_to_text(tmp_path)
-        
-        # Clean up
-        os.remove(tmp_path)
+        with upload:
+            result = audio_service.speech_to_text(upload.source())
         
         print(f"Transcription: {result['text'][:100]}... (Language: {result['detected_language']})")
         
         return jsonify({
             "success": True,
             "text": result['text'],
-            "detected_language": result['detected_language']
+            "detected_language": result['detected_language'],
+            "duration": result['duration'],
+            "speech_duration": result['speech_duration'],
+            "segments": result['segments']
         }), 200
         
     except Exception as e:
@@ -265,6 +617,105 @@ def speech_to_text():
         return jsonify({"error": str(e)}), 500
 
 
+def transcribe_audio_job(job, upload):
+    """Background transcription job: transcribe the uploaded recording and report partial text"""
+    with upload:
+        print(f"Transcribing audio: {upload.filename} (job {job.id})")
+        result = audio_service.speech_to_text(upload.source(), job.update)
+        print(f"Transcription finished: {upload.filename} ({len(result['segments'])} segments)")
+        return {
+            "filename": upload.filename,
+            "text": result['text'],
+            "detected_language": result['detected_language'],
+            "duration": result['duration'],
+            "speech_duration": result['speech_duration'],
+            "segments": result['segments']
+        }
+
+
+@app.route('/stt/live', methods=['POST'])
+def start_live_captions():
+    """
+    Open a live caption session
+    Expects: Optional JSON with 'language' (detected per window if omitted)
+    Returns: Session id and the audio format /stt/live/<id>/audio expects
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        session_id = live_captions.start(data.get('language'))
+        
+        print(f"Live captions started: {session_id}")
+        
+        return jsonify({
+            "success": True,
+            "session_id": session_id,
+            "sample_rate": 16000,
+            "format": "s16le",
+            "channels": 1
+        }), 200
+        
+    except CaptionSessionLimit as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        print(f"Error starting live captions: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/stt/live/<session_id>/audio', methods=['POST'])
+def live_caption_audio(session_id):
+    """
+    Append audio to a live caption session
+    Expects: Raw 16 kHz mono signed 16-bit little-endian PCM as the request body
+             (application/octet-stream), typically 100-500 ms per request
+    Returns: Caption events finished since the previous request; each is
+             {type: "partial" | "final", text, start, end} with seconds from the
+             session start. A partial is replaced by later partials or finals
+             covering the same audio.
+    """
+    session = live_captions.get(session_id)
+    
+    if session is None:
+        return jsonify({"error": "Caption session not found"}), 404
+    
+    try:
+        events = live_captions.add_audio(session, request.get_data())
+        return jsonify({"success": True, "events": events}), 200
+        
+    except Exception as e:
+        print(f"Error in live captions: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/stt/live/<session_id>/end', methods=['POST'])
+def end_live_captions(session_id):
+    """
+    Close a live caption session
+    Returns: Remaining caption events, with the rest of the audio captioned as final
+    """
+    try:
+        events = live_captions.finish(session_id, timeout=60)
+        
+        if events is None:
+            return jsonify({"error": "Caption session not found"}), 404
+        
+        print(f"Live captions ended: {session_id}")
+        
+        return jsonify({"success": True, "events": events}), 200
+        
+    except Exception as e:
+        print(f"Error ending live captions: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/stt/live', methods=['GET'])
+def live_caption_stats():
+    """
+    Report live caption load
+    Returns: Open sessions, decode counts and time, and the worst caption lag in seconds
+    """
+    return jsonify({"success": True, **live_captions.stats()}), 200
+
+
 @app.route('/multilingual', methods=['POST'])
 def multilingual_detect():
     """
@@ -308,7 +759,7 @@ def serve_audio(filename):
     Returns: Audio file
     """
     try:
-        audio_path = os.path.join('audio_outputs', filename)
+        audio_path = os.path.join(audio_service.tts_cache.folder, os.path.basename(filename))
         
         if not os.path.exists(audio_path):
             return jsonify({"error": "Audio file not found"}), 404
@@ -330,7 +781,8 @@ def serve_audio(filename):
 def ocr_extract_and_solve():
     """
     Extract text from image and answer user's question
-    Expects: multipart/form-data with 'image' field and 'query' field
+    Expects: multipart/form-data with 'image' field, 'query' field
+             and optional 'stream' (true/false) for Server-Sent Events token streaming
     Returns: Extracted text and AI-generated answer
     """
     try:
@@ -358,24 +810,34 @@ def ocr_extract_and_solve():
         languages = request.form.get('languages', 'en,hi').split(',')
         languages = [lang.strip() for lang in languages]
         
-        # Save image temporarily
-        upload_folder = create_upload_folder()
-        image_path = os.path.join(upload_folder, image_file.filename)
-        image_file.save(image_path)
+        upload = request.upload('image')
         
         print(f"Processing image: {image_file.filename}")
         print(f"Query: {query}")
         print(f"Using languages: {languages}")
         
-        # Process image and get answer
-        result = ocr_service.process_image_and_question(
-            image_path, 
-            query, 
-            languages
-        )
+        if wants_stream(request.form.get('stream', False)):
+            # OCR runs up front; only the answer is streamed
+            with upload:
+                extracted_text = ocr_service.extract_text_from_image(upload.source(), languages)
+            
+            return sse_response(stream_tokens(
+                ocr_service.answer_question_stream(extracted_text, query),
+                {
+                    "query": query,
+                    "extracted_text": extracted_text,
+                    "filename": image_file.filename,
+                    "languages_used": languages
+                }
+            ))
         
-        # Clean up
-        os.remove(image_path)
+        # Process image and get answer
+        with upload:
+            result = ocr_service.process_image_and_question(
+                upload.source(), 
+                query, 
+                languages
+            )
         
         return jsonify({
             "success": True,
@@ -397,7 +859,8 @@ def ocr_extract_and_solve():
 def ai_recommendations():
     """
     Generate AI-powered study recommendations based on student's assessment history
-    Expects: JSON with 'assessments' array and 'student_name'
+    Expects: JSON with 'assessments' array, 'student_name'
+             and optional 'stream' (bool) for Server-Sent Events token streaming
     Returns: Personalized study recommendations
     """
     try:
@@ -493,17 +956,52 @@ Be specific, encouraging, and reference actual assessment data. Keep the tone su
         
         client = Groq(api_key=groq_api_key)
         
+        messages = [
+            {
+                "role": "system",
+                "content": "You are an expert educational AI tutor specializing in personalized learning recommendations."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        
+        summary = {
+            "total_assessments": total_assessments,
+            "average_score": round(avg_marks, 1),
+            "highest_score": highest_score,
+            "lowest_score": lowest_score
+        }
+        
+        if wants_stream(data.get('stream', False)):
+            completion_stream = client.chat.completions.create(
+                messages=messages,
+                model="llama-3.3-70b-versatile",
+                temperature=0.7,
+                max_tokens=2000,
+                stream=True
+            )
+            
+            def recommendation_tokens():
+                try:
+                    for chunk in completion_stream:
+                        text = chunk.choices[0].delta.content if chunk.choices else None
+                        if text:
+                            yield text
+                    print("✓ AI recommendations streamed successfully\n")
+                finally:
+                    completion_stream.close()
+            
+            return sse_response(stream_tokens(recommendation_tokens(), {
+                "student_name": student_name,
+                "total_assessments": total_assessments,
+                "average_score": round(avg_marks, 1),
+                "summary": summary
+            }))
+        
         chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert educational AI tutor specializing in personalized learning recommendations."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            messages=messages,
             model="llama-3.3-70b-versatile",
             temperature=0.7,
             max_tokens=2000
@@ -519,12 +1017,7 @@ Be specific, encouraging, and reference actual assessment data. Keep the tone su
             "total_assessments": total_assessments,
             "average_score": round(avg_marks, 1),
             "recommendations": recommendations,
-            "summary": {
-                "total_assessments": total_assessments,
-                "average_score": round(avg_marks, 1),
-                "highest_score": highest_score,
-                "lowest_score": lowest_score
-            }
+            "summary": summary
         }), 200
         
     except Exception as e:
@@ -583,7 +1076,8 @@ def youtube_transcript():
 def youtube_summarize():
     """
     Extract transcript and generate summary from YouTube video
-    Expects: JSON with 'youtube_url' and optional 'summary_type' (bullet/detailed/brief)
+    Expects: JSON with 'youtube_url', optional 'summary_type' (bullet/detailed/brief)
+             and 'stream' (bool) for Server-Sent Events token streaming
     Returns: Transcript and AI-generated summary
     """
     try:
@@ -608,6 +1102,29 @@ def youtube_summarize():
         print(f"Summary type: {summary_type}")
         print(f"{'='*60}\n")
         
+        if wants_stream(data.get('stream', False)):
+            # Transcript extraction runs up front; only the summary is streamed
+            video_id = youtube_service._extract_video_id(youtube_url)
+            if not video_id:
+                return jsonify({"error": "Invalid YouTube URL"}), 400
+            
+            transcript = youtube_service.extract_transcript(youtube_url)
+            if not transcript:
+                return jsonify({
+                    "error": "Failed to extract transcript. Video may have no captions, be private, or be unavailable."
+                }), 400
+            
+            return sse_response(stream_tokens(
+                youtube_service.generate_summary_stream(transcript, summary_type),
+                {
+                    "video_url": youtube_url,
+                    "video_id": video_id,
+                    "transcript": transcript,
+                    "transcript_length": len(transcript),
+                    "summary_type": summary_type
+                }
+            ))
+        
         # Process video (extract + summarize)
         result = youtube_service.process_youtube_video(youtube_url, summary_type)
         
@@ -637,7 +1154,8 @@ def youtube_summarize():
 def youtube_summary_only():
     """
     Generate summary from provided transcript
-    Expects: JSON with 'transcript' and optional 'summary_type'
+    Expects: JSON with 'transcript', optional 'summary_type'
+             and 'stream' (bool) for Server-Sent Events token streaming
     Returns: AI-generated summary
     """
     try:
@@ -659,6 +1177,15 @@ def youtube_summary_only():
         
         print(f"Generating summary for transcript ({len(transcript)} chars)")
         
+        if wants_stream(data.get('stream', False)):
+            return sse_response(stream_tokens(
+                youtube_service.generate_summary_stream(transcript, summary_type),
+                {
+                    "transcript_length": len(transcript),
+                    "summary_type": summary_type
+                }
+            ))
+        
         # Generate summary
         summary = youtube_service.generate_summary(transcript, summary_type)
         
@@ -697,10 +1224,18 @@ if __name__ == "__main__":
     print("\n📚 RAG Endpoints:")
     print("  GET  /              - Health check")
     print("  POST /upload        - Upload and process PDF file")
+    print("  GET  /jobs/<id>     - Poll background job progress")
+    print("  GET  /models        - Loaded models and their memory")
+    print("  POST /documents/<id>/pages - Add or replace pages of an uploaded PDF")
     print("  POST /retrieve      - Ask questions about uploaded PDF")
+    print("  POST /retrieve/batch - Ask many questions, results streamed as they finish")
+    print("  GET  /retrieve/cache - Answer cache and embedding store statistics")
     print("\n🎤 Audio Endpoints:")
     print("  POST /tts           - Text to Speech (560+ languages)")
-    print("  POST /stt           - Speech to Text (Whisper)")
+    print("  POST /tts/stream    - Text to Speech streamed as chunked mp3")
+    print("  GET  /tts/cache     - TTS cache and synthesis concurrency statistics")
+    print("  POST /stt           - Speech to Text (Whisper; async=true for long recordings)")
+    print("  POST /stt/live      - Start live captions; POST /stt/live/<id>/audio with PCM frames")
     print("  POST /multilingual  - Detect language from text")
     print("  GET  /audio/<file>  - Serve audio files")
     print("\n🔍 OCR Endpoint:")
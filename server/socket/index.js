@@ -9,6 +9,81 @@ let io;
 // Store active users per room: { roomId: [socketId1, socketId2] }
 const rooms = {};
 
+// Live captions are decoded by the Python AI server
+const AI_SERVER_URL = process.env.AI_SERVER_URL || "http://localhost:8000";
+// Audio held back while the AI server is busy; older frames are dropped beyond this (10s of 16 kHz s16le)
+const MAX_CAPTION_BACKLOG_BYTES = 10 * 16000 * 2;
+
+// Active caption sessions per socket: { socketId: { sessionId, roomId, frames, bytes, sending } }
+const captions = {};
+
+// POST to the caption API: audio as raw bytes, anything else as JSON
+const postCaptions = async (path, body = {}) => {
+    const isAudio = Buffer.isBuffer(body);
+    const res = await fetch(`${AI_SERVER_URL}/stt/live${path}`, {
+        method: "POST",
+        headers: { "Content-Type": isAudio ? "application/octet-stream" : "application/json" },
+        body: isAudio ? body : JSON.stringify(body)
+    });
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || `Caption server error ${res.status}`);
+    return data;
+};
+
+// Broadcast caption events to the speaker's room
+const emitCaptions = (socket, caption, events) => {
+    events.forEach((event) => {
+        io.in(caption.roomId).emit("caption", {
+            socketId: socket.id,
+            speaker: socket.user.name,
+            ...event
+        });
+    });
+};
+
+// Send queued frames one request at a time, batching whatever arrived meanwhile
+const flushCaptions = async (socket, caption) => {
+    if (caption.sending || caption.frames.length === 0) return;
+
+    caption.sending = true;
+    const body = Buffer.concat(caption.frames);
+    caption.frames = [];
+    caption.bytes = 0;
+
+    try {
+        const { events } = await postCaptions(`/${caption.sessionId}/audio`, body);
+        emitCaptions(socket, caption, events);
+    } catch (err) {
+        console.error("Caption audio error:", err.message);
+        socket.emit("caption-error", { message: err.message });
+    } finally {
+        caption.sending = false;
+    }
+
+    if (!caption.stopping) flushCaptions(socket, caption);
+};
+
+const stopCaptions = async (socket) => {
+    const caption = captions[socket.id];
+    if (!caption) return;
+    delete captions[socket.id];
+    caption.stopping = true;
+
+    try {
+        // Let the in-flight request finish, then send the remaining audio with the final decode
+        while (caption.sending) await new Promise((resolve) => setTimeout(resolve, 50));
+        if (caption.frames.length) {
+            const { events } = await postCaptions(`/${caption.sessionId}/audio`, Buffer.concat(caption.frames));
+            emitCaptions(socket, caption, events);
+        }
+        const { events } = await postCaptions(`/${caption.sessionId}/end`);
+        emitCaptions(socket, caption, events);
+        console.log(`💬 ${socket.user.name} stopped captions in ${caption.roomId}`);
+    } catch (err) {
+        console.error("Caption stop error:", err.message);
+    }
+};
+
 const initSocket = (server) => {
     io = new Server(server, {
         cors: {
@@ -153,10 +228,55 @@ const initSocket = (server) => {
         });
 
         // ==========================================
-        // 7️⃣ DISCONNECT HANDLER
+        // 7️⃣ CAPTIONS: START
+        // ==========================================
+        socket.on("caption-start", async ({ roomId, language }) => {
+            if (!roomId) return;
+            await stopCaptions(socket);
+
+            try {
+                const { session_id } = await postCaptions("", { language });
+                captions[socket.id] = { sessionId: session_id, roomId, frames: [], bytes: 0, sending: false };
+                console.log(`💬 ${socket.user.name} started captions in ${roomId}`);
+                socket.emit("caption-started", { roomId });
+            } catch (err) {
+                console.error("Caption start error:", err.message);
+                socket.emit("caption-error", { message: err.message });
+            }
+        });
+
+        // ==========================================
+        // 8️⃣ CAPTIONS: AUDIO FRAME (16 kHz mono s16le)
+        // ==========================================
+        socket.on("caption-audio", (frame) => {
+            const caption = captions[socket.id];
+            if (!caption || !frame) return;
+
+            const buffer = Buffer.from(frame);
+            caption.frames.push(buffer);
+            caption.bytes += buffer.length;
+
+            // Keep latency bounded when the AI server falls behind
+            while (caption.bytes > MAX_CAPTION_BACKLOG_BYTES && caption.frames.length > 1) {
+                caption.bytes -= caption.frames.shift().length;
+            }
+
+            flushCaptions(socket, caption);
+        });
+
+        // ==========================================
+        // 9️⃣ CAPTIONS: STOP
+        // ==========================================
+        socket.on("caption-stop", () => {
+            stopCaptions(socket);
+        });
+
+        // ==========================================
+        // 🔟 DISCONNECT HANDLER
         // ==========================================
         socket.on("disconnect", () => {
             console.log(`❌ Disconnected: ${socket.user.name}`);
+            stopCaptions(socket);
 
             // Remove user from all video rooms they were part of
             Object.keys(rooms).forEach((roomId) => {